@@ -0,0 +1,24 @@
+"""Add post author_id index
+
+Revision ID: 5b1e7c2d9a40
+Revises: 046f250042cc
+Create Date: 2026-10-19 09:12:31.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1e7c2d9a40'
+down_revision = '046f250042cc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_post_author_id_id', 'post', ['author_id', sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_post_author_id_id', table_name='post')
@@ -0,0 +1,32 @@
+"""Add user_stats
+
+Revision ID: 8c3f41a6e2d7
+Revises: 5b1e7c2d9a40
+Create Date: 2026-10-19 10:02:47.530916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f41a6e2d7'
+down_revision = '5b1e7c2d9a40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('posts_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('likes_received', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('dislikes_received', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Existing data is loaded with `python -m src.commands.rebuild_user_stats`.
+
+
+def downgrade():
+    op.drop_table('user_stats')
@@ -0,0 +1,38 @@
+"""Add post change log
+
+Revision ID: a27d9e05b6f3
+Revises: 8c3f41a6e2d7
+Create Date: 2026-10-19 11:24:05.771290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a27d9e05b6f3'
+down_revision = '8c3f41a6e2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_change',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('ix_post_change_post_id_seq', 'post_change', ['post_id', 'seq'], unique=False)
+    op.create_table('checkpoint',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('checkpoint')
+    op.drop_index('ix_post_change_post_id_seq', table_name='post_change')
+    op.drop_table('post_change')
@@ -0,0 +1,41 @@
+"""Add post soft delete
+
+Revision ID: b4f81c6d2e39
+Revises: a7d3e5b20c14
+Create Date: 2026-10-19 22:17:45.310954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f81c6d2e39'
+down_revision = 'a7d3e5b20c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('post', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.drop_index('ix_post_author_id_id', table_name='post')
+    op.create_index('ix_post_author_id_id', 'post', ['author_id', sa.text('id DESC')], unique=False, postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_post_deleted_at', 'post', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'), sqlite_where=sa.text('deleted_at IS NOT NULL'))
+    if op.get_bind().dialect.name == 'postgresql':
+        # Built without locking the reaction table against the likes and dislikes
+        with op.get_context().autocommit_block():
+            op.create_index('ix_reaction_post_id', 'reaction', ['post_id'], unique=False, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_reaction_post_id', 'reaction', ['post_id'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_reaction_post_id', table_name='reaction', postgresql_concurrently=True)
+    else:
+        op.drop_index('ix_reaction_post_id', table_name='reaction')
+    op.drop_index('ix_post_deleted_at', table_name='post')
+    op.drop_index('ix_post_author_id_id', table_name='post')
+    op.create_index('ix_post_author_id_id', 'post', ['author_id', sa.text('id DESC')], unique=False)
+    op.drop_column('post', 'deleted_at')
@@ -0,0 +1,31 @@
+"""Add rate limit bucket
+
+Revision ID: c5e8a1f0b3d2
+Revises: a27d9e05b6f3
+Create Date: 2026-10-19 14:02:37.418825
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1f0b3d2'
+down_revision = 'a27d9e05b6f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rate_limit_bucket',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_rate_limit_bucket_updated_at', 'rate_limit_bucket', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_rate_limit_bucket_updated_at', table_name='rate_limit_bucket')
+    op.drop_table('rate_limit_bucket')
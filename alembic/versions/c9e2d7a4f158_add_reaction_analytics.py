@@ -0,0 +1,42 @@
+"""Add reaction analytics
+
+Revision ID: c9e2d7a4f158
+Revises: b4f81c6d2e39
+Create Date: 2026-10-19 23:36:08.742215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e2d7a4f158'
+down_revision = 'b4f81c6d2e39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reaction_event',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('likes', sa.SmallInteger(), nullable=False),
+    sa.Column('dislikes', sa.SmallInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('reaction_rollup',
+    sa.Column('scope', sa.String(length=6), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('likes', sa.Integer(), nullable=False),
+    sa.Column('dislikes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'subject_id', 'period', 'bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('reaction_rollup')
+    op.drop_table('reaction_event')
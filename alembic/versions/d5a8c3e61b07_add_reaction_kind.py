@@ -0,0 +1,58 @@
+"""Add reaction kind (expand)
+
+First step of the reaction storage change: adds the smallint kind column next to reaction_type and the
+(user_id, post_id) index, without locking the table. On PostgreSQL a trigger keeps kind and reaction_type in sync,
+so the application versions before and after the change can run side by side. Fill the existing rows with
+python -m src.commands.backfill_reaction_kind before upgrading to the contract revision.
+
+Revision ID: d5a8c3e61b07
+Revises: c9e2d7a4f158
+Create Date: 2026-10-20 09:12:31.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8c3e61b07'
+down_revision = 'c9e2d7a4f158'
+branch_labels = None
+depends_on = None
+
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION reaction_sync_kind() RETURNS trigger AS $$
+BEGIN
+    IF NEW.kind IS NULL OR (TG_OP = 'UPDATE' AND NEW.reaction_type IS DISTINCT FROM OLD.reaction_type) THEN
+        NEW.kind := CASE NEW.reaction_type WHEN 'like' THEN 1 WHEN 'dislike' THEN 2 END;
+    ELSIF NEW.reaction_type IS NULL OR (TG_OP = 'UPDATE' AND NEW.kind IS DISTINCT FROM OLD.kind) THEN
+        NEW.reaction_type := CASE NEW.kind WHEN 1 THEN 'like' WHEN 2 THEN 'dislike' END;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+SYNC_TRIGGER = """
+CREATE TRIGGER reaction_sync_kind BEFORE INSERT OR UPDATE ON reaction
+FOR EACH ROW EXECUTE PROCEDURE reaction_sync_kind()
+"""
+
+
+def upgrade():
+    # A nullable column without a default is a catalog-only change
+    op.add_column('reaction', sa.Column('kind', sa.SmallInteger(), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(SYNC_FUNCTION)
+        op.execute(SYNC_TRIGGER)
+        with op.get_context().autocommit_block():
+            op.create_index('ix_reaction_user_id_post_id', 'reaction', ['user_id', 'post_id'], unique=False, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_reaction_user_id_post_id', 'reaction', ['user_id', 'post_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reaction_user_id_post_id', table_name='reaction')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS reaction_sync_kind ON reaction')
+        op.execute('DROP FUNCTION IF EXISTS reaction_sync_kind()')
+    op.drop_column('reaction', 'kind')
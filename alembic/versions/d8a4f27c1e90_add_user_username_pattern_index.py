@@ -0,0 +1,36 @@
+"""Add user username pattern index
+
+Revision ID: d8a4f27c1e90
+Revises: c5e8a1f0b3d2
+Create Date: 2026-10-19 15:21:44.602913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a4f27c1e90'
+down_revision = 'c5e8a1f0b3d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Built without locking the user table against the signups
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_user_username_pattern', 'user', ['username'], unique=False,
+                postgresql_ops={'username': 'text_pattern_ops'}, postgresql_concurrently=True
+            )
+    else:
+        op.create_index('ix_user_username_pattern', 'user', ['username'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_user_username_pattern', table_name='user', postgresql_concurrently=True)
+    else:
+        op.drop_index('ix_user_username_pattern', table_name='user')
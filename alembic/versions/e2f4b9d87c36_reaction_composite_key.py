@@ -0,0 +1,112 @@
+"""Make (post_id, user_id) the reaction key (contract)
+
+Second step of the reaction storage change, once python -m src.commands.backfill_reaction_kind has filled kind and
+removed the duplicate reactions: makes kind, post_id and user_id NOT NULL, replaces the surrogate id key with the
+(post_id, user_id) primary key and drops id, reaction_type and the indexes the new key makes redundant.
+On PostgreSQL the NOT NULL checks are added, then validated, and the unique index is built, each in a transaction
+of its own that does not block writes for longer than a catalog change; only the final catalog changes take a short
+ACCESS EXCLUSIVE lock together. SQLite rebuilds the table WITHOUT ROWID, clustered on
+the new key.
+
+Revision ID: e2f4b9d87c36
+Revises: d5a8c3e61b07
+Create Date: 2026-10-20 09:40:57.218930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f4b9d87c36'
+down_revision = 'd5a8c3e61b07'
+branch_labels = None
+depends_on = None
+
+NOT_NULL_COLUMNS = ('kind', 'post_id', 'user_id')
+# The expand revision's trigger, recreated by the downgrade
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION reaction_sync_kind() RETURNS trigger AS $$
+BEGIN
+    IF NEW.kind IS NULL OR (TG_OP = 'UPDATE' AND NEW.reaction_type IS DISTINCT FROM OLD.reaction_type) THEN
+        NEW.kind := CASE NEW.reaction_type WHEN 'like' THEN 1 WHEN 'dislike' THEN 2 END;
+    ELSIF NEW.reaction_type IS NULL OR (TG_OP = 'UPDATE' AND NEW.kind IS DISTINCT FROM OLD.kind) THEN
+        NEW.reaction_type := CASE NEW.kind WHEN 1 THEN 'like' WHEN 2 THEN 'dislike' END;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+SYNC_TRIGGER = """
+CREATE TRIGGER reaction_sync_kind BEFORE INSERT OR UPDATE ON reaction
+FOR EACH ROW EXECUTE PROCEDURE reaction_sync_kind()
+"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Development databases: finish the backfill inline, keeping the latest of duplicate reactions
+        op.execute("UPDATE reaction SET kind = CASE reaction_type WHEN 'like' THEN 1 WHEN 'dislike' THEN 2 END WHERE kind IS NULL")
+        op.execute('DELETE FROM reaction WHERE id NOT IN (SELECT max(id) FROM reaction GROUP BY post_id, user_id)')
+        op.drop_index('ix_reaction_post_id', table_name='reaction')
+        op.drop_index('ix_reaction_id', table_name='reaction')
+        with op.batch_alter_table('reaction', recreate='always', table_kwargs={'sqlite_with_rowid': False}) as batch_op:
+            batch_op.drop_column('id')
+            batch_op.drop_column('reaction_type')
+            for column in NOT_NULL_COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.SmallInteger() if column == 'kind' else sa.Integer(), nullable=False)
+            batch_op.create_primary_key('reaction_pkey', ['post_id', 'user_id'])
+        return
+
+    # Validated CHECK constraints let SET NOT NULL skip its full scan under the exclusive lock. Every statement of
+    # the block commits on its own: ADD ... NOT VALID releases its ACCESS EXCLUSIVE lock at once, and VALIDATE
+    # scans the table under a SHARE UPDATE EXCLUSIVE lock, which lets the writes through.
+    with op.get_context().autocommit_block():
+        for column in NOT_NULL_COLUMNS:
+            op.execute(f'ALTER TABLE reaction ADD CONSTRAINT reaction_{column}_not_null CHECK ({column} IS NOT NULL) NOT VALID')
+        for column in NOT_NULL_COLUMNS:
+            op.execute(f'ALTER TABLE reaction VALIDATE CONSTRAINT reaction_{column}_not_null')
+        op.create_index('reaction_post_id_user_id', 'reaction', ['post_id', 'user_id'], unique=True, postgresql_concurrently=True)
+    for column in NOT_NULL_COLUMNS:
+        op.alter_column('reaction', column, nullable=False)
+        op.drop_constraint(f'reaction_{column}_not_null', 'reaction', type_='check')
+    op.drop_constraint('reaction_pkey', 'reaction', type_='primary')
+    op.execute('ALTER TABLE reaction ADD CONSTRAINT reaction_pkey PRIMARY KEY USING INDEX reaction_post_id_user_id')
+    op.execute('DROP TRIGGER reaction_sync_kind ON reaction')
+    op.execute('DROP FUNCTION reaction_sync_kind()')
+    op.drop_index('ix_reaction_post_id', table_name='reaction')
+    op.drop_index('ix_reaction_id', table_name='reaction')
+    op.drop_column('reaction', 'reaction_type')
+    op.drop_column('reaction', 'id')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('reaction', recreate='always', table_kwargs={'sqlite_with_rowid': True}) as batch_op:
+            batch_op.drop_constraint('reaction_pkey', type_='primary')
+            batch_op.add_column(sa.Column('id', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('reaction_type', sa.String(), nullable=True))
+            batch_op.alter_column('kind', existing_type=sa.SmallInteger(), nullable=True)
+        op.execute('UPDATE reaction SET id = rowid')
+        op.execute("UPDATE reaction SET reaction_type = CASE kind WHEN 1 THEN 'like' WHEN 2 THEN 'dislike' END")
+        with op.batch_alter_table('reaction', recreate='always') as batch_op:
+            batch_op.alter_column('id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_primary_key('reaction_pkey', ['id'])
+            batch_op.alter_column('post_id', existing_type=sa.Integer(), nullable=True)
+            batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+        op.create_index('ix_reaction_id', 'reaction', ['id'], unique=False)
+        op.create_index('ix_reaction_post_id', 'reaction', ['post_id'], unique=False)
+        return
+
+    op.add_column('reaction', sa.Column('reaction_type', sa.String(), nullable=True))
+    op.execute("UPDATE reaction SET reaction_type = CASE kind WHEN 1 THEN 'like' WHEN 2 THEN 'dislike' END")
+    op.execute('ALTER TABLE reaction ADD COLUMN id SERIAL')
+    op.drop_constraint('reaction_pkey', 'reaction', type_='primary')
+    op.create_primary_key('reaction_pkey', 'reaction', ['id'])
+    op.alter_column('reaction', 'kind', nullable=True)
+    op.alter_column('reaction', 'post_id', nullable=True)
+    op.alter_column('reaction', 'user_id', nullable=True)
+    op.create_index('ix_reaction_id', 'reaction', ['id'], unique=False)
+    op.create_index('ix_reaction_post_id', 'reaction', ['post_id'], unique=False)
+    op.execute(SYNC_FUNCTION)
+    op.execute(SYNC_TRIGGER)
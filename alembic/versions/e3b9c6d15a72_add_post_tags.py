@@ -0,0 +1,41 @@
+"""Add post tags
+
+Revision ID: e3b9c6d15a72
+Revises: d8a4f27c1e90
+Create Date: 2026-10-19 16:40:12.385517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9c6d15a72'
+down_revision = 'd8a4f27c1e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_tag',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ),
+    sa.PrimaryKeyConstraint('post_id', 'tag')
+    )
+    op.create_index('ix_post_tag_created_at', 'post_tag', ['created_at'], unique=False)
+    op.create_index('ix_post_tag_tag_post_id', 'post_tag', ['tag', sa.text('post_id DESC')], unique=False)
+    op.create_table('tag_trend',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('uses', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket', 'tag')
+    )
+
+
+def downgrade():
+    op.drop_table('tag_trend')
+    op.drop_index('ix_post_tag_tag_post_id', table_name='post_tag')
+    op.drop_index('ix_post_tag_created_at', table_name='post_tag')
+    op.drop_table('post_tag')
@@ -0,0 +1,44 @@
+"""Add comments
+
+Revision ID: f6c2a9e8d413
+Revises: e3b9c6d15a72
+Create Date: 2026-10-19 18:03:55.027164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2a9e8d413'
+down_revision = 'e3b9c6d15a72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('comment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String().with_variant(sa.String(collation='C'), 'postgresql'), nullable=True),
+    sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['parent_id'], ['comment.id'], ),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_comment_post_id_depth_id', 'comment', ['post_id', 'depth', sa.text('id DESC')], unique=False)
+    op.create_index('ix_comment_post_id_path', 'comment', ['post_id', 'path'], unique=False)
+    op.add_column('post', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('post', 'comment_count')
+    op.drop_index('ix_comment_post_id_path', table_name='comment')
+    op.drop_index('ix_comment_post_id_depth_id', table_name='comment')
+    op.drop_table('comment')
@@ -0,0 +1,198 @@
+"""Helpers shared by the benchmark scripts: environment setup, statistics, reports and baseline comparison."""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DSN = "sqlite:///{0}?check_same_thread=false".format(Path(tempfile.gettempdir()) / "social-network-bench.db")
+
+Report = Dict[str, Any]
+
+
+def configure_environment(dsn: Optional[str]) -> str:
+    """
+    Point the application at the benchmark database. Must be called before anything from src is imported,
+    because the settings and the engine are created at import time.
+
+    :param dsn: Optional[str] - database DSN; DATABASE_DSN or a SQLite file in the temp directory if not given
+    :return: str - DSN in use
+    """
+    dsn = dsn or os.environ.get("DATABASE_DSN") or DEFAULT_DSN
+    os.environ["DATABASE_DSN"] = dsn
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    # Measure the application, not the diagnostics: they can be turned back on through the environment
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("QUERY_BUDGET_MODE", "off")
+    os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+    # The scenarios send far more requests per user and IP than the rate limits allow
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+    return dsn
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Get a percentile of the values with the nearest-rank method.
+
+    :param sorted_values: Sequence[float] - values in ascending order
+    :param fraction: float - percentile as a fraction, e.g. 0.95
+    :return: float - percentile, 0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """
+    Summarize the latencies of one scenario.
+
+    :param latencies: List[float] - latency of every successful operation, in seconds
+    :param errors: int - number of failed operations
+    :param elapsed: float - wall clock duration of the scenario, in seconds
+    :return: Dict[str, Any] - counts, throughput and latency percentiles in milliseconds
+    """
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def git_revision() -> Optional[str]:
+    """
+    Get the commit the benchmark runs on.
+
+    :return: Optional[str] - short commit hash with a "-dirty" suffix for uncommitted changes, None outside git
+    """
+    try:
+        revision = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{revision}-dirty" if dirty else revision
+
+
+def make_report(suite: str, parameters: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> Report:
+    """
+    Build the JSON report of a run.
+
+    :param suite: str - benchmark suite name
+    :param parameters: Dict[str, Any] - parameters of the run
+    :param results: Dict[str, Dict[str, Any]] - results by scenario name
+    :return: Report - report with the environment metadata
+    """
+    return {
+        "suite": suite,
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+def write_report(report: Report, output: Optional[str]) -> None:
+    """
+    Write the report as JSON to a file, or to stdout.
+
+    :param report: Report - report to write
+    :param output: Optional[str] - file path, stdout if not given
+    :return: None
+    """
+    text = json.dumps(report, indent=2, sort_keys=False)
+    if output:
+        Path(output).write_text(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+def load_report(path: str) -> Report:
+    """
+    Read a stored report.
+
+    :param path: str - file path
+    :return: Report - report
+    """
+    return json.loads(Path(path).read_text())
+
+
+def find_regressions(
+    report: Report,
+    baseline: Report,
+    threshold: float,
+    lower_is_better: Sequence[str] = (),
+    higher_is_better: Sequence[str] = (),
+) -> List[str]:
+    """
+    Compare the results of a run with a baseline run. Scenarios missing from either run are skipped.
+
+    :param report: Report - current run
+    :param baseline: Report - baseline run
+    :param threshold: float - allowed relative change, e.g. 0.1 for 10%
+    :param lower_is_better: Sequence[str] - result fields that regress when they grow (latencies)
+    :param higher_is_better: Sequence[str] - result fields that regress when they shrink (throughput)
+    :return: List[str] - description of every regression
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if not reference:
+            continue
+        for field in lower_is_better:
+            current, previous = result.get(field), reference.get(field)
+            if current is not None and previous and current > previous * (1 + threshold):
+                regressions.append(f"{name}.{field}: {previous} -> {current} (+{(current / previous - 1):.0%})")
+        for field in higher_is_better:
+            current, previous = result.get(field), reference.get(field)
+            if current is not None and previous and current < previous * (1 - threshold):
+                regressions.append(f"{name}.{field}: {previous} -> {current} (-{(1 - current / previous):.0%})")
+    return regressions
+
+
+def check_baseline(
+    report: Report,
+    baseline_path: Optional[str],
+    threshold: float,
+    lower_is_better: Sequence[str] = (),
+    higher_is_better: Sequence[str] = (),
+) -> int:
+    """
+    Print the regressions against the baseline, if one is given.
+
+    :param report: Report - current run
+    :param baseline_path: Optional[str] - path of the stored baseline report
+    :param threshold: float - allowed relative change
+    :param lower_is_better: Sequence[str] - result fields that regress when they grow
+    :param higher_is_better: Sequence[str] - result fields that regress when they shrink
+    :return: int - process exit code: 1 if anything regressed, 0 otherwise
+    """
+    if not baseline_path:
+        return 0
+    baseline = load_report(baseline_path)
+    regressions = find_regressions(report, baseline, threshold, lower_is_better, higher_is_better)
+    for regression in regressions:
+        sys.stderr.write(f"REGRESSION {regression}\n")
+    if not regressions:
+        sys.stderr.write(f"No regressions over {threshold:.0%} against {baseline.get('revision') or baseline_path}\n")
+    return 1 if regressions else 0
@@ -0,0 +1,299 @@
+"""Asyncio load scenarios, driving the ASGI app in-process or a running server over HTTP.
+
+    python -m benchmarks.seed --reset
+    python -m benchmarks.load --concurrency 20 --duration 10 --output current.json
+    python -m benchmarks.load --baseline baseline.json --threshold 0.15
+
+Scenarios:
+    feed         GET /users/{username}/posts, first page of a random seeded author
+    all_posts    GET /posts/ (every post in the database; not run by default)
+    create_post  POST /posts/ by a random seeded user
+    like_storm   POST /posts/like on one hot post by many users at once (likes toggle on and off)
+    signup       POST /auth/signup with a fresh username
+    login        POST /auth/login of a random seeded user
+
+In-process runs use the same database as benchmarks.seed and replace the ClearBit/EmailHunter client with an
+offline one. Over HTTP (--url) the server's own configuration applies, including those external calls on signup.
+Results are written as JSON; with --baseline the exit code is 1 when a latency or the throughput regresses
+by more than --threshold.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from benchmarks.common import check_baseline, configure_environment, make_report, summarize, write_report
+from benchmarks.seed import BENCH_PASSWORD
+
+API = "/api_v1"
+DEFAULT_SCENARIOS = ("feed", "create_post", "like_storm", "signup", "login")
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    usernames: List[str]
+    headers: Dict[str, Dict[str, str]]
+    hot_post_id: int = 0
+    rng: random.Random = field(default_factory=random.Random)
+
+
+Operation = Callable[[Context], Awaitable[httpx.Response]]
+SCENARIOS: Dict[str, Operation] = {}
+
+
+def scenario(name: str) -> Callable[[Operation], Operation]:
+    """
+    Register a scenario; the operation sends one request.
+
+    :param name: str - scenario name
+    :return: Callable - decorator
+    """
+
+    def register(operation: Operation) -> Operation:
+        SCENARIOS[name] = operation
+        return operation
+
+    return register
+
+
+@scenario("feed")
+async def feed(ctx: Context) -> httpx.Response:
+    return await ctx.client.get(f"{API}/users/{ctx.rng.choice(ctx.usernames)}/posts")
+
+
+@scenario("all_posts")
+async def all_posts(ctx: Context) -> httpx.Response:
+    return await ctx.client.get(f"{API}/posts/")
+
+
+@scenario("create_post")
+async def create_post(ctx: Context) -> httpx.Response:
+    username = ctx.rng.choice(ctx.usernames)
+    text = f"load test post {uuid.uuid4().hex}"
+    return await ctx.client.post(f"{API}/posts/", json=text, headers=ctx.headers[username])
+
+
+@scenario("like_storm")
+async def like_storm(ctx: Context) -> httpx.Response:
+    # The first user wrote the hot post and cannot like it
+    username = ctx.rng.choice(ctx.usernames[1:])
+    params = {"post_id": ctx.hot_post_id}
+    return await ctx.client.post(f"{API}/posts/like", params=params, headers=ctx.headers[username])
+
+
+@scenario("signup")
+async def signup(ctx: Context) -> httpx.Response:
+    username = "load" + uuid.uuid4().hex[:16]
+    return await ctx.client.post(
+        f"{API}/auth/signup",
+        params={"username": username, "password": BENCH_PASSWORD, "email": f"{username}@example.com"},
+    )
+
+
+@scenario("login")
+async def login(ctx: Context) -> httpx.Response:
+    username = ctx.rng.choice(ctx.usernames)
+    return await ctx.client.post(f"{API}/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+
+
+class OfflineUserClient:
+    """Stands in for UserClient in-process, so signups do not call ClearBit and EmailHunter."""
+
+    async def email_verifier(self, email: str) -> bool:
+        return True
+
+    async def get_additional_data(self, email: str) -> None:
+        return None
+
+
+@asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[None]:
+    """
+    Run the startup and shutdown handlers of an ASGI app, which httpx.ASGITransport does not do.
+
+    :param app: Any - ASGI application
+    :return: AsyncIterator[None] - context in which the app is started
+    """
+    received: asyncio.Queue = asyncio.Queue()
+    sent: asyncio.Queue = asyncio.Queue()
+    scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+    task = asyncio.create_task(app(scope, received.get, sent.put))
+    await received.put({"type": "lifespan.startup"})
+    message = await sent.get()
+    if message["type"] == "lifespan.startup.failed":
+        raise RuntimeError(message.get("message") or "Application startup failed")
+    try:
+        yield
+    finally:
+        await received.put({"type": "lifespan.shutdown"})
+        await sent.get()
+        await task
+
+
+@asynccontextmanager
+async def open_client(url: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open a client for a server, or for the app in-process.
+
+    :param url: Optional[str] - server URL, in-process if not given
+    :return: AsyncIterator[httpx.AsyncClient] - client
+    """
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            yield client
+        return
+
+    from src.deps import user_client
+    from src.main import app
+
+    app.dependency_overrides[user_client] = OfflineUserClient
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+async def prepare(client: httpx.AsyncClient, pool_size: int, first_user_id: int) -> Context:
+    """
+    Log in the seeded users used by the scenarios and create the hot post of the like storm.
+
+    :param client: httpx.AsyncClient - client
+    :param pool_size: int - number of seeded users to log in
+    :param first_user_id: int - ID of the first seeded user
+    :return: Context - scenario context
+    """
+    usernames = []
+    headers = {}
+    for user_id in range(first_user_id, first_user_id + pool_size):
+        username = f"bench{user_id}"
+        response = await client.post(f"{API}/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+        if response.status_code != 200:
+            continue
+        usernames.append(username)
+        headers[username] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    if len(usernames) < 2:
+        raise SystemExit("Could not log in the seeded users, run python -m benchmarks.seed first")
+
+    response = await client.post(f"{API}/posts/", json="The hot post of the like storm", headers=headers[usernames[0]])
+    response.raise_for_status()
+    return Context(client=client, usernames=usernames, headers=headers, hot_post_id=response.json()["id"])
+
+
+async def run_scenario(
+    ctx: Context, operation: Operation, concurrency: int, duration: float, requests: int, warmup: int
+) -> Dict[str, Any]:
+    """
+    Run one scenario with concurrent workers until the duration or the number of requests is reached.
+
+    :param ctx: Context - scenario context
+    :param operation: Operation - operation of the scenario
+    :param concurrency: int - number of concurrent workers
+    :param duration: float - time limit in seconds
+    :param requests: int - request limit, 0 for no limit
+    :param warmup: int - requests sent before measuring
+    :return: Dict[str, Any] - summary of the scenario
+    """
+    for _ in range(warmup):
+        await operation(ctx)
+
+    latencies: List[float] = []
+    errors = 0
+    sent = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors, sent
+        while time.perf_counter() < deadline and (not requests or sent < requests):
+            sent += 1
+            start = time.perf_counter()
+            try:
+                response = await operation(ctx)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the selected scenarios one after another.
+
+    :param args: argparse.Namespace - command line arguments
+    :return: Dict[str, Dict[str, Any]] - summaries by scenario name
+    """
+    results = {}
+    async with open_client(args.url) as client:
+        ctx = await prepare(client, args.users_pool, args.first_user_id)
+        ctx.rng.seed(args.seed)
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                ctx, SCENARIOS[name], args.concurrency, args.duration, args.requests, args.warmup
+            )
+            sys.stderr.write(f"{name}: {results[name]}\n")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--dsn", help="database DSN for in-process runs (default: the one used by benchmarks.seed)")
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(DEFAULT_SCENARIOS),
+        help=f"comma separated, from: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--requests", type=int, default=0, help="requests per scenario (0: until --duration)")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--users-pool", type=int, default=20, help="seeded users logged in for the scenarios")
+    parser.add_argument("--first-user-id", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON report file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    dsn = None if args.url else configure_environment(args.dsn)
+
+    results = asyncio.run(run(args))
+    parameters = {
+        key: getattr(args, key) for key in ("url", "scenarios", "concurrency", "duration", "requests", "users_pool")
+    }
+    parameters["database"] = make_url(dsn).get_backend_name() if dsn else None
+    report = make_report("load", parameters, results)
+    write_report(report, args.output)
+    sys.exit(
+        check_baseline(
+            report,
+            args.baseline,
+            args.threshold,
+            lower_is_better=("p50_ms", "p95_ms", "p99_ms"),
+            higher_is_better=("throughput_rps",),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
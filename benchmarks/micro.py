@@ -0,0 +1,229 @@
+"""Micro-benchmarks of the per-request primitives, each measured on its own.
+
+    python -m benchmarks.micro --output baseline.json
+    python -m benchmarks.micro --filter bcrypt --bcrypt-rounds 10,12
+    python -m benchmarks.micro --baseline baseline.json --threshold 0.1
+
+Benchmarks:
+    jwt_encode                         AuthRepo.__create_token of an access token
+    jwt_decode                         the jwt.decode of deps.get_current_user
+    bcrypt_hash[rounds=N]              get_password_hash at the configured cost, PWD_CONTEXT at the other
+                                       costs of --bcrypt-rounds
+    bcrypt_verify[rounds=N]            verify_password of a hash of each cost
+    post_build[items=N]                constructing N Post schemas from dicts
+    post_response[items=N]             response_model=List[Post] validation and serialization of N posts
+    crud_get / crud_create / crud_update  CRUDBase methods on an in-memory SQLite database
+
+Every benchmark is repeated --repeat times; each repetition runs the operation for at least --min-time seconds.
+The reported times are per operation, in microseconds. With --baseline the exit code is 1 when the median of
+a benchmark grew by more than --threshold.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from benchmarks.common import check_baseline, configure_environment, make_report, write_report
+
+Benchmark = Tuple[str, Callable[[], Any]]
+
+
+def measure(operation: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """
+    Time an operation. Coroutine functions are awaited in a loop inside one event loop run.
+
+    :param operation: Callable[[], Any] - operation to time
+    :param repeat: int - number of repetitions
+    :param min_time: float - minimum duration of a repetition, in seconds
+    :return: Dict[str, Any] - per operation times in microseconds
+    """
+    is_async = asyncio.iscoroutinefunction(operation)
+
+    async def run_async(loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await operation()
+        return time.perf_counter() - start
+
+    def run(loops: int) -> float:
+        if is_async:
+            return asyncio.run(run_async(loops))
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        return time.perf_counter() - start
+
+    # Calibrate the number of loops per repetition, like timeit.autorange
+    loops = 1
+    while True:
+        elapsed = run(loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / elapsed) + 1) if elapsed else loops * 10
+
+    timings = [elapsed / loops] + [run(loops) / loops for _ in range(repeat - 1)]
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "best_us": round(min(timings) * 1e6, 3),
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "ops_per_s": round(1 / statistics.median(timings), 1),
+    }
+
+
+def jwt_benchmarks() -> Iterator[Benchmark]:
+    """
+    Build the token creation and decoding benchmarks.
+
+    :return: Iterator[Benchmark] - named operations
+    """
+    from jose import jwt
+
+    from src.config import settings
+    from src.core.repository import AuthRepo
+
+    repo = AuthRepo(db=None)
+    lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    token = repo._AuthRepo__create_token(token_type="access_token", lifetime=lifetime, user_id=1)
+
+    yield "jwt_encode", lambda: repo._AuthRepo__create_token(token_type="access_token", lifetime=lifetime, user_id=1)
+    yield "jwt_decode", lambda: jwt.decode(
+        token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM], options={"verify_aud": False}
+    )
+
+
+def configured_bcrypt_rounds() -> int:
+    """
+    Get the bcrypt cost the application hashes the passwords with, read from a hash of get_password_hash.
+
+    :return: int - bcrypt cost (log2 of the rounds)
+    """
+    from passlib.hash import bcrypt
+
+    from src.config.security import get_password_hash
+
+    return bcrypt.from_string(get_password_hash("benchmark")).rounds
+
+
+def bcrypt_benchmarks(rounds: List[int]) -> Iterator[Benchmark]:
+    """
+    Build the password hashing benchmarks, one pair per cost. The configured cost is hashed with the functions of
+    the application; verify_password reads the cost from the hash, so it serves every cost.
+
+    :param rounds: List[int] - bcrypt costs (log2 of the rounds)
+    :return: Iterator[Benchmark] - named operations
+    """
+    from src.config.security import PWD_CONTEXT, get_password_hash, verify_password
+
+    configured = configured_bcrypt_rounds()
+    for cost in rounds:
+        if cost == configured:
+            hash_password = get_password_hash
+        else:
+            hash_password = PWD_CONTEXT.copy(bcrypt__default_rounds=cost).hash
+        hashed = hash_password("benchmark")
+        yield f"bcrypt_hash[rounds={cost}]", lambda hash_password=hash_password: hash_password("benchmark")
+        yield f"bcrypt_verify[rounds={cost}]", lambda hashed=hashed: verify_password("benchmark", hashed)
+
+
+def schema_benchmarks(sizes: List[int]) -> Iterator[Benchmark]:
+    """
+    Build the Post construction and response validation benchmarks.
+
+    :param sizes: List[int] - numbers of posts
+    :return: Iterator[Benchmark] - named operations
+    """
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from src.core.schemas import Post
+
+    field = create_response_field(name="Response_show_posts", type_=List[Post])
+    for size in sizes:
+        rows = [
+            {
+                "id": post_id,
+                "text": f"post number {post_id} #benchmark",
+                "publication_date": date(2026, 1, 1),
+                "likes": post_id % 100,
+                "dislikes": post_id % 10,
+                "author": f"bench{post_id % 50 + 1}",
+            }
+            for post_id in range(1, size + 1)
+        ]
+        posts = [Post(**row) for row in rows]
+
+        async def respond(posts: List[Post] = posts) -> Any:
+            return await serialize_response(field=field, response_content=posts)
+
+        yield f"post_build[items={size}]", lambda rows=rows: [Post(**row) for row in rows]
+        yield f"post_response[items={size}]", respond
+
+
+def crud_benchmarks() -> Iterator[Benchmark]:
+    """
+    Build the CRUDBase benchmarks against an in-memory SQLite database.
+
+    :return: Iterator[Benchmark] - named operations
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from src.core.crud import CRUDBase
+    from src.core.models import Base, Post, User
+    from src.core.schemas import PostCreate
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    user = User(username="bench1", email="bench1@example.com", hashed_password="-")
+    db.add(user)
+    db.commit()
+
+    crud = CRUDBase(Post)
+    post = crud.create(db=db, obj_in=PostCreate(text="benchmark", author_id=user.id))
+    counter = iter(range(1, sys.maxsize))
+
+    yield "crud_get", lambda: crud.get(db=db, id=post.id)
+    yield "crud_create", lambda: crud.create(db=db, obj_in=PostCreate(text="benchmark", author_id=user.id))
+    yield "crud_update", lambda: crud.update(db=db, db_obj=post, obj_in={"text": f"edited {next(counter)}"})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="run only the benchmarks whose name contains this text")
+    parser.add_argument("--bcrypt-rounds", type=lambda value: [int(cost) for cost in value.split(",")], default=None)
+    parser.add_argument("--items", type=lambda value: [int(size) for size in value.split(",")], default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repetition")
+    parser.add_argument("--output", help="JSON report file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args()
+
+    configure_environment("sqlite://")
+    # The configured cost, and the minimum cost to show how the time scales
+    rounds = args.bcrypt_rounds or sorted({4, configured_bcrypt_rounds()})
+
+    results = {}
+    groups = (jwt_benchmarks(), bcrypt_benchmarks(rounds), schema_benchmarks(args.items), crud_benchmarks())
+    for group in groups:
+        for name, operation in group:
+            if args.filter not in name:
+                continue
+            results[name] = measure(operation, args.repeat, args.min_time)
+            sys.stderr.write(f"{name}: {results[name]['median_us']} us\n")
+
+    parameters = {"filter": args.filter, "bcrypt_rounds": rounds, "items": args.items, "repeat": args.repeat}
+    report = make_report("micro", parameters, results)
+    write_report(report, args.output)
+    sys.exit(check_baseline(report, args.baseline, args.threshold, lower_is_better=("median_us",)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Size of the reaction table and its indexes before and after the composite key migration.
+
+    python -m benchmarks.reaction_storage --rows 1000000 --output current.json
+    python -m benchmarks.reaction_storage --dsn postgresql://bench@localhost/bench --rows 10000000
+    python -m benchmarks.reaction_storage --baseline baseline.json --threshold 0.05
+
+Layouts:
+    surrogate  id primary key plus ix_reaction_id, ix_reaction_post_id and a "like"/"dislike" string
+    composite  (post_id, user_id) primary key, ix_reaction_user_id_post_id and a smallint kind
+
+Both layouts are created in the given database as separate tables, without the foreign keys (they take no
+space), filled with the same --rows random (post, user) pairs and dropped at the end unless --keep is given.
+Sizes come from pg_relation_size/pg_indexes_size on PostgreSQL and from dbstat on SQLite, after a VACUUM
+(ANALYZE). The size of each layout at --project rows is extrapolated from the bytes per row: B-tree sizes grow
+linearly with the number of rows once the table is past a few thousand pages. Every layout is also timed on
+the lookup of one reaction by (post_id, user_id), as done on every like and dislike. With --baseline the exit
+code is 1 when the total size or the lookup time grew by more than --threshold.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    bindparam,
+    create_engine,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from benchmarks.common import check_baseline, make_report, write_report
+
+DEFAULT_DSN = "sqlite:///{0}".format(Path(tempfile.gettempdir()) / "social-network-reaction-storage.db")
+INSERT_CHUNK = 10000
+
+metadata = MetaData()
+
+surrogate = Table(
+    "bench_reaction_surrogate",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("post_id", Integer),
+    Column("user_id", Integer),
+    Column("reaction_type", String),
+    Index("ix_bench_reaction_surrogate_id", "id"),
+    Index("ix_bench_reaction_surrogate_post_id", "post_id"),
+)
+
+composite = Table(
+    "bench_reaction_composite",
+    metadata,
+    Column("post_id", Integer, primary_key=True),
+    Column("user_id", Integer, primary_key=True),
+    Column("kind", SmallInteger, nullable=False),
+    Index("ix_bench_reaction_composite_user_id_post_id", "user_id", "post_id"),
+    sqlite_with_rowid=False,
+)
+
+LAYOUTS = {"surrogate": surrogate, "composite": composite}
+
+
+def generate_pairs(rows: int, posts: int, users: int, seed: int) -> List[Tuple[int, int]]:
+    """
+    Draw distinct (post_id, user_id) pairs, in random order like reactions arrive.
+
+    :param rows: int - number of pairs
+    :param posts: int - number of posts to draw from
+    :param users: int - number of users to draw from
+    :param seed: int - random seed
+    :return: List[Tuple[int, int]] - pairs
+    """
+    if rows > posts * users:
+        raise ValueError("--rows is larger than --posts times --users")
+    rng = random.Random(seed)
+    codes = rng.sample(range(posts * users), rows)
+    return [(code // users + 1, code % users + 1) for code in codes]
+
+
+def layout_rows(name: str, pairs: List[Tuple[int, int]], like_ratio: float, seed: int) -> Iterator[Dict[str, Any]]:
+    """
+    Get the rows of a layout; both layouts get the same reaction types.
+
+    :param name: str - layout name
+    :param pairs: List[Tuple[int, int]] - (post_id, user_id) pairs
+    :param like_ratio: float - share of likes
+    :param seed: int - random seed
+    :return: Iterator[Dict[str, Any]] - rows to insert
+    """
+    rng = random.Random(seed)
+    for post_id, user_id in pairs:
+        like = rng.random() < like_ratio
+        if name == "surrogate":
+            yield {"post_id": post_id, "user_id": user_id, "reaction_type": "like" if like else "dislike"}
+        else:
+            yield {"post_id": post_id, "user_id": user_id, "kind": 1 if like else 2}
+
+
+def fill(engine: Engine, table: Table, rows: Iterator[Dict[str, Any]]) -> None:
+    """
+    Insert the rows in chunks of INSERT_CHUNK, one transaction per chunk.
+
+    :param engine: Engine - database engine
+    :param table: Table - layout table
+    :param rows: Iterator[Dict[str, Any]] - rows to insert
+    :return: None
+    """
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == INSERT_CHUNK:
+            with engine.begin() as connection:
+                connection.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as connection:
+            connection.execute(table.insert(), chunk)
+
+
+def vacuum(engine: Engine) -> None:
+    """
+    Compact the tables and refresh the planner statistics, so the sizes do not depend on the insert history.
+
+    :param engine: Engine - database engine
+    :return: None
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "postgresql":
+            for table in LAYOUTS.values():
+                connection.execute(text(f"VACUUM ANALYZE {table.name}"))
+        else:
+            connection.execute(text("VACUUM"))
+            connection.execute(text("ANALYZE"))
+
+
+def measure_size(connection: Connection, table: Table) -> Tuple[int, int]:
+    """
+    Get the on-disk size of a table and of its indexes.
+
+    :param connection: Connection - database connection
+    :param table: Table - layout table
+    :return: Tuple[int, int] - table bytes, index bytes (the primary key index included)
+    """
+    if connection.dialect.name == "postgresql":
+        row = connection.execute(
+            text("SELECT pg_relation_size(CAST(:name AS regclass)), pg_indexes_size(CAST(:name AS regclass))"),
+            {"name": table.name},
+        ).one()
+        return row[0], row[1]
+    # The rowid B-tree holds the rows; every other B-tree of the table is an index, automatic ones included
+    sizes = connection.execute(
+        text(
+            "SELECT m.type, SUM(d.pgsize) FROM dbstat d JOIN sqlite_master m ON m.name = d.name "
+            "WHERE m.tbl_name = :name GROUP BY m.type"
+        ),
+        {"name": table.name},
+    ).all()
+    sizes = dict(sizes)
+    return sizes.get("table", 0), sizes.get("index", 0)
+
+
+def time_lookups(connection: Connection, table: Table, pairs: List[Tuple[int, int]], lookups: int) -> float:
+    """
+    Time the lookup of one reaction by (post_id, user_id).
+
+    :param connection: Connection - database connection
+    :param table: Table - layout table
+    :param pairs: List[Tuple[int, int]] - existing pairs to look up
+    :param lookups: int - number of lookups
+    :return: float - median lookup time, in microseconds
+    """
+    query = select(table).where(table.c.post_id == bindparam("post_id"), table.c.user_id == bindparam("user_id"))
+    rng = random.Random(0)
+    timings = []
+    for post_id, user_id in rng.sample(pairs, min(lookups, len(pairs))):
+        started = time.perf_counter()
+        connection.execute(query, {"post_id": post_id, "user_id": user_id}).first()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1e6 if timings else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=DEFAULT_DSN, help="database DSN (default: a SQLite file in the temp dir)")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--like-ratio", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--project", type=int, default=100000000, help="number of rows to extrapolate the sizes to")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--keep", action="store_true", help="keep the tables after the run")
+    parser.add_argument("--output", help="JSON report file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=0.05, help="allowed relative regression")
+    args = parser.parse_args()
+
+    engine = create_engine(args.dsn)
+    pairs = generate_pairs(args.rows, args.posts, args.users, args.seed)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        for name, table in LAYOUTS.items():
+            started = time.perf_counter()
+            fill(engine, table, layout_rows(name, pairs, args.like_ratio, args.seed))
+            sys.stderr.write(f"{name}: inserted {args.rows} rows in {time.perf_counter() - started:.1f} s\n")
+        vacuum(engine)
+
+        results = {}
+        with engine.connect() as connection:
+            for name, table in LAYOUTS.items():
+                table_bytes, index_bytes = measure_size(connection, table)
+                total_bytes = table_bytes + index_bytes
+                results[name] = {
+                    "rows": args.rows,
+                    "table_bytes": table_bytes,
+                    "index_bytes": index_bytes,
+                    "total_bytes": total_bytes,
+                    "bytes_per_row": round(total_bytes / args.rows, 2),
+                    "projected_total_gb": round(total_bytes / args.rows * args.project / 1e9, 2),
+                    "lookup_median_us": round(time_lookups(connection, table, pairs, args.lookups), 3),
+                }
+                sys.stderr.write(f"{name}: {results[name]['bytes_per_row']} bytes per row\n")
+        saved = 1 - results["composite"]["total_bytes"] / results["surrogate"]["total_bytes"]
+        sys.stderr.write(f"composite layout saves {saved:.0%} of the table and index size\n")
+    finally:
+        if not args.keep:
+            metadata.drop_all(engine)
+
+    parameters = {
+        "dialect": engine.dialect.name,
+        "rows": args.rows,
+        "posts": args.posts,
+        "users": args.users,
+        "like_ratio": args.like_ratio,
+        "project": args.project,
+    }
+    report = make_report("reaction_storage", parameters, results)
+    write_report(report, args.output)
+    sys.exit(check_baseline(report, args.baseline, args.threshold, lower_is_better=("total_bytes", "lookup_median_us")))
+
+
+if __name__ == "__main__":
+    main()
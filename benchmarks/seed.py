@@ -0,0 +1,202 @@
+"""Bulk-generate users, posts and reactions for the benchmarks.
+
+    python -m benchmarks.seed --users 10000 --posts 100000 --reactions 1000000
+
+Authors and reacted-to posts follow a Zipf distribution, so a few users write most of the posts and a few posts get
+most of the reactions. Generated users are named bench<id> and share the password BENCH_PASSWORD, hashed once.
+Rows are inserted in chunks with executemany, post counters are computed up front, user statistics are rebuilt
+afterwards and the change log is left empty. Seed an empty database so that the load scenarios find bench1, bench2, ...
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy.engine import make_url
+
+from benchmarks.common import configure_environment
+
+BENCH_PASSWORD = "benchmark"
+CHUNK_SIZE = 5000
+WORDS = (
+    "fastapi python postgres coffee weekend music travel photo code release bug fix sunny rain city book movie "
+    "game team launch deploy idea today tomorrow friends family garden running cycling pizza news"
+).split()
+TAGS = ("python", "fastapi", "travel", "music", "news", "photo", "coding", "weekend")
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """
+    Get the cumulative weights of a Zipf distribution over n ranks, for random.choices.
+
+    :param n: int - number of ranks
+    :param exponent: float - skew; 0 is uniform, around 1 is typical of social data
+    :return: List[float] - cumulative weights
+    """
+    return list(accumulate(1 / rank**exponent for rank in range(1, n + 1)))
+
+
+def chunked(rows: Sequence[Dict], size: int) -> Iterator[Sequence[Dict]]:
+    """
+    Split the rows into chunks.
+
+    :param rows: Sequence[Dict] - rows to insert
+    :param size: int - rows per chunk
+    :return: Iterator[Sequence[Dict]] - chunks
+    """
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def make_text(rng: random.Random) -> str:
+    """
+    Generate the text of a post; about one post in four carries a hashtag.
+
+    :param rng: random.Random - random generator
+    :return: str - post text
+    """
+    words = rng.choices(WORDS, k=rng.randint(4, 30))
+    if rng.random() < 0.25:
+        words.append("#" + rng.choice(TAGS))
+    return " ".join(words)
+
+
+def seed(
+    users: int, posts: int, reactions: int, exponent: float, like_ratio: float, seed_value: int, reset: bool
+) -> Dict[str, Any]:
+    """
+    Generate the data and insert it.
+
+    :param users: int - number of users to add
+    :param posts: int - number of posts to add
+    :param reactions: int - number of reactions to add; at most one per user and post, never on one's own post
+    :param exponent: float - Zipf exponent of the post authors and of the reacted-to posts
+    :param like_ratio: float - fraction of the reactions that are likes
+    :param seed_value: int - random seed, the same seed generates the same data
+    :param reset: bool - drop and recreate all tables first
+    :return: Dict[str, Any] - number of rows inserted and time spent
+    """
+    from sqlalchemy import func, text
+
+    from src.commands.rebuild_user_stats import rebuild_user_stats
+    from src.config import get_password_hash
+    from src.core.db import SessionLocal, init_engine
+    from src.core.models import Base, Post, Reaction, ReactionType, User
+
+    init_engine()
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        bind = db.get_bind()
+        if reset:
+            Base.metadata.drop_all(bind)
+        Base.metadata.create_all(bind)
+
+        first_user_id = (db.query(func.max(User.id)).scalar() or 0) + 1
+        first_post_id = (db.query(func.max(Post.id)).scalar() or 0) + 1
+        user_ids = list(range(first_user_id, first_user_id + users))
+        post_ids = list(range(first_post_id, first_post_id + posts))
+
+        # Shuffle the ranks, so that the popular users and posts are spread over the ID range
+        author_ranks = user_ids[:]
+        rng.shuffle(author_ranks)
+        authors = rng.choices(author_ranks, cum_weights=zipf_cum_weights(users, exponent), k=posts)
+        author_of = dict(zip(post_ids, authors))
+
+        post_ranks = post_ids[:]
+        rng.shuffle(post_ranks)
+        post_weights = zipf_cum_weights(posts, exponent)
+        pairs = set()
+        attempts = 0
+        while len(pairs) < reactions and attempts < reactions * 10:
+            batch = rng.choices(post_ranks, cum_weights=post_weights, k=min(reactions - len(pairs), CHUNK_SIZE * 10))
+            attempts += len(batch)
+            for post_id in batch:
+                user_id = rng.choice(user_ids)
+                if user_id != author_of[post_id]:
+                    pairs.add((post_id, user_id))
+
+        likes = dict.fromkeys(post_ids, 0)
+        dislikes = dict.fromkeys(post_ids, 0)
+        reaction_rows = []
+        for post_id, user_id in pairs:
+            kind = ReactionType.LIKE if rng.random() < like_ratio else ReactionType.DISLIKE
+            (likes if kind == ReactionType.LIKE else dislikes)[post_id] += 1
+            reaction_rows.append({"user_id": user_id, "post_id": post_id, "kind": int(kind)})
+        rng.shuffle(reaction_rows)
+
+        hashed_password = get_password_hash(BENCH_PASSWORD)
+        today = date.today()
+        user_rows = [
+            {
+                "id": user_id,
+                "username": f"bench{user_id}",
+                "name": "Bench",
+                "surname": f"User{user_id}",
+                "hashed_password": hashed_password,
+                "email": f"bench{user_id}@example.com",
+                "registration_date": today - timedelta(days=rng.randint(0, 3 * 365)),
+            }
+            for user_id in user_ids
+        ]
+        post_rows = [
+            {
+                "id": post_id,
+                "text": make_text(rng),
+                "publication_date": today - timedelta(days=rng.randint(0, 365)),
+                "likes": likes[post_id],
+                "dislikes": dislikes[post_id],
+                "author_id": author_of[post_id],
+            }
+            for post_id in post_ids
+        ]
+
+        tables = ((User.__table__, user_rows), (Post.__table__, post_rows), (Reaction.__table__, reaction_rows))
+        for table, rows in tables:
+            for chunk in chunked(rows, CHUNK_SIZE):
+                db.execute(table.insert(), chunk)
+            db.commit()
+
+        if bind.dialect.name == "postgresql":
+            # IDs were set explicitly, move the sequences past them
+            for table in ("user", "post"):
+                sequence = f"pg_get_serial_sequence('\"{table}\"', 'id')"
+                db.execute(text(f'SELECT setval({sequence}, (SELECT max(id) FROM "{table}"))'))
+            db.commit()
+
+    rebuild_user_stats(chunk_size=1000)
+    return {
+        "users": len(user_rows),
+        "posts": len(post_rows),
+        "reactions": len(reaction_rows),
+        "first_user_id": first_user_id,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", help="database DSN (default: DATABASE_DSN or a SQLite file in the temp directory)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--reactions", type=int, default=50000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew of authors and reacted-to posts")
+    parser.add_argument("--like-ratio", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    dsn = configure_environment(args.dsn)
+    summary = seed(args.users, args.posts, args.reactions, args.zipf, args.like_ratio, args.seed, args.reset)
+    summary["dsn"] = repr(make_url(dsn))
+    sys.stdout.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
 from .api_v1 import api_router
+from .health import router as health_router
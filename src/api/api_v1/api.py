@@ -1,8 +1,19 @@
 from fastapi import APIRouter
 
-from src.api.api_v1.endpoints import auth_router, post_router
+from src.api.api_v1.endpoints import (
+    analytics_router,
+    auth_router,
+    comment_router,
+    post_router,
+    tag_router,
+    user_router,
+)
 
 api_router = APIRouter()
 
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(post_router, prefix="/posts", tags=["posts"])
+api_router.include_router(user_router, prefix="/users", tags=["users"])
+api_router.include_router(tag_router, prefix="/tags", tags=["tags"])
+api_router.include_router(comment_router, prefix="/comments", tags=["comments"])
+api_router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
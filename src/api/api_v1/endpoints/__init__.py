@@ -1,2 +1,6 @@
+from .analytics import router as analytics_router
 from .auth import router as auth_router
+from .comment import router as comment_router
 from .post import router as post_router
+from .tag import router as tag_router
+from .user import router as user_router
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import PositiveInt
+
+from src.config import settings
+from src.core.db.query_budget import query_budget
+from src.core.metrics import TimedRoute
+from src.core.repository import AnalyticsRepo
+from src.core.schemas import ReactionSeries
+from src.deps import analytics_repo as deps_analytics_repo
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/posts/{post_id}/reactions", status_code=200, response_model=ReactionSeries)
+@query_budget(max_queries=2)
+async def show_post_reactions(
+    *,
+    post_id: PositiveInt,
+    resolution: str = Query(default="hour", regex="^(hour|day)$"),
+    buckets: Optional[int] = Query(default=None, ge=1, le=settings.ANALYTICS_MAX_BUCKETS),
+    analytics_repo: AnalyticsRepo = Depends(deps_analytics_repo),
+) -> ReactionSeries:
+    """
+    Get the likes and dislikes of a post per hour or per day.
+
+    :param post_id: int - ID of the post.
+    :param resolution: str - "hour" or "day".
+    :param buckets: Optional[int] - Number of hours or days, the current one included.
+    :param analytics_repo: AnalyticsRepo - Repository for the analytics.
+    :return: ReactionSeries - Net change of the likes and dislikes per bucket, oldest first.
+    """
+    return await analytics_repo.get_post_reactions(post_id=post_id, resolution=resolution, buckets=buckets)
+
+
+@router.get("/users/{username}/reactions", status_code=200, response_model=ReactionSeries)
+@query_budget(max_queries=2)
+async def show_author_reactions(
+    *,
+    username: str,
+    resolution: str = Query(default="hour", regex="^(hour|day)$"),
+    buckets: Optional[int] = Query(default=None, ge=1, le=settings.ANALYTICS_MAX_BUCKETS),
+    analytics_repo: AnalyticsRepo = Depends(deps_analytics_repo),
+) -> ReactionSeries:
+    """
+    Get the likes and dislikes of all the posts of a user per hour or per day.
+
+    :param username: str - Username of the author.
+    :param resolution: str - "hour" or "day".
+    :param buckets: Optional[int] - Number of hours or days, the current one included.
+    :param analytics_repo: AnalyticsRepo - Repository for the analytics.
+    :return: ReactionSeries - Net change of the likes and dislikes per bucket, oldest first.
+    """
+    return await analytics_repo.get_author_reactions(username=username, resolution=resolution, buckets=buckets)
@@ -1,15 +1,18 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import EmailStr, constr
 
 from src.core.clients import UserClient
+from src.core.metrics import TimedRoute
 from src.core.repository import AuthRepo
-from src.core.schemas import SuccessAuth, SuccessSignUp, User, UserCreate
+from src.core.schemas import Availability, SuccessAuth, SuccessSignUp, User, UserCreate
 from src.deps import auth_repo as deps_auth_repo
 from src.deps import get_current_user as deps_get_current_user
 from src.deps import user_client as deps_user_client
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/signup", response_model=SuccessSignUp, status_code=201)
@@ -36,6 +39,24 @@ async def signup(
     )
 
 
+@router.get("/availability", status_code=200, response_model=Availability)
+async def check_availability(
+    *,
+    username: Optional[constr(min_length=4, max_length=20)] = None,
+    email: Optional[EmailStr] = None,
+    auth_repo: AuthRepo = Depends(deps_auth_repo),
+) -> Availability:
+    """
+    Check whether a username and an email are still available for signup.
+
+    :param username: Optional[str] - Username to check (min length: 4, max length: 20)
+    :param email: Optional[EmailStr] - Email address to check
+    :param auth_repo: AuthRepo - repository for handling authentication and authorization operations
+    :return: Availability - availability of the given values
+    """
+    return await auth_repo.check_availability(username=username, email=email)
+
+
 @router.post("/login", status_code=200, response_model=SuccessAuth)
 async def login(
     *, auth_repo: AuthRepo = Depends(deps_auth_repo), form_data: OAuth2PasswordRequestForm = Depends()
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Query
+from pydantic import PositiveInt
+
+from src.config import settings
+from src.core.db.query_budget import query_budget
+from src.core.metrics import TimedRoute
+from src.core.repository import CommentRepo
+from src.core.schemas import Comment, CommentCreate, CommentPage, User
+from src.deps import comment_repo as deps_comment_repo
+from src.deps import get_current_user as deps_get_current_user
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/", status_code=200, response_model=CommentPage)
+@query_budget(max_queries=3)
+async def show_comments(
+    *,
+    post_id: PositiveInt,
+    before: Optional[PositiveInt] = None,
+    limit: int = Query(default=settings.COMMENTS_PAGE_SIZE, ge=1, le=settings.COMMENTS_PAGE_MAX_SIZE),
+    depth: int = Query(default=settings.COMMENT_REPLY_DEPTH, ge=0, le=settings.COMMENT_MAX_DEPTH),
+    comment_repo: CommentRepo = Depends(deps_comment_repo),
+) -> CommentPage:
+    """
+    Get the top-level comments of a post, newest first, with their replies.
+
+    :param post_id: int - ID of the post.
+    :param before: Optional[int] - Cursor from the previous page, only comments with a lower ID are returned.
+    :param limit: int - Page size.
+    :param depth: int - Levels of replies loaded with the comments, 0 for none.
+    :param comment_repo: CommentRepo - Repository for managing comments.
+    :return: CommentPage - Page of comments and the cursor for the next page.
+    """
+    return await comment_repo.show_comments(post_id=post_id, before_id=before, limit=limit, depth=depth)
+
+
+@router.get("/{comment_id}/replies", status_code=200, response_model=CommentPage)
+@query_budget(max_queries=4)
+async def show_replies(
+    *,
+    comment_id: PositiveInt,
+    after: Optional[PositiveInt] = None,
+    limit: int = Query(default=settings.COMMENTS_PAGE_SIZE, ge=1, le=settings.COMMENTS_PAGE_MAX_SIZE),
+    depth: int = Query(default=settings.COMMENT_REPLY_DEPTH, ge=1, le=settings.COMMENT_MAX_DEPTH),
+    comment_repo: CommentRepo = Depends(deps_comment_repo),
+) -> CommentPage:
+    """
+    Get the replies to a comment, oldest thread first.
+
+    :param comment_id: int - ID of the comment.
+    :param after: Optional[int] - Cursor from the previous page, only replies after it are returned.
+    :param limit: int - Maximum number of replies, at all depths.
+    :param depth: int - Levels of replies loaded.
+    :param comment_repo: CommentRepo - Repository for managing comments.
+    :return: CommentPage - Replies and the cursor for the next page.
+    """
+    return await comment_repo.show_replies(comment_id=comment_id, after_id=after, limit=limit, depth=depth)
+
+
+@router.post("/", status_code=201, response_model=Comment)
+async def create_comment(
+    *,
+    post_id: PositiveInt,
+    parent_id: Optional[PositiveInt] = None,
+    text: str = Body(min_length=1, max_length=560),
+    comment_repo: CommentRepo = Depends(deps_comment_repo),
+    current_user: User = Depends(deps_get_current_user),
+) -> Comment:
+    """
+    Comment on a post, or reply to a comment.
+
+    :param post_id: int - ID of the post.
+    :param parent_id: Optional[int] - ID of the comment replied to.
+    :param text: str - Text of the comment (min length: 1, max length: 560).
+    :param comment_repo: CommentRepo - Repository for managing comments.
+    :param current_user: User - Current logged-in user.
+    :return: Comment - Created comment.
+    """
+    return await comment_repo.create_comment(
+        obj_in=CommentCreate(text=text, post_id=post_id, parent_id=parent_id, author_id=current_user.id),
+        current_user=current_user,
+    )
@@ -1,17 +1,27 @@
-from typing import List
-
-from fastapi import APIRouter, Body, Depends
-from pydantic import PositiveInt
-
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Body, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import NonNegativeInt, PositiveInt
+
+from src.config import settings
+from src.core.db.query_budget import query_budget
+from src.core.events import Broker, Subscription
+from src.core.loaders import Loaders
+from src.core.metrics import TimedRoute
 from src.core.repository import PostRepo
-from src.core.schemas import Post, PostCreate, PostResponseMessage, PostUpdate, User
+from src.core.schemas import Post, PostChanges, PostCreate, PostResponseMessage, PostUpdate, User
+from src.deps import event_broker as deps_event_broker
 from src.deps import get_current_user as deps_get_current_user
+from src.deps import loaders as deps_loaders
 from src.deps import post_repo as deps_post_repo
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", status_code=200, response_model=List[Post])
+@query_budget(max_queries=1)
 async def show_posts(
     *,
     post_repo: PostRepo = Depends(deps_post_repo),
@@ -25,6 +35,111 @@ async def show_posts(
     return await post_repo.show_posts()
 
 
+@router.get("/batch", status_code=200, response_model=List[Post])
+@query_budget(max_queries=2)
+async def show_posts_batch(
+    *,
+    ids: List[PositiveInt] = Query(min_items=1, max_items=settings.POSTS_BATCH_MAX_IDS),
+    post_repo: PostRepo = Depends(deps_post_repo),
+    loaders: Loaders = Depends(deps_loaders),
+) -> List[Post]:
+    """
+    Get the posts with the given IDs (repeat the ids parameter for each ID).
+
+    :param ids: List[int] - Post IDs.
+    :param post_repo: PostRepo - Repository for managing posts.
+    :param loaders: Loaders - Batching loaders of the request.
+    :return: List[Post] - Found posts in the order of the IDs; IDs that do not exist are skipped.
+    """
+    return await post_repo.show_posts_batch(post_ids=ids, loaders=loaders)
+
+
+@router.get("/changes", status_code=200, response_model=PostChanges)
+@query_budget(max_queries=4, max_repeats=1)
+async def show_changes(
+    *,
+    since: NonNegativeInt = 0,
+    limit: int = Query(default=settings.POST_CHANGES_PAGE_SIZE, ge=1, le=settings.POST_CHANGES_PAGE_MAX_SIZE),
+    post_repo: PostRepo = Depends(deps_post_repo),
+) -> PostChanges:
+    """
+    Get the posts created, edited, deleted or reacted to after the sequence number.
+
+    Pass the returned next_since as since on the following request. If reset_required is true,
+    reload all posts and continue from next_since.
+
+    :param since: int - Sequence number the client is synced to.
+    :param limit: int - Maximum number of change log entries to read.
+    :param post_repo: PostRepo - Repository for managing posts.
+    :return: PostChanges - Upserts and tombstones with the cursor for the next request.
+    """
+    return await post_repo.show_changes(since=since, limit=limit)
+
+
+async def next_event(subscription: Subscription) -> Optional[str]:
+    """
+    Wait for the next event of the subscription.
+
+    :param subscription: Subscription - Subscription to read from.
+    :return: Optional[str] - Serialized event, "" if nothing happened during the heartbeat interval,
+        None if the stream has ended.
+    """
+    try:
+        return await asyncio.wait_for(subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+    except asyncio.TimeoutError:
+        return ""
+
+
+@router.get("/stream", status_code=200, response_class=StreamingResponse)
+async def stream_events(*, broker: Broker = Depends(deps_event_broker)) -> StreamingResponse:
+    """
+    Stream post created/edited/deleted and reaction count events as Server-Sent Events.
+
+    :param broker: Broker - Post events broker.
+    :return: StreamingResponse - text/event-stream with a comment line as a heartbeat.
+    """
+    subscription = broker.subscribe()
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            payload = await next_event(subscription=subscription)
+            while payload is not None:
+                yield f"data: {payload}\n\n" if payload else ": heartbeat\n\n"
+                payload = await next_event(subscription=subscription)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, broker: Broker = Depends(deps_event_broker)) -> None:
+    """
+    Push post created/edited/deleted and reaction count events over a WebSocket.
+
+    :param websocket: WebSocket - Client connection.
+    :param broker: Broker - Post events broker.
+    :return: None
+    """
+    await websocket.accept()
+    subscription = broker.subscribe()
+    try:
+        payload = await next_event(subscription=subscription)
+        while payload is not None:
+            await websocket.send_text(payload or "{}")
+            payload = await next_event(subscription=subscription)
+        # 1013 "Try Again Later" for dropped slow consumers, 1001 "Going Away" on shutdown
+        await websocket.close(code=1013 if subscription.dropped else 1001)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+
+
 @router.post("/", status_code=201, response_model=Post)
 async def create_post(
     *,
@@ -0,0 +1,53 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import PositiveInt
+
+from src.config import settings
+from src.core.db.query_budget import query_budget
+from src.core.metrics import TimedRoute
+from src.core.repository import TagRepo
+from src.core.schemas import PostPage, TrendingTag
+from src.deps import tag_repo as deps_tag_repo
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/trending", status_code=200, response_model=List[TrendingTag])
+@query_budget(max_queries=1)
+async def show_trending_tags(
+    *,
+    hours: int = Query(default=settings.TAG_TRENDING_HOURS, ge=1, le=settings.TAG_TRENDING_MAX_HOURS),
+    limit: int = Query(default=settings.TAG_TRENDING_LIMIT, ge=1, le=settings.TAG_TRENDING_MAX_LIMIT),
+    tag_repo: TagRepo = Depends(deps_tag_repo),
+) -> List[TrendingTag]:
+    """
+    Get the most used tags of the last hours.
+
+    :param hours: int - Number of hours counted, the current one included.
+    :param limit: int - Maximum number of tags.
+    :param tag_repo: TagRepo - Repository for managing tags.
+    :return: List[TrendingTag] - Tags with their uses, most used first.
+    """
+    return await tag_repo.get_trending(hours=hours, limit=limit)
+
+
+@router.get("/{tag}/posts", status_code=200, response_model=PostPage)
+@query_budget(max_queries=1)
+async def show_tag_posts(
+    *,
+    tag: str,
+    before: Optional[PositiveInt] = None,
+    limit: int = Query(default=settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_PAGE_MAX_SIZE),
+    tag_repo: TagRepo = Depends(deps_tag_repo),
+) -> PostPage:
+    """
+    Get posts with the tag, newest first.
+
+    :param tag: str - Tag, with or without the "#" (URL-encoded as %23).
+    :param before: Optional[int] - Cursor from the previous page, only posts with a lower ID are returned.
+    :param limit: int - Page size.
+    :param tag_repo: TagRepo - Repository for managing tags.
+    :return: PostPage - Page of posts and the cursor for the next page.
+    """
+    return await tag_repo.show_tag_posts(tag=tag, before_id=before, limit=limit)
@@ -0,0 +1,67 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import PositiveInt, constr
+
+from src.config import settings
+from src.core.db.query_budget import query_budget
+from src.core.metrics import TimedRoute
+from src.core.repository import PostRepo, UserRepo
+from src.core.schemas import PostPage, UsernameSuggestions, UserStats
+from src.deps import post_repo as deps_post_repo
+from src.deps import user_repo as deps_user_repo
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get("/autocomplete", status_code=200, response_model=UsernameSuggestions)
+@query_budget(max_queries=1)
+async def autocomplete_usernames(
+    *,
+    prefix: constr(min_length=1, max_length=20),
+    limit: int = Query(default=settings.USERNAME_AUTOCOMPLETE_LIMIT, ge=1, le=settings.USERNAME_AUTOCOMPLETE_MAX_LIMIT),
+    user_repo: UserRepo = Depends(deps_user_repo),
+) -> UsernameSuggestions:
+    """
+    Suggest usernames for @mentions.
+
+    :param prefix: str - Beginning of the username, without the "@".
+    :param limit: int - Maximum number of usernames.
+    :param user_repo: UserRepo - Repository for managing users.
+    :return: UsernameSuggestions - Usernames starting with the prefix, in alphabetical order.
+    """
+    return await user_repo.autocomplete(prefix=prefix, limit=limit)
+
+
+@router.get("/{username}/posts", status_code=200, response_model=PostPage)
+@query_budget(max_queries=2)
+async def show_user_posts(
+    *,
+    username: str,
+    before: Optional[PositiveInt] = None,
+    limit: int = Query(default=settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_PAGE_MAX_SIZE),
+    post_repo: PostRepo = Depends(deps_post_repo),
+) -> PostPage:
+    """
+    Get posts written by the user, newest first.
+
+    :param username: str - Username of the author.
+    :param before: Optional[int] - Cursor from the previous page, only posts with a lower ID are returned.
+    :param limit: int - Page size.
+    :param post_repo: PostRepo - Repository for managing posts.
+    :return: PostPage - Page of posts and the cursor for the next page.
+    """
+    return await post_repo.show_user_posts(username=username, before_id=before, limit=limit)
+
+
+@router.get("/{username}/stats", status_code=200, response_model=UserStats)
+@query_budget(max_queries=1)
+async def show_user_stats(*, username: str, user_repo: UserRepo = Depends(deps_user_repo)) -> UserStats:
+    """
+    Get the statistics of the user: posts written and likes/dislikes received.
+
+    :param username: str - Username of the user.
+    :param user_repo: UserRepo - Repository for managing users.
+    :return: UserStats - User statistics.
+    """
+    return await user_repo.get_stats(username=username)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.core.db import session
+
+router = APIRouter()
+
+
+def ping_database() -> bool:
+    """
+    Check that the database answers, with a connection from the pool.
+
+    :return: bool - True if SELECT 1 succeeded
+    """
+    if session.engine is None:
+        return False
+    try:
+        with session.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return False
+    return True
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz() -> dict:
+    """
+    Liveness probe: the worker is running and its event loop responds.
+
+    :return: dict - status
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz(request: Request, response: Response) -> dict:
+    """
+    Readiness probe: startup has finished (pool warmed up, clients created) and the database answers.
+    Returns 503 otherwise, so no traffic is routed to the worker.
+
+    :param request: Request - current request
+    :param response: Response - response whose status is set
+    :return: dict - status and the result of every check
+    """
+    checks = {
+        "startup": getattr(request.app.state, "ready", False),
+        "database": await run_in_threadpool(ping_database),
+    }
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "unavailable", "checks": checks}
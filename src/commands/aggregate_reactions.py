@@ -0,0 +1,31 @@
+"""Roll the pending reaction events up into the hourly and daily analytics buckets."""
+
+import argparse
+import logging
+
+from src.config import settings
+from src.core.analytics import ReactionAggregator
+from src.core.db import init_engine
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+
+def aggregate_reactions(batch_size: int) -> int:
+    """
+    Roll up the pending reaction events, committing after each batch.
+
+    :param batch_size: int - Number of events rolled up per transaction.
+    :return: int - Number of events rolled up.
+    """
+    aggregated = ReactionAggregator(interval=0, batch_size=batch_size).aggregate()
+    logger.info(f"Rolled up {aggregated} reaction events")
+    return aggregated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=settings.REACTION_AGGREGATOR_BATCH_SIZE)
+    args = parser.parse_args()
+    init_engine()
+    aggregate_reactions(batch_size=args.batch_size)
@@ -0,0 +1,51 @@
+"""Index the hashtags of the existing posts in the post_tag table in chunks of posts."""
+
+import argparse
+import logging
+from datetime import datetime, time
+
+from src.core.crud import crud_post, crud_post_tag
+from src.core.db import SessionLocal, init_engine
+from src.core.repository.post_repo import get_tags
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+
+def backfill_post_tags(chunk_size: int) -> int:
+    """
+    Bring the tags of every post in line with its text, committing after each chunk.
+    Tags already indexed are kept; missing ones count as used on the publication date of the post.
+
+    :param chunk_size: int - Number of posts processed per transaction.
+    :return: int - Number of posts processed.
+    """
+    processed = 0
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            posts = crud_post.get_texts_chunk(db=db, after_id=last_id, limit=chunk_size)
+            if not posts:
+                break
+            current = crud_post_tag.get_tags_by_post_ids(db=db, post_ids=[post.id for post in posts])
+            for post in posts:
+                crud_post_tag.set_tags(
+                    db=db,
+                    post_id=post.id,
+                    tags=get_tags(post.text),
+                    current=current.get(post.id, set()),
+                    created_at=datetime.combine(post.publication_date, time()),
+                )
+            db.commit()
+            processed += len(posts)
+            last_id = posts[-1].id
+            logger.info(f"Indexed tags of {processed} posts (last post ID: {last_id})")
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="number of posts per transaction")
+    args = parser.parse_args()
+    init_engine()
+    backfill_post_tags(chunk_size=args.chunk_size)
@@ -0,0 +1,142 @@
+"""Fill reaction.kind and remove duplicate reactions in id batches, between the expand and contract migrations.
+
+Run after ``alembic upgrade d5a8c3e61b07`` and before ``alembic upgrade head``. The command works on the columns of
+the expanded table (id, reaction_type, kind), which the application model no longer maps, and can be interrupted
+and run again: the last id done is kept in a checkpoint.
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import and_, case, column, delete, exists, func, select, table, update
+from sqlalchemy.orm import Session, aliased
+
+from src.core.crud import crud_checkpoint, crud_user_stats
+from src.core.db import SessionLocal, init_engine
+from src.core.models import Post, ReactionType
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+BACKFILL_CHECKPOINT = "reaction_kind_backfill"
+
+expanded_reaction = table(
+    "reaction", column("id"), column("post_id"), column("user_id"), column("reaction_type"), column("kind")
+)
+legacy_kind = case(
+    (expanded_reaction.c.reaction_type == "like", int(ReactionType.LIKE)),
+    (expanded_reaction.c.reaction_type == "dislike", int(ReactionType.DISLIKE)),
+)
+# The rows after the batch may not have a kind yet
+effective_kind = func.coalesce(expanded_reaction.c.kind, legacy_kind)
+
+
+def recount_reactions(db: Session, post_ids: List[int]) -> None:
+    """
+    Set the like and dislike counts of posts from their reactions, and move the statistics of their authors by
+    the difference. The change is committed by the caller.
+
+    :param db: Session - SQLAlchemy database session.
+    :param post_ids: List[int] - IDs of the posts.
+    :return: None
+    """
+    counts: Dict[int, Dict[int, int]] = {post_id: {} for post_id in post_ids}
+    rows = db.execute(
+        select(expanded_reaction.c.post_id, effective_kind, func.count())
+        .where(expanded_reaction.c.post_id.in_(post_ids))
+        .group_by(expanded_reaction.c.post_id, effective_kind)
+    ).all()
+    for post_id, kind, count in rows:
+        counts[post_id][kind] = count
+
+    posts = Post.__table__
+    rows = db.execute(
+        select(posts.c.id, posts.c.author_id, posts.c.likes, posts.c.dislikes, posts.c.deleted_at)
+        .where(posts.c.id.in_(post_ids))
+        .order_by(posts.c.id)
+        .with_for_update()
+    ).all()
+    for post in rows:
+        likes = counts[post.id].get(ReactionType.LIKE, 0)
+        dislikes = counts[post.id].get(ReactionType.DISLIKE, 0)
+        db.execute(update(posts).where(posts.c.id == post.id).values(likes=likes, dislikes=dislikes))
+        # The counters of deleted posts were already taken off the author's statistics
+        if post.deleted_at is None and (likes, dislikes) != (post.likes, post.dislikes):
+            crud_user_stats.increment(
+                db=db,
+                user_id=post.author_id,
+                likes=likes - (post.likes or 0),
+                dislikes=dislikes - (post.dislikes or 0),
+            )
+
+
+def remove_duplicates(db: Session, first_id: int, last_id: int) -> int:
+    """
+    Delete the reactions of the batch that a later reaction of the same user to the same post supersedes, then
+    recount the reactions of their posts. Concurrent requests without a unique key could create such duplicates,
+    and their read-modify-write of the counters may or may not have counted each one, so the counters are
+    recomputed rather than decremented. The change is committed by the caller.
+
+    :param db: Session - SQLAlchemy database session.
+    :param first_id: int - First reaction ID of the batch.
+    :param last_id: int - Last reaction ID of the batch.
+    :return: int - Number of deleted reactions.
+    """
+    later = aliased(expanded_reaction)
+    superseded = exists().where(
+        and_(
+            later.c.user_id == expanded_reaction.c.user_id,
+            later.c.post_id == expanded_reaction.c.post_id,
+            later.c.id > expanded_reaction.c.id,
+        )
+    )
+    rows = db.execute(
+        select(expanded_reaction.c.id, expanded_reaction.c.post_id).where(
+            expanded_reaction.c.id.between(first_id, last_id), superseded
+        )
+    ).all()
+    if rows:
+        db.execute(delete(expanded_reaction).where(expanded_reaction.c.id.in_([row.id for row in rows])))
+        recount_reactions(db=db, post_ids=sorted({row.post_id for row in rows}))
+    return len(rows)
+
+
+def backfill_reaction_kind(batch_size: int, pause: float) -> int:
+    """
+    Set kind from reaction_type and remove the duplicates, one id range per transaction, pausing in between so
+    that the writes of the application and the replicas keep up.
+
+    :param batch_size: int - Number of IDs per transaction.
+    :param pause: float - Seconds slept after each transaction.
+    :return: int - Number of reactions updated.
+    """
+    updated = removed = 0
+    with SessionLocal() as db:
+        last_done = crud_checkpoint.get_value(db=db, name=BACKFILL_CHECKPOINT)
+        max_id = db.execute(select(func.max(expanded_reaction.c.id))).scalar() or 0
+        while last_done < max_id:
+            first_id, last_id = last_done + 1, min(last_done + batch_size, max_id)
+            updated += db.execute(
+                update(expanded_reaction)
+                .where(expanded_reaction.c.id.between(first_id, last_id), expanded_reaction.c.kind.is_(None))
+                .values(kind=legacy_kind)
+            ).rowcount
+            removed += remove_duplicates(db=db, first_id=first_id, last_id=last_id)
+            crud_checkpoint.set_value(db=db, name=BACKFILL_CHECKPOINT, value=last_id)
+            db.commit()
+            last_done = last_id
+            logger.info(f"Backfilled reactions up to ID {last_id} of {max_id}")
+            time.sleep(pause)
+    logger.info(f"Set the kind of {updated} reactions and removed {removed} duplicates")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=10000, help="number of IDs per transaction")
+    parser.add_argument("--pause-seconds", type=float, default=0.05)
+    args = parser.parse_args()
+    init_engine()
+    backfill_reaction_kind(batch_size=args.batch_size, pause=args.pause_seconds)
@@ -0,0 +1,41 @@
+"""Remove superseded entries and old tombstones from the post change log in batches."""
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+from src.config import settings
+from src.core.crud import crud_post_change
+from src.core.db import SessionLocal, init_engine
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+
+def compact_post_changes(retention_days: int, batch_size: int) -> int:
+    """
+    Compact the change log entries older than the retention period, committing after each batch.
+
+    :param retention_days: int - Entries younger than this are kept.
+    :param batch_size: int - Number of entries removed per transaction.
+    :return: int - Number of removed entries.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    removed = 0
+    with SessionLocal() as db:
+        while True:
+            count = crud_post_change.compact(db=db, cutoff=cutoff, batch_size=batch_size)
+            if not count:
+                break
+            removed += count
+            logger.info(f"Removed {removed} post change log entries")
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retention-days", type=int, default=settings.POST_CHANGES_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=1000, help="number of entries per transaction")
+    args = parser.parse_args()
+    init_engine()
+    compact_post_changes(retention_days=args.retention_days, batch_size=args.batch_size)
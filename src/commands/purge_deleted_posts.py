@@ -0,0 +1,45 @@
+"""Hard-delete the soft deleted posts with their reactions and comments in batches."""
+
+import argparse
+import logging
+
+from src.config import settings
+from src.core.db import init_engine
+from src.core.purge import PostPurger
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+
+def purge_deleted_posts(delay: float, posts_per_batch: int, rows_per_batch: int, pause: float) -> int:
+    """
+    Purge the posts deleted more than delay seconds ago, pausing after each transaction.
+
+    :param delay: float - Seconds a deleted post is kept.
+    :param posts_per_batch: int - Number of posts purged together.
+    :param rows_per_batch: int - Number of reactions or comments deleted per transaction.
+    :param pause: float - Seconds slept after each transaction.
+    :return: int - Number of purged posts.
+    """
+    purger = PostPurger(
+        interval=0, delay=delay, posts_per_batch=posts_per_batch, rows_per_batch=rows_per_batch, pause=pause
+    )
+    purged = purger.purge()
+    logger.info(f"Purged {purged} deleted posts")
+    return purged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-seconds", type=float, default=settings.POST_PURGE_DELAY_SECONDS)
+    parser.add_argument("--posts-per-batch", type=int, default=settings.POST_PURGE_POSTS_PER_BATCH)
+    parser.add_argument("--rows-per-batch", type=int, default=settings.POST_PURGE_ROWS_PER_BATCH)
+    parser.add_argument("--pause-seconds", type=float, default=settings.POST_PURGE_PAUSE_SECONDS)
+    args = parser.parse_args()
+    init_engine()
+    purge_deleted_posts(
+        delay=args.delay_seconds,
+        posts_per_batch=args.posts_per_batch,
+        rows_per_batch=args.rows_per_batch,
+        pause=args.pause_seconds,
+    )
@@ -0,0 +1,39 @@
+"""Recompute the user_stats table from the post table in chunks of users."""
+
+import argparse
+import logging
+
+from src.core.crud import crud_user_stats
+from src.core.db import SessionLocal, init_engine
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+
+def rebuild_user_stats(chunk_size: int) -> int:
+    """
+    Recompute the statistics of every user, committing after each chunk.
+
+    :param chunk_size: int - Number of users processed per transaction.
+    :return: int - Number of users processed.
+    """
+    processed = 0
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            user_ids = crud_user_stats.get_user_ids_chunk(db=db, after_id=last_id, limit=chunk_size)
+            if not user_ids:
+                break
+            crud_user_stats.rebuild_chunk(db=db, user_ids=user_ids)
+            processed += len(user_ids)
+            last_id = user_ids[-1]
+            logger.info(f"Rebuilt statistics for {processed} users (last user ID: {last_id})")
+    return processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="number of users per transaction")
+    args = parser.parse_args()
+    init_engine()
+    rebuild_user_stats(chunk_size=args.chunk_size)
@@ -0,0 +1,64 @@
+"""Count the uses of every tag per hour in the tag_trend table, for the trending tags."""
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.config import settings
+from src.core.crud import crud_checkpoint, crud_tag_trend, get_bucket
+from src.core.crud.crud_tag_trend import BUCKET
+from src.core.db import SessionLocal, init_engine
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.INFO)
+
+ROLLUP_CHECKPOINT = "tag_trend_rollup"
+
+
+def rollup_tag_trends(since: Optional[datetime] = None) -> int:
+    """
+    Recompute the hour buckets from the last settled one rolled up to the current one, committing after each.
+    The current hour is recomputed again by the next run, so the command can run as often as the trends need
+    to be fresh (e.g. every few minutes from cron). A past hour only counts as settled, and moves the checkpoint,
+    TAG_TRENDING_ROLLUP_LAG_SECONDS after its end: until then the next runs recompute it too, so the uses stamped
+    just before the end of the hour but committed after a run are counted.
+
+    :param since: Optional[datetime] - Recompute from this hour instead (after a backfill); by default the first
+        run goes back TAG_TRENDING_MAX_HOURS
+    :return: int - Number of hour buckets recomputed.
+    """
+    now = datetime.utcnow()
+    current = get_bucket(now)
+    settled = now - timedelta(seconds=settings.TAG_TRENDING_ROLLUP_LAG_SECONDS)
+    with SessionLocal() as db:
+        if since is None:
+            checkpoint = crud_checkpoint.get_value(db=db, name=ROLLUP_CHECKPOINT)
+            if checkpoint:
+                since = datetime.utcfromtimestamp(checkpoint)
+            else:
+                since = current - timedelta(hours=settings.TAG_TRENDING_MAX_HOURS)
+        bucket = get_bucket(since)
+        buckets = 0
+        while bucket <= current:
+            crud_tag_trend.rollup(db=db, bucket=bucket, end=bucket + BUCKET)
+            # The buckets that ended more than the lag ago get no more uses
+            if bucket + BUCKET <= settled:
+                crud_checkpoint.set_value(
+                    db=db, name=ROLLUP_CHECKPOINT, value=int((bucket + BUCKET - datetime(1970, 1, 1)).total_seconds())
+                )
+            db.commit()
+            buckets += 1
+            bucket += BUCKET
+    logger.info(f"Rolled up {buckets} hours of tag uses (up to {current.isoformat()})")
+    return buckets
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat, default=None, help="UTC hour to recompute from (ISO format)"
+    )
+    args = parser.parse_args()
+    init_engine()
+    rollup_tag_trends(since=args.since)
@@ -0,0 +1 @@
+from .aggregator import ReactionAggregator, reaction_aggregator
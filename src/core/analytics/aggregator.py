@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.core.crud import crud_reaction_event, crud_reaction_rollup
+from src.core.crud.crud_reaction_rollup import DAY, HOUR, RollupKey, get_period_bucket
+from src.core.db import SessionLocal
+from src.core.metrics import registry
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+PERIODS = (HOUR, DAY)
+
+AGGREGATED_EVENTS = registry.counter(
+    "reaction_events_aggregated_total", "Reaction events rolled up into the hourly and daily buckets."
+)
+
+
+def get_changes(events: List) -> Dict[RollupKey, Tuple[int, int]]:
+    """
+    Sum the events by post and author bucket, hourly and daily.
+
+    :param events: List - reaction events
+    :return: Dict[RollupKey, Tuple[int, int]] - change of the likes and dislikes by bucket
+    """
+    changes: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+    for event in events:
+        for period in PERIODS:
+            bucket = get_period_bucket(event.created_at, period)
+            for scope, subject_id in (("post", event.post_id), ("author", event.author_id)):
+                change = changes[(scope, subject_id, period, bucket)]
+                change[0] += event.likes
+                change[1] += event.dislikes
+    return {key: (likes, dislikes) for key, (likes, dislikes) in changes.items()}
+
+
+class ReactionAggregator:
+    """
+    Rolls the reaction events up into the reaction_rollup buckets incrementally: each batch of events is added to
+    its buckets and deleted in one transaction, so every event is counted once. Aggregators of several workers
+    take disjoint batches with FOR UPDATE SKIP LOCKED and never wait for each other.
+    """
+
+    def __init__(self, interval: float, batch_size: int) -> None:
+        """
+        Initialize the aggregator.
+
+        :param interval: float - seconds between two runs in the background
+        :param batch_size: int - events rolled up per transaction
+        """
+        self.interval = interval
+        self.batch_size = batch_size
+        self.task: Optional[asyncio.Task] = None
+
+    def aggregate_batch(self, db: Session) -> int:
+        """
+        Roll up one batch of events.
+
+        :param db: Session - database session
+        :return: int - number of events rolled up
+        """
+        events = crud_reaction_event.claim_batch(db=db, limit=self.batch_size)
+        if events:
+            crud_reaction_rollup.add(db=db, changes=get_changes(events))
+            crud_reaction_event.delete_by_ids(db=db, ids=[event.id for event in events])
+        db.commit()
+        AGGREGATED_EVENTS.inc(amount=len(events))
+        return len(events)
+
+    def aggregate(self) -> int:
+        """
+        Roll up the pending events, batch after batch. Runs in a worker thread.
+
+        :return: int - number of events rolled up
+        """
+        aggregated = 0
+        with SessionLocal() as db:
+            while True:
+                count = self.aggregate_batch(db=db)
+                aggregated += count
+                if count < self.batch_size:
+                    break
+        return aggregated
+
+    async def run(self) -> None:
+        """
+        Roll up the pending events every interval seconds. Events of a failed run are rolled up by the next one.
+
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                aggregated = await run_in_threadpool(self.aggregate)
+                if aggregated:
+                    logger.debug(f"Rolled up {aggregated} reaction events")
+            except SQLAlchemyError as error:
+                logger.warning(f"Rolling up the reaction events failed: {error}")
+
+    async def start(self) -> None:
+        """
+        Start rolling up in the background.
+
+        :return: None
+        """
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop rolling up.
+
+        :return: None
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+reaction_aggregator = ReactionAggregator(
+    interval=settings.REACTION_AGGREGATOR_INTERVAL_SECONDS, batch_size=settings.REACTION_AGGREGATOR_BATCH_SIZE
+)
@@ -0,0 +1 @@
+from .index import UsernameIndex, username_index
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.core.crud import crud_user
+from src.core.db import SessionLocal
+from src.utils import PrefixIndex, get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+# Above this many new users a refresh re-sorts the array once instead of inserting them one by one
+BULK_INSERT_THRESHOLD = 1000
+
+
+class UsernameIndex:
+    """
+    Sorted array of all the usernames, kept by every worker to answer prefix searches without a query.
+    Filled at startup by reading the user table in chunks, then refreshed with the users whose ID is greater than
+    the last one read, which includes the signups handled by the other workers.
+
+    The IDs are allocated before the signups commit, so a user can become visible after a greater ID was read.
+    The IDs missing among the last chunk_size ones read are looked up again by every refresh for gap_timeout
+    seconds, longer than any signup transaction; the ones still missing then were lost to a rollback.
+    """
+
+    def __init__(self, refresh_interval: float, gap_timeout: float, chunk_size: int = 10000) -> None:
+        """
+        Initialize the index, empty until the first refresh.
+
+        :param refresh_interval: float - seconds between two refreshes
+        :param gap_timeout: float - seconds a missing ID is looked up for
+        :param chunk_size: int - users read per query
+        """
+        self.refresh_interval = refresh_interval
+        self.gap_timeout = gap_timeout
+        self.chunk_size = chunk_size
+        self.index = PrefixIndex()
+        self.last_id = 0
+        # Missing ID -> monotonic time it was first missed
+        self.gaps: Dict[int, float] = {}
+        self.ready = False
+        self.task: Optional[asyncio.Task] = None
+
+    def refresh(self) -> int:
+        """
+        Add the users created since the last refresh, and the ones committed since with a missing ID.
+        Runs in a worker thread.
+
+        :return: int - number of users added
+        """
+        now = time.monotonic()
+        usernames: List[str] = []
+        read_ids: Set[int] = set()
+        last_id = self.last_id
+        with SessionLocal() as db:
+            if self.gaps:
+                found = crud_user.get_usernames_by_ids(db=db, ids=list(self.gaps))
+                usernames.extend(found.values())
+                read_ids.update(found)
+            while True:
+                rows = crud_user.get_identities_chunk(db=db, after_id=last_id, limit=self.chunk_size)
+                usernames.extend(row.username for row in rows)
+                read_ids.update(row.id for row in rows)
+                if rows:
+                    last_id = rows[-1].id
+                if len(rows) < self.chunk_size:
+                    break
+
+        gaps = {
+            user_id: missed
+            for user_id, missed in self.gaps.items()
+            if user_id not in read_ids and now - missed < self.gap_timeout
+        }
+        for user_id in range(max(self.last_id, last_id - self.chunk_size) + 1, last_id):
+            if user_id not in read_ids:
+                gaps[user_id] = now
+        self.gaps = gaps
+
+        if len(usernames) > BULK_INSERT_THRESHOLD:
+            self.index.extend(usernames)
+        else:
+            for username in usernames:
+                self.index.add(username)
+        self.last_id = last_id
+        self.ready = True
+        return len(usernames)
+
+    def add(self, username: str) -> None:
+        """
+        Add the username of a user who just signed up, before the next refresh. Must be called after the commit.
+
+        :param username: str - username
+        :return: None
+        """
+        if self.ready:
+            self.index.add(username)
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """
+        Get the first usernames starting with the prefix.
+
+        :param prefix: str - prefix
+        :param limit: int - maximum number of usernames
+        :return: List[str] - usernames in code point order
+        """
+        return self.index.search(prefix=prefix, limit=limit)
+
+    async def run(self) -> None:
+        """
+        Fill the index, then refresh it every refresh_interval seconds. A failed refresh is retried at the next one.
+
+        :return: None
+        """
+        while True:
+            try:
+                added = await run_in_threadpool(self.refresh)
+                if added:
+                    logger.debug(f"Added {added} usernames to the autocomplete index")
+            except SQLAlchemyError as error:
+                logger.warning(f"Refreshing the autocomplete index failed: {error}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self) -> None:
+        """
+        Start filling the index in the background; until it is ready the searches query the database.
+
+        :return: None
+        """
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop the refreshes.
+
+        :return: None
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+username_index = UsernameIndex(
+    refresh_interval=settings.USERNAME_AUTOCOMPLETE_REFRESH_SECONDS,
+    gap_timeout=settings.USERNAME_AUTOCOMPLETE_GAP_SECONDS,
+)
@@ -0,0 +1 @@
+from .index import AvailabilityIndex, availability_index
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.core.crud import crud_user
+from src.core.db import SessionLocal
+from src.core.metrics import registry
+from src.utils import BloomFilter, get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+FIELDS = ("username", "email")
+
+AVAILABILITY_LOOKUPS = registry.counter(
+    "availability_filter_lookups_total",
+    "Username and email lookups in the Bloom filters; only maybe_taken and not_ready answers query the database.",
+    labels=("field", "answer"),
+)
+
+
+class AvailabilityIndex:
+    """
+    Bloom filters of the usernames and emails taken, kept by every worker to answer "definitely available"
+    without a query. A "maybe taken" answer is confirmed by the database, and the unique indexes stay the source
+    of truth: a name taken through another worker since the last rebuild is only caught by the insert.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_interval: float, chunk_size: int = 1000) -> None:
+        """
+        Initialize the index, empty until the first build.
+
+        :param capacity: int - minimum number of users the filters are sized for; a rebuild sizes them for twice
+            the number of users found by the previous build if that is more
+        :param error_rate: float - false positive rate of the filters at capacity
+        :param rebuild_interval: float - seconds between two rebuilds from the user table
+        :param chunk_size: int - users read per query while building
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.chunk_size = chunk_size
+        self.filters: Optional[Dict[str, BloomFilter]] = None
+        # Filters being built: the users signing up meanwhile are added to them too
+        self.building: Optional[Dict[str, BloomFilter]] = None
+        self.lock = threading.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def build(self) -> int:
+        """
+        Build new filters by streaming the user table in chunks, then swap them in. Runs in a worker thread.
+
+        :return: int - number of users read
+        """
+        previous = self.filters["username"].count if self.filters else 0
+        capacity = max(self.capacity, 2 * previous)
+        filters = {field: BloomFilter(capacity=capacity, error_rate=self.error_rate) for field in FIELDS}
+        with self.lock:
+            self.building = filters
+
+        users = 0
+        try:
+            with SessionLocal() as db:
+                after_id = 0
+                while True:
+                    rows = crud_user.get_identities_chunk(db=db, after_id=after_id, limit=self.chunk_size)
+                    for row in rows:
+                        filters["username"].add(row.username)
+                        filters["email"].add(row.email)
+                    users += len(rows)
+                    if len(rows) < self.chunk_size:
+                        break
+                    after_id = rows[-1].id
+        except BaseException:
+            with self.lock:
+                self.building = None
+            raise
+
+        with self.lock:
+            self.filters = filters
+            self.building = None
+        return users
+
+    def add(self, username: str, email: str) -> None:
+        """
+        Mark a username and an email as taken. Must be called after the user is committed.
+
+        :param username: str - username
+        :param email: str - email
+        :return: None
+        """
+        with self.lock:
+            for filters in (self.filters, self.building):
+                if filters is not None:
+                    filters["username"].add(username)
+                    filters["email"].add(email)
+
+    def might_be_taken(self, field: str, value: str) -> bool:
+        """
+        Check a username or an email against the filters.
+
+        :param field: str - "username" or "email"
+        :param value: str - value to check
+        :return: bool - False if the value is definitely available, True if the database must be asked
+        """
+        filters = self.filters
+        if filters is None:
+            AVAILABILITY_LOOKUPS.inc(field, "not_ready")
+            return True
+        taken = value in filters[field]
+        AVAILABILITY_LOOKUPS.inc(field, "maybe_taken" if taken else "available")
+        return taken
+
+    async def run(self) -> None:
+        """
+        Build the filters, then rebuild them every rebuild_interval seconds. A failed build keeps the previous
+        filters, or leaves every check to the database if there are none yet.
+
+        :return: None
+        """
+        while True:
+            try:
+                users = await run_in_threadpool(self.build)
+                logger.debug(f"Built the availability filters of {users} users")
+            except SQLAlchemyError as error:
+                logger.warning(f"Building the availability filters failed: {error}")
+            await asyncio.sleep(self.rebuild_interval)
+
+    async def start(self) -> None:
+        """
+        Start building the filters in the background; until they are built every check queries the database.
+
+        :return: None
+        """
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop the rebuilds.
+
+        :return: None
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+availability_index = AvailabilityIndex(
+    capacity=settings.AVAILABILITY_FILTER_CAPACITY,
+    error_rate=settings.AVAILABILITY_FILTER_ERROR_RATE,
+    rebuild_interval=settings.AVAILABILITY_FILTER_REBUILD_SECONDS,
+)
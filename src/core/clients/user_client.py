@@ -7,6 +7,7 @@ from fastapi.encoders import jsonable_encoder
 from pydantic import EmailStr
 
 from src.config import settings
+from src.core.metrics import track_upstream
 from src.core.schemas import ExtraUserFields
 from src.utils import get_logger
 
@@ -14,6 +15,14 @@ logger = get_logger(__file__, logging.DEBUG)
 
 
 class UserClient:
+    def __init__(self, client: httpx.AsyncClient):
+        """
+        Initialize the UserClient class.
+
+        :param client: httpx.AsyncClient - HTTP client shared by the worker, keeping the connections alive.
+        """
+        self.client = client
+
     def __prepare_data(self, data: dict) -> Optional[ExtraUserFields]:
         """
         Prepare additional user data from ClearBit API response.
@@ -38,8 +47,8 @@ class UserClient:
         :return: Optional[ExtraUserFields] - Additional user fields (name, surname) or None if data is not available.
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            with track_upstream("clearbit"):
+                response = await self.client.get(
                     url=settings.CLEARBIT_URL,
                     params={"email": email},
                     headers={
@@ -69,8 +78,8 @@ class UserClient:
         :return: bool - True if the email is valid or if there was an error connecting to the EmailHunter API.
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
+            with track_upstream("emailhunter"):
+                response = await self.client.get(
                     url=settings.EMAIL_HUNTER_URL,
                     params={"email": email, "api_key": settings.EMAIL_HUNTER_API_KEY},
                     headers={"Content-Type": "application/json"},
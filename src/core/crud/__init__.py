@@ -1,4 +1,14 @@
-from .base import CRUDBase
+from .base import CRUDBase, get_insert
+from .crud_checkpoint import crud_checkpoint
+from .crud_comment import crud_comment
+from .crud_idempotency_key import crud_idempotency_key
 from .crud_post import crud_post
+from .crud_post_change import crud_post_change
+from .crud_post_tag import crud_post_tag
+from .crud_rate_limit import crud_rate_limit
 from .crud_reaction import crud_reaction
+from .crud_reaction_event import crud_reaction_event
+from .crud_reaction_rollup import crud_reaction_rollup
+from .crud_tag_trend import crud_tag_trend, get_bucket
 from .crud_user import crud_user
+from .crud_user_stats import crud_user_stats
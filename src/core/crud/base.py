@@ -2,6 +2,7 @@ from typing import Any, Dict, Generic, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from src.core.models import Base
@@ -11,6 +12,18 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def get_insert(db: Session) -> Any:
+    """
+    Get the dialect specific insert construct that supports ON CONFLICT for the session's database.
+
+    :param db: Session - SQLAlchemy database session.
+    :return: Any - insert() of the PostgreSQL or SQLite dialect.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase, get_insert
+from src.core.models import Checkpoint
+
+
+class CRUDCheckpoint(CRUDBase[Checkpoint, BaseModel, BaseModel]):
+    def get_value(self, db: Session, name: str) -> int:
+        """
+        Get the value of a named checkpoint.
+
+        :param db: Session - SQLAlchemy database session.
+        :param name: str - Name of the checkpoint.
+        :return: int - Stored value, 0 if the checkpoint was never set.
+        """
+        row = db.query(Checkpoint.value).filter(Checkpoint.name == name).first()
+        return row.value if row else 0
+
+    def set_value(self, db: Session, name: str, value: int) -> None:
+        """
+        Set the value of a named checkpoint. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param name: str - Name of the checkpoint.
+        :param value: int - New value.
+        :return: None
+        """
+        statement = get_insert(db)(Checkpoint).values(name=name, value=value)
+        statement = statement.on_conflict_do_update(index_elements=[Checkpoint.name], set_={"value": value})
+        db.execute(statement)
+
+
+crud_checkpoint = CRUDCheckpoint(Checkpoint)
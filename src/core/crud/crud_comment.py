@@ -0,0 +1,197 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import delete, desc, select, union_all, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session
+
+from src.core.crud import CRUDBase
+from src.core.models import Comment, User
+
+PATH_SEPARATOR = "."
+# Sorts right after the separator: every path of a subtree is lower than the comment's path followed by it
+PATH_END = chr(ord(PATH_SEPARATOR) + 1)
+# Zero-padded so that the paths sort like the IDs
+PATH_SEGMENT_WIDTH = 10
+
+
+def get_path(parent_path: Optional[str], comment_id: int) -> str:
+    """
+    Get the materialized path of a comment.
+
+    :param parent_path: Optional[str] - Path of the parent comment, None for a top-level comment.
+    :param comment_id: int - ID of the comment.
+    :return: str - Path of the comment.
+    """
+    segment = str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+    return segment if parent_path is None else parent_path + PATH_SEPARATOR + segment
+
+
+class CRUDComment(CRUDBase[Comment, BaseModel, BaseModel]):
+    def add_comment(self, db: Session, post_id: int, author_id: int, text: str, parent: Optional[Comment]) -> Comment:
+        """
+        Add a comment and set its path once the insert gave it an ID. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param author_id: int - ID of the author.
+        :param text: str - Text of the comment.
+        :param parent: Optional[Comment] - Comment replied to, None for a top-level comment.
+        :return: Comment - Created comment.
+        """
+        comment = Comment(
+            post_id=post_id,
+            parent_id=parent.id if parent else None,
+            author_id=author_id,
+            text=text,
+            depth=parent.depth + 1 if parent else 0,
+            reply_count=0,
+            created_at=datetime.utcnow(),
+        )
+        db.add(comment)
+        db.flush()
+        comment.path = get_path(parent.path if parent else None, comment.id)
+        db.flush()
+        return comment
+
+    def add_reply(self, db: Session, comment_id: int) -> None:
+        """
+        Increment the reply count of a comment in a single statement. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param comment_id: int - ID of the comment replied to.
+        :return: None
+        """
+        table = Comment.__table__
+        db.execute(update(table).where(table.c.id == comment_id).values(reply_count=table.c.reply_count + 1))
+
+    def get_top_level(self, db: Session, post_id: int, before_id: Optional[int], limit: int) -> List[Row]:
+        """
+        Get a page of the top-level comments of a post, newest first, from the (post_id, depth, id DESC) index.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param before_id: Optional[int] - Return only comments with an ID lower than this one (keyset cursor).
+        :param limit: int - Maximum number of comments to return.
+        :return: List[Row] - Comment rows with the username of the author.
+        """
+        query = self.__select(db).filter(Comment.post_id == post_id, Comment.depth == 0)
+        if before_id is not None:
+            query = query.filter(Comment.id < before_id)
+        return query.order_by(desc(Comment.id)).limit(limit).all()
+
+    def get_subtrees(
+        self,
+        db: Session,
+        post_id: int,
+        first_path: str,
+        last_path: str,
+        max_depth: int,
+        after_path: Optional[str],
+        limit: int,
+    ) -> List[Row]:
+        """
+        Get the descendants of consecutive sibling comments in depth-first order, with one range scan of the
+        (post_id, path) index.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param first_path: str - Path of the first sibling, in path order.
+        :param last_path: str - Path of the last sibling; the descendants of the siblings in between are returned
+            too, so this is the same path for the subtree of a single comment.
+        :param max_depth: int - Deepest depth returned.
+        :param after_path: Optional[str] - Return only comments after this path (keyset cursor).
+        :param limit: int - Maximum number of comments to return.
+        :return: List[Row] - Comment rows with the username of the author, in path order.
+        """
+        lower = first_path + PATH_SEPARATOR
+        if after_path is not None and after_path > lower:
+            query = self.__select(db).filter(Comment.path > after_path)
+        else:
+            query = self.__select(db).filter(Comment.path >= lower)
+        depth = first_path.count(PATH_SEPARATOR)
+        return (
+            query.filter(
+                Comment.post_id == post_id,
+                Comment.path < last_path + PATH_END,
+                Comment.depth > depth,
+                Comment.depth <= max_depth,
+            )
+            .order_by(Comment.path)
+            .limit(limit)
+            .all()
+        )
+
+    def get_replies_of_roots(
+        self, db: Session, post_id: int, root_paths: List[str], max_depth: int, limit_per_root: int
+    ) -> List[Row]:
+        """
+        Get the first replies of each of the given comments in depth-first order, at most limit_per_root each,
+        so that a long thread cannot use up the replies of the others. One statement of one limited range scan of
+        the (post_id, path) index per comment.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param root_paths: List[str] - Paths of the comments, all at the same depth.
+        :param max_depth: int - Deepest depth returned.
+        :param limit_per_root: int - Maximum number of replies per comment, at all depths.
+        :return: List[Row] - Comment rows with the username of the author, in path order.
+        """
+        if not root_paths:
+            return []
+        depth = root_paths[0].count(PATH_SEPARATOR)
+        subtrees = [
+            select(
+                self.__select(db)
+                .filter(
+                    Comment.post_id == post_id,
+                    Comment.path > path + PATH_SEPARATOR,
+                    Comment.path < path + PATH_END,
+                    Comment.depth > depth,
+                    Comment.depth <= max_depth,
+                )
+                .order_by(Comment.path)
+                .limit(limit_per_root)
+                .subquery()
+            )
+            for path in root_paths
+        ]
+        rows = db.execute(union_all(*subtrees) if len(subtrees) > 1 else subtrees[0]).all()
+        return sorted(rows, key=lambda row: row.path)
+
+    def delete_by_post_ids(self, db: Session, post_ids: List[int], limit: int) -> int:
+        """
+        Delete a batch of the comments on the given posts, the deepest first so that no reply outlives its parent.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_ids: List[int] - IDs of the posts.
+        :param limit: int - Maximum number of comments deleted.
+        :return: int - Number of deleted comments.
+        """
+        table = Comment.__table__
+        batch = select(table.c.id).where(table.c.post_id.in_(post_ids)).order_by(desc(table.c.depth)).limit(limit)
+        return db.execute(delete(table).where(table.c.id.in_(batch.scalar_subquery()))).rowcount
+
+    def __select(self, db: Session) -> Query:
+        """
+        Select the columns of the comment responses, with the username of the author.
+
+        :param db: Session - SQLAlchemy database session.
+        :return: Query - Query to filter.
+        """
+        return db.query(
+            Comment.id,
+            Comment.post_id,
+            Comment.parent_id,
+            Comment.text,
+            Comment.created_at,
+            Comment.depth,
+            Comment.reply_count,
+            Comment.path,
+            User.username,
+        ).join(User, User.id == Comment.author_id)
+
+
+crud_comment = CRUDComment(Comment)
@@ -0,0 +1,115 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase, get_insert
+from src.core.models import IdempotencyKey
+
+
+class CRUDIdempotencyKey(CRUDBase[IdempotencyKey, BaseModel, BaseModel]):
+    def acquire(self, db: Session, key: bytes, fingerprint: bytes, now: float, lease_until: float) -> bool:
+        """
+        Claim a key for a first execution in a single atomic statement: the row is inserted, or taken over if it
+        has expired (a retention that ended or the lease of a worker that died). The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: bytes - Key digest.
+        :param fingerprint: bytes - Request digest.
+        :param now: float - Current Unix time.
+        :param lease_until: float - Unix time the claim expires if the execution never completes.
+        :return: bool - True if the key was claimed, False if another request holds it or completed it.
+        """
+        insert = get_insert(db)
+        values = {
+            "fingerprint": fingerprint,
+            "status_code": None,
+            "headers": None,
+            "body": None,
+            "expires_at": lease_until,
+        }
+        statement = insert(IdempotencyKey).values(key=key, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key], set_=values, where=IdempotencyKey.expires_at < now
+        )
+        return db.execute(statement).rowcount > 0
+
+    def get_by_key(self, db: Session, key: bytes) -> Optional[Row]:
+        """
+        Get the state of a key.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: bytes - Key digest.
+        :return: Optional[Row] - Fingerprint, status code, headers, body and expiry of the key, None if it does not
+            exist.
+        """
+        table = IdempotencyKey.__table__
+        statement = select(
+            table.c.fingerprint, table.c.status_code, table.c.headers, table.c.body, table.c.expires_at
+        ).where(table.c.key == key)
+        return db.execute(statement).first()
+
+    def complete(
+        self,
+        db: Session,
+        key: bytes,
+        lease_until: float,
+        status_code: int,
+        headers: List[List[str]],
+        body: bytes,
+        expires_at: float,
+    ) -> bool:
+        """
+        Store the response of the first execution, if it still holds its claim: past the lease, a duplicate may have
+        taken the key over, and its own claim must not be overwritten. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: bytes - Key digest.
+        :param lease_until: float - End of the lease the key was claimed with, which identifies the claim.
+        :param status_code: int - Response status code.
+        :param headers: List[List[str]] - [name, value] pairs of the response headers.
+        :param body: bytes - Response body.
+        :param expires_at: float - Unix time the response stops being replayed.
+        :return: bool - True if the response was stored, False if the claim was lost.
+        """
+        table = IdempotencyKey.__table__
+        statement = (
+            table.update()
+            .where(table.c.key == key, table.c.expires_at == lease_until, table.c.status_code.is_(None))
+            .values(status_code=status_code, headers=headers, body=body, expires_at=expires_at)
+        )
+        return db.execute(statement).rowcount > 0
+
+    def release(self, db: Session, key: bytes, lease_until: float) -> None:
+        """
+        Delete the claim of an execution that failed, so that a retry runs the request again, unless a duplicate
+        took the key over in between. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: bytes - Key digest.
+        :param lease_until: float - End of the lease the key was claimed with, which identifies the claim.
+        :return: None
+        """
+        table = IdempotencyKey.__table__
+        db.execute(
+            table.delete().where(table.c.key == key, table.c.expires_at == lease_until, table.c.status_code.is_(None))
+        )
+
+    def purge(self, db: Session, expired_before: float, limit: int) -> int:
+        """
+        Delete a batch of expired keys, found through the expires_at index.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param expired_before: float - Unix time.
+        :param limit: int - Maximum number of keys deleted.
+        :return: int - Number of deleted keys.
+        """
+        table = IdempotencyKey.__table__
+        expired = select(table.c.key).where(table.c.expires_at < expired_before).limit(limit)
+        return db.execute(table.delete().where(table.c.key.in_(expired.scalar_subquery()))).rowcount
+
+
+crud_idempotency_key = CRUDIdempotencyKey(IdempotencyKey)
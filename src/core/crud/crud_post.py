@@ -1,78 +1,336 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from src.core.crud import CRUDBase
-from src.core.models import Post
+from src.core.models import Post, PostTag, User
 from src.core.schemas import Post as PostSchema
 from src.core.schemas import PostCreate, PostUpdate
 
 
 class CRUDPost(CRUDBase[Post, PostCreate, PostUpdate]):
+    def get_live(self, db: Session, id: int) -> Optional[Post]:
+        """
+        Get a post by ID unless it was deleted.
+
+        :param db: Session - SQLAlchemy database session.
+        :param id: int - ID of the post.
+        :return: Optional[Post] - Post object if found, None otherwise.
+        """
+        return db.query(Post).filter(Post.id == id, Post.deleted_at.is_(None)).first()
+
     def get_all_posts(self, db: Session) -> List[Post]:
         """
-        Get all posts from the database.
+        Get all posts that were not deleted from the database, together with their authors, in a single query.
 
         :param db: Session - SQLAlchemy database session.
         :return: List[Post] - List of post objects.
         """
-        posts = db.query(Post).order_by(desc(Post.id)).all()
+        rows = (
+            db.query(
+                Post.id, Post.text, Post.publication_date, Post.likes, Post.dislikes, Post.comment_count, User.username
+            )
+            .join(User, User.id == Post.author_id)
+            .filter(Post.deleted_at.is_(None))
+            .order_by(desc(Post.id))
+            .all()
+        )
         return [
             PostSchema(
-                id=post.id,
-                text=post.text,
-                author=post.author.username,
-                publication_date=post.publication_date,
-                likes=post.likes,
-                dislikes=post.dislikes,
+                id=row.id,
+                text=row.text,
+                author=row.username,
+                publication_date=row.publication_date,
+                likes=row.likes,
+                dislikes=row.dislikes,
+                comment_count=row.comment_count,
             )
-            for post in posts
+            for row in rows
         ]
 
+    def add_post(self, db: Session, obj_in: PostCreate) -> Post:
+        """
+        Add a new post to the session and flush it to get its ID. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param obj_in: PostCreate - Post creation input data.
+        :return: Post - Created post object.
+        """
+        db_obj = Post(**obj_in.dict())
+        db.add(db_obj)
+        db.flush()
+        return db_obj
+
+    def exists(self, db: Session, id: int) -> bool:
+        """
+        Check whether a post exists and was not deleted, reading a single row through the primary key index.
+
+        :param db: Session - SQLAlchemy database session.
+        :param id: int - ID of the post.
+        :return: bool - True if the post exists.
+        """
+        return db.query(Post.id).filter(Post.id == id, Post.deleted_at.is_(None)).first() is not None
+
+    def update_own_text(self, db: Session, post_id: int, author_id: int, text: str) -> Optional[Row]:
+        """
+        Change the text of a post in a single UPDATE ... WHERE id AND author_id ... RETURNING statement.
+        On databases without RETURNING (SQLite) the updated row is read back with a second query.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param author_id: int - ID of the user who must be the author.
+        :param text: str - New text.
+        :return: Optional[Row] - id, text, publication_date and counters of the updated post,
+            None if no post with this ID was written by the user or if it was deleted.
+        """
+        table = Post.__table__
+        columns = (
+            table.c.id,
+            table.c.text,
+            table.c.publication_date,
+            table.c.likes,
+            table.c.dislikes,
+            table.c.comment_count,
+        )
+        owned = (table.c.id == post_id, table.c.author_id == author_id, table.c.deleted_at.is_(None))
+        statement = update(table).where(*owned).values(text=text)
+        if db.get_bind().dialect.full_returning:
+            return db.execute(statement.returning(*columns)).first()
+
+        if db.execute(statement).rowcount == 0:
+            return None
+        return db.execute(select(*columns).where(table.c.id == post_id)).first()
+
+    def delete_own_post(self, db: Session, post_id: int, author_id: int, deleted_at: datetime) -> Optional[Row]:
+        """
+        Soft delete a post if the user wrote it, with a single UPDATE ... WHERE id AND author_id ... RETURNING
+        statement, and remove its tags so that the tag feeds and trends drop it at once. The reactions and
+        comments stay until the purge worker deletes them with the post.
+        On databases without RETURNING (SQLite) the counters are read back with a second query.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param author_id: int - ID of the user who must be the author.
+        :param deleted_at: datetime - Time of the deletion.
+        :return: Optional[Row] - likes and dislikes of the deleted post,
+            None if no post with this ID was written by the user or if it was already deleted.
+        """
+        table = Post.__table__
+        columns = (table.c.likes, table.c.dislikes)
+        owned = (table.c.id == post_id, table.c.author_id == author_id, table.c.deleted_at.is_(None))
+        statement = update(table).where(*owned).values(deleted_at=deleted_at)
+        if db.get_bind().dialect.full_returning:
+            row = db.execute(statement.returning(*columns)).first()
+        elif db.execute(statement).rowcount == 0:
+            row = None
+        else:
+            row = db.execute(select(*columns).where(table.c.id == post_id)).first()
+
+        if row is not None:
+            tags = PostTag.__table__
+            db.execute(delete(tags).where(tags.c.post_id == post_id))
+        return row
+
+    def get_deleted_ids(self, db: Session, deleted_before: datetime, limit: int) -> List[int]:
+        """
+        Get the IDs of posts soft deleted before the given time, through the partial index on deleted_at.
+
+        :param db: Session - SQLAlchemy database session.
+        :param deleted_before: datetime - Only posts deleted before this time are returned.
+        :param limit: int - Maximum number of IDs to return.
+        :return: List[int] - IDs of the posts, oldest deletion first.
+        """
+        table = Post.__table__
+        statement = (
+            select(table.c.id)
+            .where(table.c.deleted_at.isnot(None), table.c.deleted_at < deleted_before)
+            .order_by(table.c.deleted_at)
+            .limit(limit)
+        )
+        return list(db.execute(statement).scalars())
+
+    def purge_deleted(self, db: Session, ids: List[int]) -> int:
+        """
+        Hard delete soft deleted posts; the rows referencing them must be deleted first.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param ids: List[int] - IDs of the posts.
+        :return: int - Number of deleted posts.
+        """
+        table = Post.__table__
+        return db.execute(delete(table).where(table.c.id.in_(ids), table.c.deleted_at.isnot(None))).rowcount
+
+    def add_comments(self, db: Session, post_id: int, count: int) -> Optional[int]:
+        """
+        Add to the comment count of a post with a single UPDATE ... RETURNING statement, which also locks the post
+        row until the end of the transaction. On databases without RETURNING (SQLite) the count is read back.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param count: int - Number of comments added (negative when removed).
+        :return: Optional[int] - New comment count, None if the post does not exist or was deleted.
+        """
+        table = Post.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == post_id, table.c.deleted_at.is_(None))
+            .values(comment_count=table.c.comment_count + count)
+        )
+        if db.get_bind().dialect.full_returning:
+            return db.execute(statement.returning(table.c.comment_count)).scalar()
+
+        if db.execute(statement).rowcount == 0:
+            return None
+        return db.execute(select(table.c.comment_count).where(table.c.id == post_id)).scalar()
+
+    def get_texts_chunk(self, db: Session, after_id: int, limit: int) -> List[Row]:
+        """
+        Get the next chunk of post texts in ascending ID order, skipping the deleted posts.
+
+        :param db: Session - SQLAlchemy database session.
+        :param after_id: int - Return only posts with an ID greater than this one.
+        :param limit: int - Maximum number of posts to return.
+        :return: List[Row] - Rows with the id, text and publication_date of the posts.
+        """
+        return (
+            db.query(Post.id, Post.text, Post.publication_date)
+            .filter(Post.id > after_id, Post.deleted_at.is_(None))
+            .order_by(Post.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_posts_by_author(
+        self, db: Session, author_id: int, author: str, before_id: Optional[int], limit: int
+    ) -> List[PostSchema]:
+        """
+        Get a page of the posts written by the author that were not deleted, newest first.
+
+        Only the columns needed for the response are selected, so the query is answered from the partial
+        (author_id, id DESC) index of the live posts and the post rows without loading the author relationship.
+
+        :param db: Session - SQLAlchemy database session.
+        :param author_id: int - ID of the author.
+        :param author: str - Username of the author.
+        :param before_id: Optional[int] - Return only posts with an ID lower than this one (keyset cursor).
+        :param limit: int - Maximum number of posts to return.
+        :return: List[Post] - List of posts.
+        """
+        query = db.query(
+            Post.id, Post.text, Post.publication_date, Post.likes, Post.dislikes, Post.comment_count
+        ).filter(Post.author_id == author_id, Post.deleted_at.is_(None))
+        if before_id is not None:
+            query = query.filter(Post.id < before_id)
+
+        rows = query.order_by(desc(Post.id)).limit(limit).all()
+        return [
+            PostSchema(
+                id=row.id,
+                text=row.text,
+                author=author,
+                publication_date=row.publication_date,
+                likes=row.likes,
+                dislikes=row.dislikes,
+                comment_count=row.comment_count,
+            )
+            for row in rows
+        ]
+
+    def get_posts_by_ids(self, db: Session, ids: List[int]) -> List[PostSchema]:
+        """
+        Get the posts with the given IDs, together with their authors, in a single query.
+
+        :param db: Session - SQLAlchemy database session.
+        :param ids: List[int] - IDs of the posts.
+        :return: List[Post] - List of found posts that were not deleted, in no particular order.
+        """
+        if not ids:
+            return []
+
+        rows = (
+            db.query(
+                Post.id, Post.text, Post.publication_date, Post.likes, Post.dislikes, Post.comment_count, User.username
+            )
+            .join(User, User.id == Post.author_id)
+            .filter(Post.id.in_(ids), Post.deleted_at.is_(None))
+            .all()
+        )
+        return [
+            PostSchema(
+                id=row.id,
+                text=row.text,
+                author=row.username,
+                publication_date=row.publication_date,
+                likes=row.likes,
+                dislikes=row.dislikes,
+                comment_count=row.comment_count,
+            )
+            for row in rows
+        ]
+
+    def get_rows_by_ids(self, db: Session, ids: List[int]) -> Dict[int, Any]:
+        """
+        Get the columns of the posts with the given IDs in a single query, without their authors.
+
+        :param db: Session - SQLAlchemy database session.
+        :param ids: List[int] - IDs of the posts.
+        :return: Dict[int, Any] - Rows of the found posts that were not deleted, by ID.
+        """
+        rows = (
+            db.query(
+                Post.id, Post.text, Post.publication_date, Post.likes, Post.dislikes, Post.comment_count, Post.author_id
+            )
+            .filter(Post.id.in_(ids), Post.deleted_at.is_(None))
+            .all()
+        )
+        return {row.id: row for row in rows}
+
     def add_like(self, db: Session, post: Post) -> None:
         """
-        Increment the like count of a post and commit the changes to the database.
+        Increment the like count of a post. The change is committed by the caller.
 
         :param db: Session - SQLAlchemy database session.
         :param post: Post - Post object to update.
         :return: None
         """
         post.likes += 1
-        db.commit()
 
     def remove_like(self, db: Session, post: Post) -> None:
         """
-        Decrement the like count of a post and commit the changes to the database.
+        Decrement the like count of a post. The change is committed by the caller.
 
         :param db: Session - SQLAlchemy database session.
         :param post: Post - Post object to update.
         :return: None
         """
         post.likes -= 1
-        db.commit()
 
     def add_dislike(self, db: Session, post: Post) -> None:
         """
-        Increment the dislike count of a post and commit the changes to the database.
+        Increment the dislike count of a post. The change is committed by the caller.
 
         :param db: Session - SQLAlchemy database session.
         :param post: Post - Post object to update.
         :return: None
         """
         post.dislikes += 1
-        db.commit()
 
     def remove_dislike(self, db: Session, post: Post) -> None:
         """
-        Decrement the dislike count of a post and commit the changes to the database.
+        Decrement the dislike count of a post. The change is committed by the caller.
 
         :param db: Session - SQLAlchemy database session.
         :param post: Post - Post object to update.
         :return: None
         """
         post.dislikes -= 1
-        db.commit()
 
 
 crud_post = CRUDPost(Post)
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import and_, exists, func
+from sqlalchemy.orm import Session, aliased
+
+from src.core.crud import CRUDBase
+from src.core.crud.crud_checkpoint import crud_checkpoint
+from src.core.models import PostChange
+
+HORIZON_CHECKPOINT = "post_change_horizon"
+
+
+class CRUDPostChange(CRUDBase[PostChange, BaseModel, BaseModel]):
+    def record(self, db: Session, post_id: int, deleted: bool = False) -> None:
+        """
+        Append a change of a post to the change log. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the changed post.
+        :param deleted: bool - True if the post was deleted (tombstone).
+        :return: None
+        """
+        db.add(PostChange(post_id=post_id, deleted=deleted))
+
+    def get_changes(self, db: Session, since: int, limit: int, recorded_before: datetime) -> List[PostChange]:
+        """
+        Get the changes recorded after the sequence number, in sequence order, up to the first one recorded at or
+        after recorded_before. Sequence numbers are allocated before the commit, so a change may become visible
+        after a greater one: stopping at the recent changes keeps the cursor from moving past a change that is not
+        committed yet, as long as the write transactions are shorter than the lag.
+
+        :param db: Session - SQLAlchemy database session.
+        :param since: int - Return only changes with a greater sequence number.
+        :param limit: int - Maximum number of changes to return.
+        :param recorded_before: datetime - UTC time the changes must have been recorded before.
+        :return: List[PostChange] - List of changes.
+        """
+        changes = db.query(PostChange).filter(PostChange.seq > since).order_by(PostChange.seq).limit(limit).all()
+        for position, change in enumerate(changes):
+            if change.changed_at >= recorded_before:
+                return changes[:position]
+        return changes
+
+    def get_last_seq(self, db: Session, recorded_before: datetime) -> int:
+        """
+        Get the sequence number a client can resume from after a full resync: the one before the first change
+        recorded at or after the given time, see get_changes.
+
+        :param db: Session - SQLAlchemy database session.
+        :param recorded_before: datetime - UTC time the changes must have been recorded before.
+        :return: int - Sequence number, 0 if the log is empty.
+        """
+        first_recent = db.query(func.min(PostChange.seq)).filter(PostChange.changed_at >= recorded_before).scalar()
+        if first_recent is not None:
+            return first_recent - 1
+        return db.query(func.max(PostChange.seq)).scalar() or 0
+
+    def get_horizon(self, db: Session) -> int:
+        """
+        Get the highest sequence number of a tombstone removed by compaction.
+        Clients whose cursor is below it may have missed a deletion and must resync.
+
+        :param db: Session - SQLAlchemy database session.
+        :return: int - Compaction horizon.
+        """
+        return crud_checkpoint.get_value(db=db, name=HORIZON_CHECKPOINT)
+
+    def compact(self, db: Session, cutoff: datetime, batch_size: int) -> int:
+        """
+        Remove one batch of changes older than the cutoff that are superseded by a later change of the same post,
+        or are tombstones, and commit.
+
+        :param db: Session - SQLAlchemy database session.
+        :param cutoff: datetime - Only changes recorded before this moment are removed.
+        :param batch_size: int - Maximum number of changes removed.
+        :return: int - Number of removed changes.
+        """
+        later = aliased(PostChange)
+        superseded = exists().where(and_(later.post_id == PostChange.post_id, later.seq > PostChange.seq))
+        rows = (
+            db.query(PostChange.seq, PostChange.deleted)
+            .filter(PostChange.changed_at < cutoff, superseded | PostChange.deleted.is_(True))
+            .order_by(PostChange.seq)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return 0
+
+        last_tombstone: Optional[int] = max((row.seq for row in rows if row.deleted), default=None)
+        if last_tombstone is not None and last_tombstone > self.get_horizon(db=db):
+            crud_checkpoint.set_value(db=db, name=HORIZON_CHECKPOINT, value=last_tombstone)
+
+        db.query(PostChange).filter(PostChange.seq.in_([row.seq for row in rows])).delete(synchronize_session=False)
+        db.commit()
+        return len(rows)
+
+
+crud_post_change = CRUDPostChange(PostChange)
@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from pydantic import BaseModel
+from sqlalchemy import delete, desc, insert
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase
+from src.core.models import Post, PostTag, User
+from src.core.schemas import Post as PostSchema
+
+
+class CRUDPostTag(CRUDBase[PostTag, BaseModel, BaseModel]):
+    def add_tags(self, db: Session, post_id: int, tags: List[str], created_at: Optional[datetime] = None) -> None:
+        """
+        Add tags to a post in a single statement. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param tags: List[str] - Tags not yet attached to the post.
+        :param created_at: Optional[datetime] - Time the tags count as used at, now if not given.
+        :return: None
+        """
+        if not tags:
+            return
+        rows = [{"post_id": post_id, "tag": tag} for tag in tags]
+        if created_at is not None:
+            for row in rows:
+                row["created_at"] = created_at
+        db.execute(insert(PostTag.__table__), rows)
+
+    def get_tags_by_post_ids(self, db: Session, post_ids: List[int]) -> Dict[int, Set[str]]:
+        """
+        Get the tags of the posts in a single query.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_ids: List[int] - IDs of the posts.
+        :return: Dict[int, Set[str]] - Tags by post ID; posts without tags are missing.
+        """
+        tags: Dict[int, Set[str]] = {}
+        if not post_ids:
+            return tags
+        for row in db.query(PostTag.post_id, PostTag.tag).filter(PostTag.post_id.in_(post_ids)):
+            tags.setdefault(row.post_id, set()).add(row.tag)
+        return tags
+
+    def set_tags(
+        self, db: Session, post_id: int, tags: List[str], current: Set[str], created_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Rewrite only the changed tags of a post: the removed ones are deleted and the new ones inserted.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param tags: List[str] - Tags the post must have.
+        :param current: Set[str] - Tags the post has.
+        :param created_at: Optional[datetime] - Time the new tags count as used at, now if not given.
+        :return: None
+        """
+        removed = current.difference(tags)
+        if removed:
+            table = PostTag.__table__
+            db.execute(delete(table).where(table.c.post_id == post_id, table.c.tag.in_(removed)))
+        self.add_tags(db=db, post_id=post_id, tags=[tag for tag in tags if tag not in current], created_at=created_at)
+
+    def delete_by_post_id(self, db: Session, post_id: int) -> None:
+        """
+        Delete the tags of a post. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :return: None
+        """
+        table = PostTag.__table__
+        db.execute(delete(table).where(table.c.post_id == post_id))
+
+    def get_posts_by_tag(self, db: Session, tag: str, before_id: Optional[int], limit: int) -> List[PostSchema]:
+        """
+        Get a page of posts with the tag, newest first.
+
+        The (tag, post_id DESC) index gives the post IDs in order, so only the posts of the page are read.
+
+        :param db: Session - SQLAlchemy database session.
+        :param tag: str - Tag, lowercase and without the "#".
+        :param before_id: Optional[int] - Return only posts with an ID lower than this one (keyset cursor).
+        :param limit: int - Maximum number of posts to return.
+        :return: List[Post] - List of posts.
+        """
+        query = (
+            db.query(
+                Post.id, Post.text, Post.publication_date, Post.likes, Post.dislikes, Post.comment_count, User.username
+            )
+            .select_from(PostTag)
+            .join(Post, Post.id == PostTag.post_id)
+            .join(User, User.id == Post.author_id)
+            .filter(PostTag.tag == tag)
+        )
+        if before_id is not None:
+            query = query.filter(PostTag.post_id < before_id)
+
+        rows = query.order_by(desc(PostTag.post_id)).limit(limit).all()
+        return [
+            PostSchema(
+                id=row.id,
+                text=row.text,
+                author=row.username,
+                publication_date=row.publication_date,
+                likes=row.likes,
+                dislikes=row.dislikes,
+                comment_count=row.comment_count,
+            )
+            for row in rows
+        ]
+
+
+crud_post_tag = CRUDPostTag(PostTag)
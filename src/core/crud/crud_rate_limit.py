@@ -0,0 +1,69 @@
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase, get_insert
+from src.core.models import RateLimitBucket
+
+
+class CRUDRateLimit(CRUDBase[RateLimitBucket, BaseModel, BaseModel]):
+    def take(self, db: Session, key: str, rate: float, capacity: float, cost: float, now: float) -> bool:
+        """
+        Take tokens from a bucket in a single atomic statement, creating the bucket full if it does not exist.
+
+        The bucket is refilled with the tokens accrued since its last update. When not enough tokens are available,
+        the WHERE clause of the upsert skips the update and no row is affected.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: str - Bucket key.
+        :param rate: float - Tokens added per second.
+        :param capacity: float - Maximum number of tokens.
+        :param cost: float - Tokens to take.
+        :param now: float - Current Unix time.
+        :return: bool - True if the tokens were taken.
+        """
+        least = func.min if db.get_bind().dialect.name == "sqlite" else func.least
+        insert = get_insert(db)
+        statement = insert(RateLimitBucket).values(key=key, tokens=capacity - cost, updated_at=now)
+        refilled = least(capacity, RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * rate)
+        statement = statement.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={"tokens": refilled - cost, "updated_at": now},
+            where=refilled >= cost,
+        )
+        return db.execute(statement).rowcount > 0
+
+    def get_tokens(self, db: Session, key: str, rate: float, capacity: float, now: float) -> float:
+        """
+        Get the tokens available in a bucket, with the ones accrued since its last update.
+
+        :param db: Session - SQLAlchemy database session.
+        :param key: str - Bucket key.
+        :param rate: float - Tokens added per second.
+        :param capacity: float - Maximum number of tokens.
+        :param now: float - Current Unix time.
+        :return: float - Number of tokens, the capacity if the bucket does not exist.
+        """
+        bucket = db.query(RateLimitBucket).filter(RateLimitBucket.key == key).first()
+        if bucket is None:
+            return capacity
+        return min(capacity, bucket.tokens + (now - bucket.updated_at) * rate)
+
+    def purge(self, db: Session, updated_before: float) -> int:
+        """
+        Delete the buckets not used since the given time; they are full again anyway.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param updated_before: float - Unix time.
+        :return: int - Number of deleted buckets.
+        """
+        return (
+            db.query(RateLimitBucket)
+            .filter(RateLimitBucket.updated_at < updated_before)
+            .delete(synchronize_session=False)
+        )
+
+
+crud_rate_limit = CRUDRateLimit(RateLimitBucket)
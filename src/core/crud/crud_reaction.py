@@ -1,14 +1,21 @@
+from typing import List, Optional
+
+from sqlalchemy import column, delete, select, table, tuple_
 from sqlalchemy.orm import Session
 
 from src.core.crud import CRUDBase
-from src.core.models import Reaction
+from src.core.models import Reaction, ReactionType
 from src.core.schemas import ReactionCreate, ReactionUpdate
 
+# Column of the reaction type before the kind migration, dropped by its contract revision
+legacy_reaction = table("reaction", column("post_id"), column("user_id"), column("reaction_type"))
+LEGACY_REACTION_TYPES = {"like": ReactionType.LIKE, "dislike": ReactionType.DISLIKE}
+
 
 class CRUDReaction(CRUDBase[Reaction, ReactionCreate, ReactionUpdate]):
     def get_reaction(self, db: Session, post_id: int, user_id: int) -> Reaction:
         """
-        Get the reaction for a specific post and user from the database.
+        Get the reaction for a specific post and user from the database, through the primary key.
 
         :param db: Session - SQLAlchemy database session.
         :param post_id: int - ID of the post.
@@ -17,19 +24,72 @@ class CRUDReaction(CRUDBase[Reaction, ReactionCreate, ReactionUpdate]):
         """
         return db.query(Reaction).filter_by(post_id=post_id, user_id=user_id).first()
 
-    def add_reaction(self, db: Session, post_id: int, user_id: int, reaction_type: str) -> None:
+    def get_kind(self, db: Session, reaction: Reaction) -> Optional[ReactionType]:
+        """
+        Get the type of a reaction. Between the expand and contract revisions of the kind migration, the rows
+        written before the deployment have no kind until backfill_reaction_kind reaches them: their reaction_type
+        string is read instead.
+
+        :param db: Session - SQLAlchemy database session.
+        :param reaction: Reaction - Reaction object.
+        :return: Optional[ReactionType] - Type of the reaction, None if it has none.
+        """
+        if reaction.kind is not None:
+            return ReactionType(reaction.kind)
+        reaction_type = db.execute(
+            select(legacy_reaction.c.reaction_type).where(
+                legacy_reaction.c.post_id == reaction.post_id, legacy_reaction.c.user_id == reaction.user_id
+            )
+        ).scalar()
+        return LEGACY_REACTION_TYPES.get(reaction_type)
+
+    def add_reaction(self, db: Session, post_id: int, user_id: int, kind: ReactionType) -> None:
         """
-        Add a new reaction to the database.
+        Add a new reaction to the session. The change is committed by the caller.
 
         :param db: Session - SQLAlchemy database session.
         :param post_id: int - ID of the post.
         :param user_id: int - ID of the user.
-        :param reaction_type: str - Type of the reaction.
+        :param kind: ReactionType - Type of the reaction.
         :return: None
         """
-        reaction = Reaction(post_id=post_id, user_id=user_id, reaction_type=reaction_type)
+        reaction = Reaction(post_id=post_id, user_id=user_id, kind=kind)
         db.add(reaction)
-        db.commit()
+
+    def set_kind(self, db: Session, reaction: Reaction, kind: ReactionType) -> None:
+        """
+        Change the type of an existing reaction. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param reaction: Reaction - Reaction object to update.
+        :param kind: ReactionType - New type of the reaction.
+        :return: None
+        """
+        reaction.kind = kind
+
+    def remove_reaction(self, db: Session, reaction: Reaction) -> None:
+        """
+        Mark a reaction for deletion. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param reaction: Reaction - Reaction object to delete.
+        :return: None
+        """
+        db.delete(reaction)
+
+    def delete_by_post_ids(self, db: Session, post_ids: List[int], limit: int) -> int:
+        """
+        Delete a batch of the reactions to the given posts, found through the primary key.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_ids: List[int] - IDs of the posts.
+        :param limit: int - Maximum number of reactions deleted.
+        :return: int - Number of deleted reactions.
+        """
+        table = Reaction.__table__
+        batch = select(table.c.post_id, table.c.user_id).where(table.c.post_id.in_(post_ids)).limit(limit)
+        return db.execute(delete(table).where(tuple_(table.c.post_id, table.c.user_id).in_(batch))).rowcount
 
 
 crud_reaction = CRUDReaction(Reaction)
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase
+from src.core.models import ReactionEvent
+
+
+class CRUDReactionEvent(CRUDBase[ReactionEvent, BaseModel, BaseModel]):
+    def record(self, db: Session, post_id: int, author_id: int, likes: int, dislikes: int) -> None:
+        """
+        Append a change of the reactions to a post. The change is committed by the caller, with the reaction.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_id: int - ID of the post.
+        :param author_id: int - ID of the author of the post.
+        :param likes: int - Change of the like count.
+        :param dislikes: int - Change of the dislike count.
+        :return: None
+        """
+        db.add(
+            ReactionEvent(
+                post_id=post_id, author_id=author_id, likes=likes, dislikes=dislikes, created_at=datetime.utcnow()
+            )
+        )
+
+    def claim_batch(self, db: Session, limit: int) -> List[Row]:
+        """
+        Lock the oldest events not locked by another transaction, so that concurrent aggregators take disjoint
+        batches (FOR UPDATE SKIP LOCKED; SQLite serializes the writers instead).
+
+        :param db: Session - SQLAlchemy database session.
+        :param limit: int - Maximum number of events.
+        :return: List[Row] - Events, locked until the end of the transaction.
+        """
+        table = ReactionEvent.__table__
+        statement = (
+            select(table.c.id, table.c.post_id, table.c.author_id, table.c.likes, table.c.dislikes, table.c.created_at)
+            .order_by(table.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return db.execute(statement).all()
+
+    def delete_by_ids(self, db: Session, ids: List[int]) -> None:
+        """
+        Delete aggregated events. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param ids: List[int] - IDs of the events.
+        :return: None
+        """
+        table = ReactionEvent.__table__
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+
+
+crud_reaction_event = CRUDReactionEvent(ReactionEvent)
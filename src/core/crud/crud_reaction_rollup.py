@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase, get_insert
+from src.core.models import ReactionRollup
+
+HOUR = 3600
+DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+
+# (scope, subject_id, period, bucket)
+RollupKey = Tuple[str, int, int, datetime]
+
+
+def get_period_bucket(moment: datetime, period: int) -> datetime:
+    """
+    Get the start of the bucket of the given length a moment falls in.
+
+    :param moment: datetime - Naive UTC time.
+    :param period: int - Length of the buckets in seconds, a divisor of a day.
+    :return: datetime - Start of the bucket.
+    """
+    seconds = int((moment - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % period)
+
+
+class CRUDReactionRollup(CRUDBase[ReactionRollup, BaseModel, BaseModel]):
+    def add(self, db: Session, changes: Dict[RollupKey, Tuple[int, int]]) -> None:
+        """
+        Add changes to the buckets with one upsert per bucket, in key order so that concurrent aggregators lock the
+        rows in the same order. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param changes: Dict[RollupKey, Tuple[int, int]] - Change of the likes and dislikes by bucket.
+        :return: None
+        """
+        insert = get_insert(db)
+        table = ReactionRollup.__table__
+        for (scope, subject_id, period, bucket), (likes, dislikes) in sorted(changes.items()):
+            statement = insert(table).values(
+                scope=scope, subject_id=subject_id, period=period, bucket=bucket, likes=likes, dislikes=dislikes
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.scope, table.c.subject_id, table.c.period, table.c.bucket],
+                set_={"likes": table.c.likes + likes, "dislikes": table.c.dislikes + dislikes},
+            )
+            db.execute(statement)
+
+    def get_series(
+        self, db: Session, scope: str, subject_id: int, period: int, since: datetime, until: datetime
+    ) -> List[Row]:
+        """
+        Get the buckets of a subject in a range, with one range scan of the primary key.
+
+        :param db: Session - SQLAlchemy database session.
+        :param scope: str - "post" or "author".
+        :param subject_id: int - ID of the post or of the author.
+        :param period: int - Length of the buckets in seconds.
+        :param since: datetime - Start of the first bucket.
+        :param until: datetime - Start of the last bucket.
+        :return: List[Row] - Buckets with their likes and dislikes, oldest first; empty buckets have no row.
+        """
+        table = ReactionRollup.__table__
+        statement = (
+            select(table.c.bucket, table.c.likes, table.c.dislikes)
+            .where(
+                table.c.scope == scope,
+                table.c.subject_id == subject_id,
+                table.c.period == period,
+                table.c.bucket >= since,
+                table.c.bucket <= until,
+            )
+            .order_by(table.c.bucket)
+        )
+        return db.execute(statement).all()
+
+    def delete_by_post_ids(self, db: Session, post_ids: List[int]) -> int:
+        """
+        Delete the buckets of purged posts; the buckets of their authors are kept.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param post_ids: List[int] - IDs of the posts.
+        :return: int - Number of deleted buckets.
+        """
+        table = ReactionRollup.__table__
+        return db.execute(delete(table).where(table.c.scope == "post", table.c.subject_id.in_(post_ids))).rowcount
+
+
+crud_reaction_rollup = CRUDReactionRollup(ReactionRollup)
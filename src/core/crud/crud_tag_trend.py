@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import BaseModel
+from sqlalchemy import DateTime, delete, desc, func, insert, literal, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase
+from src.core.models import PostTag, TagTrend
+
+BUCKET = timedelta(hours=1)
+
+
+def get_bucket(moment: datetime) -> datetime:
+    """
+    Get the start of the hour bucket a moment falls in.
+
+    :param moment: datetime - Naive UTC time.
+    :return: datetime - Start of the hour.
+    """
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class CRUDTagTrend(CRUDBase[TagTrend, BaseModel, BaseModel]):
+    def rollup(self, db: Session, bucket: datetime, end: datetime) -> None:
+        """
+        Recompute the uses of every tag in an hour from the post_tag rows created in it.
+        Idempotent: the rows of the bucket are replaced. The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param bucket: datetime - Start of the hour.
+        :param end: datetime - End of the hour.
+        :return: None
+        """
+        trend = TagTrend.__table__
+        db.execute(delete(trend).where(trend.c.bucket == bucket))
+        uses = (
+            select(literal(bucket, DateTime), PostTag.tag, func.count())
+            .where(PostTag.created_at >= bucket, PostTag.created_at < end)
+            .group_by(PostTag.tag)
+        )
+        db.execute(insert(trend).from_select(["bucket", "tag", "uses"], uses))
+
+    def get_trending(self, db: Session, since: datetime, limit: int) -> List[Row]:
+        """
+        Get the most used tags since the given hour.
+
+        :param db: Session - SQLAlchemy database session.
+        :param since: datetime - Start of the first hour counted.
+        :param limit: int - Maximum number of tags to return.
+        :return: List[Row] - Rows with the tag and its uses, most used first.
+        """
+        uses = func.sum(TagTrend.uses).label("uses")
+        return (
+            db.query(TagTrend.tag, uses)
+            .filter(TagTrend.bucket >= since)
+            .group_by(TagTrend.tag)
+            .order_by(desc(uses), TagTrend.tag)
+            .limit(limit)
+            .all()
+        )
+
+
+crud_tag_trend = CRUDTagTrend(TagTrend)
@@ -1,5 +1,6 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from src.config import get_password_hash
@@ -29,6 +30,50 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """
         return db.query(User).filter(User.email == email).first()
 
+    def get_usernames_by_ids(self, db: Session, ids: List[int]) -> Dict[int, str]:
+        """
+        Get the usernames of the users with the given IDs in a single query.
+
+        :param db: Session - SQLAlchemy database session.
+        :param ids: List[int] - IDs of the users.
+        :return: Dict[int, str] - Usernames of the found users by ID.
+        """
+        rows = db.query(User.id, User.username).filter(User.id.in_(ids)).all()
+        return {row.id: row.username for row in rows}
+
+    def get_usernames_by_prefix(self, db: Session, prefix: str, limit: int) -> List[str]:
+        """
+        Get the usernames starting with the prefix, in code point order like the in-memory index.
+
+        The LIKE 'prefix%' condition is answered by a range scan of the text_pattern_ops index on PostgreSQL;
+        the wildcards of the prefix are escaped. The matches are sorted with the "C" collation there, which compares
+        the UTF-8 bytes, rather than with the collation of the database; SQLite compares them by default.
+
+        :param db: Session - SQLAlchemy database session.
+        :param prefix: str - Beginning of the usernames.
+        :param limit: int - Maximum number of usernames to return.
+        :return: List[str] - Matching usernames.
+        """
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        order = User.username.collate("C") if db.get_bind().dialect.name == "postgresql" else User.username
+        rows = (
+            db.query(User.username).filter(User.username.like(pattern, escape="\\")).order_by(order).limit(limit).all()
+        )
+        return [row.username for row in rows]
+
+    def get_identities_chunk(self, db: Session, after_id: int, limit: int) -> List[Row]:
+        """
+        Get the next chunk of user IDs, usernames and emails in ascending ID order.
+
+        :param db: Session - SQLAlchemy database session.
+        :param after_id: int - Return only users with an ID greater than this one.
+        :param limit: int - Maximum number of users to return.
+        :return: List[Row] - Rows with the id, username and email of the users.
+        """
+        return (
+            db.query(User.id, User.username, User.email).filter(User.id > after_id).order_by(User.id).limit(limit).all()
+        )
+
     def add_user(self, db: Session, obj_in: UserCreate, extra_fields: Optional[ExtraUserFields]) -> User:
         """
         Add a new user to the database.
@@ -0,0 +1,115 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.core.crud import CRUDBase, get_insert
+from src.core.models import Post, User, UserStats
+from src.core.schemas import UserStats as UserStatsSchema
+from src.core.schemas import UserStatsBase
+
+
+class CRUDUserStats(CRUDBase[UserStats, UserStatsBase, UserStatsBase]):
+    def get_by_username(self, db: Session, username: str) -> Optional[UserStatsSchema]:
+        """
+        Get the statistics of a user by username in a single query.
+
+        :param db: Session - SQLAlchemy database session.
+        :param username: str - Username of the user.
+        :return: Optional[UserStats] - User statistics if the user exists, None otherwise.
+        """
+        row = (
+            db.query(User.username, UserStats.posts_count, UserStats.likes_received, UserStats.dislikes_received)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .filter(User.username == username)
+            .first()
+        )
+        if not row:
+            return None
+        return UserStatsSchema(
+            username=row.username,
+            posts_count=row.posts_count or 0,
+            likes_received=row.likes_received or 0,
+            dislikes_received=row.dislikes_received or 0,
+        )
+
+    def increment(self, db: Session, user_id: int, posts: int = 0, likes: int = 0, dislikes: int = 0) -> None:
+        """
+        Add the deltas to the user statistics, creating the row if needed.
+        The change is committed by the caller.
+
+        :param db: Session - SQLAlchemy database session.
+        :param user_id: int - ID of the user.
+        :param posts: int - Delta of the posts count.
+        :param likes: int - Delta of the likes received.
+        :param dislikes: int - Delta of the dislikes received.
+        :return: None
+        """
+        statement = get_insert(db)(UserStats).values(
+            user_id=user_id, posts_count=posts, likes_received=likes, dislikes_received=dislikes
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "posts_count": UserStats.posts_count + posts,
+                "likes_received": UserStats.likes_received + likes,
+                "dislikes_received": UserStats.dislikes_received + dislikes,
+            },
+        )
+        db.execute(statement)
+
+    def get_user_ids_chunk(self, db: Session, after_id: int, limit: int) -> List[int]:
+        """
+        Get the next chunk of user IDs in ascending order.
+
+        :param db: Session - SQLAlchemy database session.
+        :param after_id: int - Return only IDs greater than this one.
+        :param limit: int - Maximum number of IDs to return.
+        :return: List[int] - List of user IDs.
+        """
+        rows = db.query(User.id).filter(User.id > after_id).order_by(User.id).limit(limit).all()
+        return [row.id for row in rows]
+
+    def rebuild_chunk(self, db: Session, user_ids: List[int]) -> None:
+        """
+        Recompute the statistics of the users from the post table and overwrite the stored values.
+
+        :param db: Session - SQLAlchemy database session.
+        :param user_ids: List[int] - IDs of the users to recompute, in ascending order.
+        :return: None
+        """
+        if not user_ids:
+            return
+
+        rows: List[Tuple[int, int, int, int]] = (
+            db.query(
+                Post.author_id,
+                func.count(Post.id),
+                func.coalesce(func.sum(Post.likes), 0),
+                func.coalesce(func.sum(Post.dislikes), 0),
+            )
+            .filter(Post.author_id.between(user_ids[0], user_ids[-1]), Post.deleted_at.is_(None))
+            .group_by(Post.author_id)
+            .all()
+        )
+        aggregates = {author_id: (posts, likes, dislikes) for author_id, posts, likes, dislikes in rows}
+        values = []
+        for user_id in user_ids:
+            posts, likes, dislikes = aggregates.get(user_id, (0, 0, 0))
+            values.append(
+                {"user_id": user_id, "posts_count": posts, "likes_received": likes, "dislikes_received": dislikes}
+            )
+        statement = get_insert(db)(UserStats).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "posts_count": statement.excluded.posts_count,
+                "likes_received": statement.excluded.likes_received,
+                "dislikes_received": statement.excluded.dislikes_received,
+            },
+        )
+        db.execute(statement)
+        db.commit()
+
+
+crud_user_stats = CRUDUserStats(UserStats)
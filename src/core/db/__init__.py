@@ -1 +1 @@
-from .session import SessionLocal
+from .session import SessionLocal, dispose_engine, init_engine
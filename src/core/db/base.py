@@ -1,3 +1,13 @@
+from src.core.models import Checkpoint  # noqa
+from src.core.models import Comment  # noqa
+from src.core.models import IdempotencyKey  # noqa
 from src.core.models import Post  # noqa
+from src.core.models import PostChange  # noqa
+from src.core.models import PostTag  # noqa
+from src.core.models import RateLimitBucket  # noqa
 from src.core.models import Reaction  # noqa
+from src.core.models import ReactionEvent  # noqa
+from src.core.models import ReactionRollup  # noqa
+from src.core.models import TagTrend  # noqa
 from src.core.models import User  # noqa
+from src.core.models import UserStats  # noqa
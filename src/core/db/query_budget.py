@@ -0,0 +1,173 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.db.statements import find_call_sites, normalize_statement
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block of code runs more statements than its budget allows."""
+
+
+class StatementShape:
+    __slots__ = ("count", "statement", "call_sites")
+
+    def __init__(self, statement: str, call_sites: List[str]) -> None:
+        self.count = 0
+        self.statement = statement
+        self.call_sites = call_sites
+
+
+class QueryCounter:
+    """Counts the statements of a block of code, grouped by their normalized shape."""
+
+    def __init__(self, label: str, max_queries: Optional[int], max_repeats: Optional[int]) -> None:
+        """
+        Initialize the counter.
+
+        :param label: str - name of the checked code (endpoint or test)
+        :param max_queries: Optional[int] - maximum number of statements, None for no limit
+        :param max_repeats: Optional[int] - maximum executions of the same statement shape, None for no limit
+        """
+        self.label = label
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.count = 0
+        self.shapes: Dict[str, StatementShape] = {}
+
+    def record(self, statement: str) -> None:
+        """
+        Record an executed statement. The call site is captured the first time a shape is seen.
+
+        :param statement: str - SQL statement
+        :return: None
+        """
+        self.count += 1
+        shape = normalize_statement(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            entry = self.shapes[shape] = StatementShape(statement=statement, call_sites=find_call_sites())
+        entry.count += 1
+
+    def violations(self) -> List[str]:
+        """
+        Describe every exceeded limit.
+
+        :return: List[str] - one report per violation, empty if the budget is respected
+        """
+        reports = []
+        if self.max_queries is not None and self.count > self.max_queries:
+            reports.append(f"{self.count} statements executed, budget is {self.max_queries}")
+
+        if self.max_repeats is not None:
+            for entry in self.shapes.values():
+                if entry.count > self.max_repeats:
+                    call_sites = "\n    ".join(entry.call_sites) or "unknown"
+                    reports.append(
+                        f"same statement executed {entry.count} times (limit {self.max_repeats}), "
+                        f"possible N+1:\n  {entry.statement}\n  called from:\n    {call_sites}"
+                    )
+        return reports
+
+    def report(self) -> str:
+        """
+        Build the full report of the violations and of every executed statement shape.
+
+        :return: str - report text
+        """
+        lines = [f"Query budget exceeded in {self.label}:"]
+        lines.extend(f"- {violation}" for violation in self.violations())
+        lines.append("Executed statements:")
+        for entry in sorted(self.shapes.values(), key=lambda shape: -shape.count):
+            call_site = entry.call_sites[0] if entry.call_sites else "unknown"
+            lines.append(f"  {entry.count} x {entry.statement}  [{call_site}]")
+        return "\n".join(lines)
+
+    def check(self, mode: str) -> None:
+        """
+        Enforce the budget.
+
+        :param mode: str - "raise" to raise QueryBudgetExceeded, "warn" to log a warning, "off" to do nothing
+        :return: None
+        """
+        if mode == "off" or not self.violations():
+            return
+        if mode == "raise":
+            raise QueryBudgetExceeded(self.report())
+        logger.warning(self.report())
+
+
+ACTIVE_COUNTER: ContextVar[Optional[QueryCounter]] = ContextVar("active_query_counter", default=None)
+
+
+def record_active_counter(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+    counter = ACTIVE_COUNTER.get()
+    if counter is not None:
+        counter.record(statement)
+
+
+def install_query_budget(engine: Engine) -> None:
+    """
+    Record the statements of the engine into the counter of the current request.
+
+    :param engine: Engine - engine to watch
+    :return: None
+    """
+    event.listen(engine, "before_cursor_execute", record_active_counter)
+
+
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Callable:
+    """
+    Declare the query budget of an endpoint, checked by QueryBudgetMiddleware.
+
+    :param max_queries: Optional[int] - maximum number of statements per request, QUERY_BUDGET_MAX_QUERIES if None
+    :param max_repeats: Optional[int] - maximum executions of the same statement shape per request,
+        QUERY_BUDGET_MAX_REPEATS if None
+    :return: Callable - decorator that leaves the endpoint unchanged
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, BUDGET_ATTRIBUTE, (max_queries, max_repeats))
+        return endpoint
+
+    return decorator
+
+
+@contextmanager
+def count_queries(
+    engine: Engine,
+    max_queries: Optional[int] = None,
+    max_repeats: Optional[int] = None,
+    mode: str = "raise",
+    label: str = "block",
+) -> Iterator[QueryCounter]:
+    """
+    Count every statement executed by the engine inside the block, from any thread, and enforce the budget on exit.
+
+    :param engine: Engine - engine to watch
+    :param max_queries: Optional[int] - maximum number of statements
+    :param max_repeats: Optional[int] - maximum executions of the same statement shape
+    :param mode: str - "raise" or "warn"
+    :param label: str - name of the block in the report
+    :return: Iterator[QueryCounter] - counter of the block
+    """
+    counter = QueryCounter(label=label, max_queries=max_queries, max_repeats=max_repeats)
+
+    def listener(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+        counter.record(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    counter.check(mode)
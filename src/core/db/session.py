@@ -1,9 +1,88 @@
+import os
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
 
 from ...config.config import settings
+from ..metrics import InstrumentedQueuePool, instrument_engine
+from .query_budget import install_query_budget
+from .slow_query import install_slow_query_log
+
+engine: Optional[Engine] = None
+
+# Bound to the engine by init_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def get_engine_options(dsn: str) -> Dict[str, Any]:
+    """
+    Get the create_engine() options for the pool settings.
+
+    :param dsn: str - database DSN
+    :return: Dict[str, Any] - engine options
+    """
+    if make_url(dsn).get_backend_name() == "sqlite":
+        # SQLite uses a pool of its own choosing, the pool settings do not apply
+        return {}
+    options: Dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.METRICS_ENABLED:
+        options["poolclass"] = InstrumentedQueuePool
+    return options
+
+
+def init_engine() -> Engine:
+    """
+    Create the engine of the process with its instrumentation and bind SessionLocal to it.
+    Called from the application lifespan and by the commands; later calls return the same engine.
+
+    :return: Engine - engine
+    """
+    global engine
+    if engine is not None:
+        return engine
+
+    engine = create_engine(settings.DATABASE_DSN, **get_engine_options(settings.DATABASE_DSN))
+    if settings.METRICS_ENABLED or settings.SERVER_TIMING_ENABLED:
+        instrument_engine(engine)
+    if settings.QUERY_BUDGET_MODE != "off":
+        install_query_budget(engine)
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        install_slow_query_log(
+            engine,
+            threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+            explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+            max_logs_per_second=settings.SLOW_QUERY_MAX_LOGS_PER_SECOND,
+        )
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+def dispose_engine() -> None:
+    """
+    Close the pooled connections and forget the engine.
+
+    :return: None
+    """
+    global engine
+    if engine is not None:
+        engine.dispose()
+        engine = None
+
+
+def _dispose_in_child() -> None:
+    # A forked worker must not use the connections of its parent: drop them without closing the sockets,
+    # which would break the parent's connections too, so the child opens its own
+    if engine is not None:
+        engine.dispose(close=False)
+
 
-engine = create_engine(
-    settings.DATABASE_DSN,
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_in_child)
@@ -0,0 +1,195 @@
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from src.core.db.statements import find_call_sites, normalize_statement
+from src.utils import TokenBucket, get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+ExplainJob = Tuple[str, Any, str]
+
+# Row locking clauses: such a SELECT is not explained, even though EXPLAIN without ANALYZE takes no lock
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+def is_plain_select(shape: str) -> bool:
+    """
+    Check whether a normalized statement is a SELECT without a row locking clause.
+
+    :param shape: str - normalized SQL statement
+    :return: bool - True if the statement can be explained
+    """
+    return shape.lstrip().upper().startswith("SELECT") and not LOCKING_CLAUSE.search(shape)
+
+
+def describe_parameters(parameters: Any) -> str:
+    """
+    Describe the shape of the bind parameters without their values.
+
+    :param parameters: Any - DBAPI parameters (dict, sequence, or a list of them for executemany)
+    :return: str - parameter names and types, e.g. {id_1: int, param_1: int}
+    """
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} x {describe_parameters(parameters[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def find_origin(call_sites: List[str]) -> str:
+    """
+    Pick the repository method among the call sites, falling back to the innermost application frame.
+
+    :param call_sites: List[str] - application frames, innermost first
+    :return: str - originating call site
+    """
+    for call_site in call_sites:
+        if "/repository/" in call_site:
+            return call_site
+    return call_sites[0] if call_sites else "unknown"
+
+
+class SlowQueryLog:
+    """
+    Logs slow statements and captures the plan of a sample of the slow plain SELECTs in a background thread.
+    The plans are estimates: the statements are explained without ANALYZE, so nothing is run a second time.
+    """
+
+    def __init__(
+        self, engine: Engine, threshold_ms: float, explain_sample_rate: float, max_logs_per_second: float
+    ) -> None:
+        """
+        Initialize the slow query log.
+
+        :param engine: Engine - engine to watch; EXPLAIN is only captured on PostgreSQL
+        :param threshold_ms: float - statements slower than this are logged
+        :param explain_sample_rate: float - fraction of the logged plain SELECTs that get an EXPLAIN
+        :param max_logs_per_second: float - rate limit of the log records, the excess is counted and dropped
+        """
+        self.engine = engine
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate if engine.dialect.name == "postgresql" else 0
+        self.log_bucket = TokenBucket(rate=max_logs_per_second, capacity=max(max_logs_per_second, 1))
+        self.suppressed = 0
+        self.explain_queue: "queue.Queue[ExplainJob]" = queue.Queue(maxsize=10)
+        self.explain_thread: Optional[threading.Thread] = None
+        # Connection of the EXPLAIN thread, outside the pool of the application
+        self.explain_engine: Optional[Engine] = None
+
+    def install(self) -> None:
+        """
+        Attach the hooks to the engine.
+
+        :return: None
+        """
+        event.listen(self.engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(self.engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def before_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        """
+        Remember when the statement started.
+
+        :return: None
+        """
+        if context is not None:
+            context.slow_query_start = time.perf_counter()
+
+    def after_cursor_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        """
+        Log the statement if it was slower than the threshold and the rate limit allows it.
+
+        :return: None
+        """
+        start = getattr(context, "slow_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if elapsed < self.threshold:
+            return
+        if not self.log_bucket.try_acquire():
+            self.suppressed += 1
+            return
+
+        suppressed, self.suppressed = self.suppressed, 0
+        origin = find_origin(find_call_sites(limit=5))
+        shape = normalize_statement(statement)
+        logger.warning(
+            f"Slow query: {elapsed * 1000:.1f} ms in {origin}; "
+            f"parameters: {describe_parameters(parameters)}; "
+            f"suppressed since last record: {suppressed}; statement: {shape}"
+        )
+        if not executemany and is_plain_select(shape) and random.random() < self.explain_sample_rate:
+            self.schedule_explain(statement=statement, parameters=parameters, origin=origin)
+
+    def schedule_explain(self, statement: str, parameters: Any, origin: str) -> None:
+        """
+        Queue an EXPLAIN of the statement for the background thread; skipped if the queue is full.
+
+        :param statement: str - SQL statement
+        :param parameters: Any - DBAPI parameters of the statement
+        :param origin: str - call site the statement came from
+        :return: None
+        """
+        if self.explain_thread is None:
+            self.explain_thread = threading.Thread(target=self.explain_worker, name="slow-query-explain", daemon=True)
+            self.explain_thread.start()
+        try:
+            self.explain_queue.put_nowait((statement, parameters, origin))
+        except queue.Full:
+            pass
+
+    def explain_worker(self) -> None:
+        """
+        Run the queued EXPLAINs one at a time, on a connection of their own and in a rolled back transaction.
+
+        :return: None
+        """
+        while True:
+            statement, parameters, origin = self.explain_queue.get()
+            try:
+                if self.explain_engine is None:
+                    self.explain_engine = create_engine(self.engine.url, pool_size=1, max_overflow=0)
+                with self.explain_engine.connect() as connection, connection.begin() as transaction:
+                    connection.exec_driver_sql("SET LOCAL statement_timeout = '5s'")
+                    rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                    plan = "\n".join(row[0] for row in rows)
+                    transaction.rollback()
+                logger.warning(f"Estimated plan of the slow query in {origin}:\n{plan}")
+            except Exception as error:
+                logger.error(f"Error while explaining a slow query from {origin}: {error}")
+
+
+def install_slow_query_log(
+    engine: Engine, threshold_ms: float, explain_sample_rate: float, max_logs_per_second: float
+) -> SlowQueryLog:
+    """
+    Log the statements of the engine that are slower than the threshold.
+
+    :param engine: Engine - engine to watch
+    :param threshold_ms: float - statements slower than this are logged
+    :param explain_sample_rate: float - fraction of the logged plain SELECTs that get an EXPLAIN
+    :param max_logs_per_second: float - rate limit of the log records
+    :return: SlowQueryLog - installed slow query log
+    """
+    slow_query_log = SlowQueryLog(
+        engine=engine,
+        threshold_ms=threshold_ms,
+        explain_sample_rate=explain_sample_rate,
+        max_logs_per_second=max_logs_per_second,
+    )
+    slow_query_log.install()
+    return slow_query_log
@@ -0,0 +1,46 @@
+import re
+import sys
+from pathlib import Path
+from typing import List
+
+SRC_DIR = str(Path(__file__).resolve().parents[2])
+INSTRUMENTATION_DIRS = tuple(
+    str(Path(SRC_DIR, *parts)) for parts in (("core", "db"), ("core", "metrics"), ("middleware",), ("testing",))
+)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+BIND_PARAMETER = re.compile(r"%\(\w+\)s|%s|:\w+|\?|\$\d+")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape: literals and bind parameters become ?, IN lists collapse to (?).
+
+    :param statement: str - SQL statement
+    :return: str - normalized statement
+    """
+    shape = STRING_LITERAL.sub("?", statement)
+    shape = BIND_PARAMETER.sub("?", shape)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = PLACEHOLDER_LIST.sub("(?)", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+def find_call_sites(limit: int = 3) -> List[str]:
+    """
+    Find the application frames that led to the current statement, innermost first.
+
+    :param limit: int - maximum number of frames to return
+    :return: List[str] - "path:line in function" for each frame under src/, outside of the instrumentation
+    """
+    call_sites = []
+    frame = sys._getframe(1)
+    while frame is not None and len(call_sites) < limit:
+        filename = frame.f_code.co_filename
+        if filename.startswith(SRC_DIR) and not filename.startswith(INSTRUMENTATION_DIRS):
+            call_sites.append(f"{filename[len(SRC_DIR) - 3:]}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return call_sites
@@ -0,0 +1,73 @@
+import logging
+from typing import Callable, List
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from src.config import settings
+from src.core.crud import crud_post, crud_reaction, crud_user, crud_user_stats
+from src.utils import get_logger
+
+from .session import SessionLocal
+
+logger = get_logger(__file__, logging.DEBUG)
+
+# The queries of the hot paths, run with parameters that match nothing: the first execution of a statement
+# compiles it and stores it in the engine's compiled cache, so the first requests do not pay for it
+HOT_QUERIES: List[Callable[[Session], object]] = [
+    lambda db: crud_user.get(db=db, id=0),
+    lambda db: crud_user.get_by_username(db=db, username=""),
+    lambda db: crud_user.get_by_email(db=db, email=""),
+    lambda db: crud_post.get_live(db=db, id=0),
+    lambda db: crud_post.get_rows_by_ids(db=db, ids=[0]),
+    lambda db: crud_post.get_posts_by_author(
+        db=db, author_id=0, author="", before_id=None, limit=settings.POSTS_PAGE_SIZE
+    ),
+    lambda db: crud_post.get_posts_by_author(
+        db=db, author_id=0, author="", before_id=0, limit=settings.POSTS_PAGE_SIZE
+    ),
+    lambda db: crud_reaction.get_reaction(db=db, post_id=0, user_id=0),
+    lambda db: crud_user_stats.get_by_username(db=db, username=""),
+]
+
+
+def open_connections(engine: Engine) -> int:
+    """
+    Open the connections the pool keeps, so the first requests do not wait for connection setup.
+
+    :param engine: Engine - engine to warm up
+    :return: int - number of connections opened
+    """
+    count = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def warm_up(engine: Engine) -> bool:
+    """
+    Open the pool connections and compile the hot queries. Blocking, run it in a thread from async code.
+
+    A failure is logged and does not stop the startup: the readiness probe reports whether the database answers.
+
+    :param engine: Engine - engine to warm up
+    :return: bool - True if the warm-up succeeded
+    """
+    try:
+        connections = open_connections(engine)
+        with SessionLocal() as db:
+            for query in HOT_QUERIES:
+                query(db)
+            db.rollback()
+    except SQLAlchemyError as error:
+        logger.warning(f"Database warm-up failed: {error}")
+        return False
+    logger.info(f"Opened {connections} database connections and compiled {len(HOT_QUERIES)} hot queries")
+    return True
@@ -0,0 +1,2 @@
+from .backends import BrokerBackend, LocalBackend, PostgresBackend
+from .broker import Broker, Subscription, broker
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+
+from src.utils import get_logger
+
+try:
+    import psycopg2
+except ImportError:  # SQLite setups run without the PostgreSQL driver and can only use the local backend
+    psycopg2 = None
+
+logger = get_logger(__file__, logging.DEBUG)
+
+Dispatch = Callable[[str], None]
+
+
+class BrokerBackend(ABC):
+    """Transport that delivers published payloads to the brokers of every worker."""
+
+    @abstractmethod
+    async def start(self, dispatch: Dispatch) -> None:
+        """
+        Start receiving payloads.
+
+        :param dispatch: Dispatch - callback invoked on the event loop for every received payload
+        :return: None
+        """
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """
+        Stop receiving payloads and release the resources.
+
+        :return: None
+        """
+
+    @abstractmethod
+    def publish(self, payload: str) -> None:
+        """
+        Publish a payload to all workers, without blocking the caller.
+
+        :param payload: str - serialized event
+        :return: None
+        """
+
+
+class LocalBackend(BrokerBackend):
+    """Delivers payloads to the current process only. Used for a single worker and in tests."""
+
+    def __init__(self) -> None:
+        self.__dispatch: Optional[Dispatch] = None
+
+    async def start(self, dispatch: Dispatch) -> None:
+        """
+        Start receiving payloads.
+
+        :param dispatch: Dispatch - callback invoked for every published payload
+        :return: None
+        """
+        self.__dispatch = dispatch
+
+    async def stop(self) -> None:
+        """
+        Stop receiving payloads.
+
+        :return: None
+        """
+        self.__dispatch = None
+
+    def publish(self, payload: str) -> None:
+        """
+        Deliver the payload to the local broker.
+
+        :param payload: str - serialized event
+        :return: None
+        """
+        if self.__dispatch:
+            self.__dispatch(payload)
+
+
+class PostgresBackend(BrokerBackend):
+    """
+    Delivers payloads to every worker through PostgreSQL LISTEN/NOTIFY.
+
+    The notifications are sent by a single background thread, in publication order, so the event loop never waits
+    for the database. A lost listener connection is reopened with an exponential backoff; the events notified in
+    the meantime are not received, as with any live stream, and clients catch up through the change log.
+    """
+
+    def __init__(self, dsn: str, channel: str, reconnect_delay: float = 0.5, max_reconnect_delay: float = 30) -> None:
+        """
+        Initialize the backend.
+
+        :param dsn: str - SQLAlchemy database URL
+        :param channel: str - name of the notification channel
+        :param reconnect_delay: float - seconds before the first reconnection attempt, doubled after each failure
+        :param max_reconnect_delay: float - longest delay between two reconnection attempts
+        """
+        if psycopg2 is None:
+            raise RuntimeError("EVENTS_BACKEND=postgres requires the psycopg2 package")
+        self.__connect_args = make_url(dsn).translate_connect_args(username="user", database="dbname")
+        self.__channel = channel
+        self.__reconnect_delay = reconnect_delay
+        self.__max_reconnect_delay = max_reconnect_delay
+        self.__listener: Any = None
+        self.__reconnect_task: Optional[asyncio.Task] = None
+        self.__dispatch: Optional[Dispatch] = None
+        # Only used by the publishing thread
+        self.__publisher: Any = None
+        self.__publisher_delay = reconnect_delay
+        self.__publisher_retry_at = 0.0
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+    def __connect(self) -> Any:
+        """
+        Open a dedicated autocommit connection, with TCP keepalives so that a dead peer is noticed.
+
+        :return: Any - psycopg2 connection
+        """
+        connection = psycopg2.connect(
+            **self.__connect_args, keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3
+        )
+        connection.autocommit = True
+        return connection
+
+    def __open_listener(self) -> Any:
+        """
+        Open the listener connection and subscribe to the channel. Runs in a worker thread.
+
+        :return: Any - psycopg2 connection
+        """
+        listener = self.__connect()
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.__channel}"')
+        return listener
+
+    async def __listen(self) -> None:
+        """
+        Open the listener connection, retrying with an exponential backoff, and watch it from the event loop.
+
+        :return: None
+        """
+        delay = self.__reconnect_delay
+        while True:
+            try:
+                listener = await run_in_threadpool(self.__open_listener)
+                break
+            except psycopg2.Error as error:
+                logger.error(f"Listening for events failed, retrying in {delay:.1f} s: {error}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.__max_reconnect_delay)
+        self.__listener = listener
+        asyncio.get_running_loop().add_reader(listener.fileno(), self.__on_readable)
+
+    def __close_listener(self) -> None:
+        """
+        Stop watching the listener connection and close it.
+
+        :return: None
+        """
+        listener, self.__listener = self.__listener, None
+        if listener is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(listener.fileno())
+        except (psycopg2.Error, ValueError):
+            pass
+        listener.close()
+
+    def __on_readable(self) -> None:
+        """
+        Read the pending notifications and dispatch them, or reconnect if the connection was lost.
+
+        :return: None
+        """
+        try:
+            self.__listener.poll()
+        except psycopg2.Error as error:
+            logger.error(f"Lost the event listener connection, reconnecting: {error}")
+            self.__close_listener()
+            self.__reconnect_task = asyncio.create_task(self.__listen())
+            return
+        while self.__listener.notifies:
+            notification = self.__listener.notifies.pop(0)
+            if self.__dispatch:
+                self.__dispatch(notification.payload)
+
+    async def start(self, dispatch: Dispatch) -> None:
+        """
+        Start listening on the channel in the background and accept publications.
+
+        :param dispatch: Dispatch - callback invoked for every received payload
+        :return: None
+        """
+        self.__dispatch = dispatch
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-publisher")
+        self.__reconnect_task = asyncio.create_task(self.__listen())
+
+    async def stop(self) -> None:
+        """
+        Stop listening, send the pending publications and close the connections.
+
+        :return: None
+        """
+        if self.__reconnect_task is not None:
+            self.__reconnect_task.cancel()
+            try:
+                await self.__reconnect_task
+            except asyncio.CancelledError:
+                pass
+            self.__reconnect_task = None
+        self.__close_listener()
+        if self.__executor is not None:
+            executor, self.__executor = self.__executor, None
+            executor.submit(self.__close_publisher)
+            await run_in_threadpool(executor.shutdown)
+        self.__dispatch = None
+
+    def publish(self, payload: str) -> None:
+        """
+        Queue the payload for the publishing thread.
+
+        :param payload: str - serialized event (at most 8000 bytes)
+        :return: None
+        """
+        if self.__executor is not None:
+            self.__executor.submit(self.__notify, payload)
+
+    def __notify(self, payload: str) -> None:
+        """
+        Send the payload as a notification on the channel, reconnecting with a backoff after a failure.
+        Runs in the publishing thread; the payload is dropped while the database cannot be reached.
+
+        :param payload: str - serialized event
+        :return: None
+        """
+        if self.__publisher is None and time.monotonic() < self.__publisher_retry_at:
+            return
+        try:
+            if self.__publisher is None:
+                self.__publisher = self.__connect()
+            with self.__publisher.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (self.__channel, payload))
+            self.__publisher_delay = self.__reconnect_delay
+        except psycopg2.Error as error:
+            logger.error(f"Error while publishing an event, retrying in {self.__publisher_delay:.1f} s: {error}")
+            self.__close_publisher()
+            self.__publisher_retry_at = time.monotonic() + self.__publisher_delay
+            self.__publisher_delay = min(self.__publisher_delay * 2, self.__max_reconnect_delay)
+
+    def __close_publisher(self) -> None:
+        """
+        Close the publishing connection. Runs in the publishing thread.
+
+        :return: None
+        """
+        publisher, self.__publisher = self.__publisher, None
+        if publisher is not None:
+            try:
+                publisher.close()
+            except psycopg2.Error:
+                pass
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Optional, Set
+
+from src.config import settings
+from src.core.events.backends import BrokerBackend, LocalBackend, PostgresBackend
+from src.core.schemas import PostEvent
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+
+class Subscription:
+    """Bounded queue of serialized events for one subscriber. None marks the end of the stream."""
+
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def close(self) -> None:
+        """
+        Discard the pending events and end the stream.
+
+        :return: None
+        """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class Broker:
+    """In-process pub/sub of post events. Subscribers that fall behind by a full queue are dropped."""
+
+    def __init__(self, backend: BrokerBackend, queue_size: int) -> None:
+        """
+        Initialize the broker.
+
+        :param backend: BrokerBackend - transport delivering the published events to every worker
+        :param queue_size: int - maximum number of undelivered events per subscriber
+        """
+        self.backend = backend
+        self.queue_size = queue_size
+        self.subscriptions: Set[Subscription] = set()
+
+    async def start(self) -> None:
+        """
+        Start receiving events from the backend.
+
+        :return: None
+        """
+        await self.backend.start(self.dispatch)
+
+    async def stop(self) -> None:
+        """
+        Stop the backend and end all the streams.
+
+        :return: None
+        """
+        await self.backend.stop()
+        for subscription in self.subscriptions:
+            subscription.close()
+        self.subscriptions.clear()
+
+    def subscribe(self) -> Subscription:
+        """
+        Register a new subscriber.
+
+        :return: Subscription - queue the events are delivered to
+        """
+        subscription = Subscription(maxsize=self.queue_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscriber.
+
+        :param subscription: Subscription - subscriber to remove
+        :return: None
+        """
+        self.subscriptions.discard(subscription)
+
+    def publish(self, event: PostEvent) -> None:
+        """
+        Publish an event to the subscribers of every worker. Must be called after the change is committed.
+
+        :param event: PostEvent - event to publish
+        :return: None
+        """
+        self.backend.publish(event.json(exclude_none=True))
+
+    def dispatch(self, payload: str) -> None:
+        """
+        Deliver a serialized event to the local subscribers without blocking.
+
+        :param payload: str - serialized event
+        :return: None
+        """
+        for subscription in list(self.subscriptions):
+            try:
+                subscription.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.warning("Dropping a slow event subscriber")
+                subscription.dropped = True
+                self.subscriptions.discard(subscription)
+                subscription.close()
+
+
+def get_backend() -> BrokerBackend:
+    """
+    Create the backend configured by EVENTS_BACKEND.
+
+    :return: BrokerBackend - "local" (single worker) or "postgres" (LISTEN/NOTIFY across workers)
+    """
+    if settings.EVENTS_BACKEND == "postgres":
+        return PostgresBackend(dsn=settings.DATABASE_DSN, channel=settings.EVENTS_CHANNEL)
+    return LocalBackend()
+
+
+broker = Broker(backend=get_backend(), queue_size=settings.EVENTS_QUEUE_SIZE)
@@ -0,0 +1 @@
+from .store import IdempotencyStore, get_store
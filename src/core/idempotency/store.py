@@ -0,0 +1,145 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.core.crud import crud_idempotency_key
+from src.core.db import SessionLocal
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+
+class IdempotencyStore:
+    """
+    Keys and stored responses in the idempotency_key table, shared by all the workers. Each operation is one
+    statement on the primary key in a transaction of its own, run in the thread pool by the caller; expired keys are
+    deleted in batches now and then by the worker that notices it is due.
+    """
+
+    def __init__(self, ttl: float, lease: float, purge_interval: float, purge_batch_size: int) -> None:
+        """
+        Initialize the store.
+
+        :param ttl: float - seconds a response is replayed for
+        :param lease: float - seconds a first execution holds its key; past it, a worker that died is taken over
+        :param purge_interval: float - seconds between two purges
+        :param purge_batch_size: int - keys deleted per statement while purging
+        """
+        self.ttl = ttl
+        self.lease = lease
+        self.purge_interval = purge_interval
+        self.purge_batch_size = purge_batch_size
+        self.next_purge = time.monotonic() + purge_interval
+
+    def claim(self, key: bytes, fingerprint: bytes) -> Tuple[Optional[float], Optional[Row]]:
+        """
+        Claim a key for a first execution, or read its state when another request has it, purging the expired keys
+        first when it is due.
+
+        :param key: bytes - key digest
+        :param fingerprint: bytes - request digest
+        :return: Tuple[Optional[float], Optional[Row]] - end of the lease if the key was claimed, which identifies the
+            claim when completing or releasing it; otherwise the state of the key, None if it was released or expired
+            in between
+        """
+        now = time.time()
+        lease_until = now + self.lease
+        with SessionLocal() as db:
+            if time.monotonic() >= self.next_purge:
+                self.next_purge = time.monotonic() + self.purge_interval
+                self.purge(db=db, now=now)
+            claimed = crud_idempotency_key.acquire(
+                db=db, key=key, fingerprint=fingerprint, now=now, lease_until=lease_until
+            )
+            db.commit()
+            if claimed:
+                return lease_until, None
+            row = crud_idempotency_key.get_by_key(db=db, key=key)
+        if row is not None and row.expires_at < now:
+            return None, None
+        return None, row
+
+    def get(self, key: bytes) -> Optional[Row]:
+        """
+        Read the state of a key.
+
+        :param key: bytes - key digest
+        :return: Optional[Row] - state of the key, None if it does not exist or expired
+        """
+        with SessionLocal() as db:
+            row = crud_idempotency_key.get_by_key(db=db, key=key)
+        if row is None or row.expires_at < time.time():
+            return None
+        return row
+
+    def complete(self, key: bytes, lease_until: float, status_code: int, headers: List[List[str]], body: bytes) -> bool:
+        """
+        Store the response of a first execution for the retention period.
+
+        :param key: bytes - key digest
+        :param lease_until: float - lease returned by claim
+        :param status_code: int - response status code
+        :param headers: List[List[str]] - [name, value] pairs of the response headers
+        :param body: bytes - response body
+        :return: bool - True if stored, False if the lease expired and a duplicate took the key over
+        """
+        with SessionLocal() as db:
+            completed = crud_idempotency_key.complete(
+                db=db,
+                key=key,
+                lease_until=lease_until,
+                status_code=status_code,
+                headers=headers,
+                body=body,
+                expires_at=time.time() + self.ttl,
+            )
+            db.commit()
+        return completed
+
+    def release(self, key: bytes, lease_until: float) -> None:
+        """
+        Give up the claim of a first execution that failed.
+
+        :param key: bytes - key digest
+        :param lease_until: float - lease returned by claim
+        :return: None
+        """
+        with SessionLocal() as db:
+            crud_idempotency_key.release(db=db, key=key, lease_until=lease_until)
+            db.commit()
+
+    def purge(self, db: Session, now: float) -> int:
+        """
+        Delete the expired keys in batches, each one committed on its own to keep the locks short.
+
+        :param db: Session - SQLAlchemy database session
+        :param now: float - current Unix time
+        :return: int - number of deleted keys
+        """
+        purged = 0
+        while True:
+            deleted = crud_idempotency_key.purge(db=db, expired_before=now, limit=self.purge_batch_size)
+            db.commit()
+            purged += deleted
+            if deleted < self.purge_batch_size:
+                break
+        logger.debug(f"Purged {purged} expired idempotency keys")
+        return purged
+
+
+def get_store() -> IdempotencyStore:
+    """
+    Create the store configured by the IDEMPOTENCY_* settings.
+
+    :return: IdempotencyStore - store
+    """
+    return IdempotencyStore(
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        lease=settings.IDEMPOTENCY_LEASE_SECONDS,
+        purge_interval=settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+        purge_batch_size=settings.IDEMPOTENCY_PURGE_BATCH_SIZE,
+    )
@@ -0,0 +1,2 @@
+from .loader import DataLoader
+from .loaders import Loaders
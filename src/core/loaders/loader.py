@@ -0,0 +1,67 @@
+import asyncio
+from typing import Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class DataLoader(Generic[KeyType, ValueType]):
+    """
+    Request-scoped batching loader.
+
+    Every key requested with load() during the same event loop iteration is resolved by a single call of
+    the batch function, and every result is cached for the lifetime of the loader.
+    """
+
+    def __init__(self, batch_load: Callable[[List[KeyType]], Dict[KeyType, ValueType]]) -> None:
+        """
+        Initialize the loader.
+
+        :param batch_load: Callable - function that returns the values of the given keys; missing keys are omitted
+        """
+        self.batch_load = batch_load
+        self.cache: Dict[KeyType, asyncio.Future] = {}
+        self.pending: List[KeyType] = []
+
+    def load(self, key: KeyType) -> "asyncio.Future[Optional[ValueType]]":
+        """
+        Request the value of the key.
+
+        :param key: KeyType - key to load
+        :return: Future - resolved with the value, or None if it does not exist
+        """
+        future = self.cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.cache[key] = future
+            if not self.pending:
+                loop.call_soon(self.__dispatch)
+            self.pending.append(key)
+        return future
+
+    async def load_many(self, keys: List[KeyType]) -> List[Optional[ValueType]]:
+        """
+        Request the values of several keys in one batch.
+
+        :param keys: List[KeyType] - keys to load
+        :return: List[Optional[ValueType]] - values in the order of the keys
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def __dispatch(self) -> None:
+        """
+        Resolve all the pending keys with one call of the batch function.
+
+        :return: None
+        """
+        keys, self.pending = self.pending, []
+        try:
+            values = self.batch_load(keys)
+        except Exception as error:
+            for key in keys:
+                self.cache.pop(key).set_exception(error)
+            return
+
+        for key in keys:
+            self.cache[key].set_result(values.get(key))
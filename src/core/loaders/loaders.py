@@ -0,0 +1,51 @@
+import asyncio
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.core.crud import crud_post, crud_user
+from src.core.loaders.loader import DataLoader
+from src.core.schemas import Post
+
+
+class Loaders:
+    """Batching loaders shared by everything that runs within one request."""
+
+    def __init__(self, db: Session) -> None:
+        """
+        Initialize the loaders.
+
+        :param db: Session - database session of the request
+        """
+        self.post_rows = DataLoader(lambda ids: crud_post.get_rows_by_ids(db=db, ids=ids))
+        self.usernames = DataLoader(lambda ids: crud_user.get_usernames_by_ids(db=db, ids=ids))
+
+    async def load_post(self, post_id: int) -> Optional[Post]:
+        """
+        Load a post with its author.
+
+        :param post_id: int - Post ID.
+        :return: Optional[Post] - Post if found, None otherwise.
+        """
+        row = await self.post_rows.load(post_id)
+        if row is None:
+            return None
+
+        return Post(
+            id=row.id,
+            text=row.text,
+            author=await self.usernames.load(row.author_id),
+            publication_date=row.publication_date,
+            likes=row.likes,
+            dislikes=row.dislikes,
+            comment_count=row.comment_count,
+        )
+
+    async def load_posts(self, post_ids: List[int]) -> List[Optional[Post]]:
+        """
+        Load several posts with their authors: one query for the posts and one for the authors.
+
+        :param post_ids: List[int] - Post IDs.
+        :return: List[Optional[Post]] - Posts in the order of the IDs, None for the ones not found.
+        """
+        return list(await asyncio.gather(*(self.load_post(post_id=post_id) for post_id in post_ids)))
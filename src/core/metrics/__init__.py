@@ -0,0 +1,5 @@
+from .db import REQUEST_STATS, InstrumentedQueuePool, RequestStats, instrument_engine
+from .logs import LOG_RECORDS_DROPPED
+from .registry import Counter, Gauge, Histogram, Registry, registry
+from .timing import REQUEST_TIMING, TimedRoute, TimingContext, add_timing, timed
+from .upstream import track_upstream
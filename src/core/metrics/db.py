@@ -0,0 +1,126 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+from src.core.metrics.registry import LabelValues, registry
+
+DB_QUERIES = registry.counter("db_queries_total", "Number of executed SQL statements.")
+DB_QUERY_DURATION = registry.histogram("db_query_duration_seconds", "Execution time of SQL statements.")
+DB_POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "Number of connection checkouts that timed out."
+)
+
+
+class RequestStats:
+    """Database usage of the current request."""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_time = 0.0
+
+
+REQUEST_STATS: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that measures how long each checkout waits for a connection."""
+
+    def __init__(self, creator: Any, pool_size: int = 5, max_overflow: int = 10, **kwargs: Any) -> None:
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+        self.capacity = pool_size + max(max_overflow, 0)
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = REQUEST_STATS.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+def handle_error(context: Any) -> None:
+    start_times = context.connection.info.get("query_start_time") if context.connection is not None else None
+    if start_times:
+        start_times.pop()
+
+
+class PoolGauges:
+    """Scrape-time gauges of the pool of the instrumented engine."""
+
+    def __init__(self) -> None:
+        self.pool: Optional[Pool] = None
+        registry.gauge("db_pool_checked_out", "Connections currently checked out.", callback=self.checked_out)
+        registry.gauge("db_pool_size", "Connections kept open by the pool.", callback=self.size)
+        registry.gauge(
+            "db_pool_saturation",
+            "Checked out connections as a fraction of pool size plus max overflow.",
+            callback=self.saturation,
+        )
+
+    def checked_out(self) -> Dict[LabelValues, float]:
+        """
+        Number of checked out connections.
+
+        :return: Dict[LabelValues, float] - gauge value, empty if the pool is not a QueuePool
+        """
+        return {(): self.pool.checkedout()} if isinstance(self.pool, QueuePool) else {}
+
+    def size(self) -> Dict[LabelValues, float]:
+        """
+        Number of connections kept by the pool.
+
+        :return: Dict[LabelValues, float] - gauge value, empty if the pool is not a QueuePool
+        """
+        return {(): self.pool.size()} if isinstance(self.pool, QueuePool) else {}
+
+    def saturation(self) -> Dict[LabelValues, float]:
+        """
+        Checked out connections relative to the pool capacity.
+
+        :return: Dict[LabelValues, float] - gauge value, empty if the pool is not a QueuePool
+        """
+        capacity = getattr(self.pool, "capacity", 0)
+        return {(): self.pool.checkedout() / capacity} if capacity else {}
+
+
+pool_gauges = PoolGauges()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements and the database time of the engine, globally and per request.
+
+    :param engine: Engine - engine to instrument
+    :return: None
+    """
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+    pool_gauges.pool = engine.pool
@@ -0,0 +1,8 @@
+from src.core.metrics.registry import registry
+from src.utils.logging import dropped_records
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+    callback=lambda: {(): dropped_records()},
+)
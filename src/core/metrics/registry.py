@@ -0,0 +1,282 @@
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Format label pairs in the Prometheus text format.
+
+    :param names: Sequence[str] - label names
+    :param values: Sequence[str] - label values
+    :return: str - {name="value",...} or an empty string
+    """
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{0}="{1}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        """
+        Initialize the metric.
+
+        :param name: str - metric name
+        :param documentation: str - HELP text
+        :param labels: Sequence[str] - label names
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """
+        Render the samples of the metric.
+
+        :return: List[str] - sample lines
+        """
+
+    def render(self) -> str:
+        """
+        Render the metric in the Prometheus text format.
+
+        :return: str - HELP, TYPE and sample lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        """
+        Initialize the counter.
+
+        :param name: str - metric name
+        :param documentation: str - HELP text
+        :param labels: Sequence[str] - label names
+        :param callback: Optional[Callable] - function returning totals kept elsewhere, called on every scrape
+        """
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increment the counter.
+
+        :param labels: str - label values
+        :param amount: float - increment
+        :return: None
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        """
+        Render the samples of the metric.
+
+        :return: List[str] - sample lines
+        """
+        with self._lock:
+            values = dict(self._values)
+        if self._callback:
+            values.update(self._callback())
+        return [f"{self.name}{format_labels(self.label_names, labels)} {value}" for labels, value in values.items()]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        """
+        Initialize the gauge.
+
+        :param name: str - metric name
+        :param documentation: str - HELP text
+        :param labels: Sequence[str] - label names
+        :param callback: Optional[Callable] - function returning the values by labels, called on every scrape
+        """
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Set the gauge.
+
+        :param value: float - new value
+        :param labels: str - label values
+        :return: None
+        """
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increment the gauge.
+
+        :param labels: str - label values
+        :param amount: float - increment, may be negative
+        :return: None
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        """
+        Render the samples of the metric.
+
+        :return: List[str] - sample lines
+        """
+        with self._lock:
+            values = dict(self._values)
+        if self._callback:
+            values.update(self._callback())
+        return [f"{self.name}{format_labels(self.label_names, labels)} {value}" for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        """
+        Initialize the histogram.
+
+        :param name: str - metric name
+        :param documentation: str - HELP text
+        :param labels: Sequence[str] - label names
+        :param buckets: Sequence[float] - upper bounds of the buckets, in ascending order
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # Per label values: a count per bucket (the last one is +Inf), then the sum of the observations
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record an observation.
+
+        :param value: float - observed value
+        :param labels: str - label values
+        :return: None
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(labels) or self._values.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> List[str]:
+        """
+        Render the cumulative buckets, the sum and the count of every label set.
+
+        :return: List[str] - sample lines
+        """
+        lines = []
+        with self._lock:
+            values = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = format_labels(self.label_names + ("le",), labels + (le,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Register a metric, or return the already registered one with the same name.
+
+        :param metric: Metric - metric to register
+        :return: Metric - registered metric
+        """
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> Counter:
+        """
+        Get or create a counter.
+
+        :return: Counter - registered counter
+        """
+        return self.register(Counter(name, documentation, labels, callback))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> Gauge:
+        """
+        Get or create a gauge.
+
+        :return: Gauge - registered gauge
+        """
+        return self.register(Gauge(name, documentation, labels, callback))
+
+    def histogram(
+        self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Get or create a histogram.
+
+        :return: Histogram - registered histogram
+        """
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """
+        Render all the metrics in the Prometheus text exposition format.
+
+        :return: str - exposition text
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+from fastapi.routing import APIRoute
+
+
+class TimingContext:
+    """Durations of the phases of the current request, reported in the Server-Timing header."""
+
+    __slots__ = ("phases", "endpoint_end")
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.endpoint_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Add time to a phase.
+
+        :param name: str - phase name
+        :param seconds: float - duration
+        :return: None
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+REQUEST_TIMING: ContextVar[Optional[TimingContext]] = ContextVar("request_timing", default=None)
+
+NULL_PHASE = nullcontext()
+
+
+class Phase:
+    __slots__ = ("timing", "name", "start")
+
+    def __init__(self, timing: TimingContext, name: str) -> None:
+        self.timing = timing
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "Phase":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timing.add(self.name, time.perf_counter() - self.start)
+
+
+def timed(name: str) -> ContextManager:
+    """
+    Measure a block as a phase of the current request. A shared no-op when Server-Timing is disabled.
+
+    :param name: str - phase name
+    :return: ContextManager - context manager measuring the block
+    """
+    timing = REQUEST_TIMING.get()
+    if timing is None:
+        return NULL_PHASE
+    return Phase(timing, name)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """
+    Add an already measured duration to a phase of the current request.
+
+    :param name: str - phase name
+    :param seconds: float - duration
+    :return: None
+    """
+    timing = REQUEST_TIMING.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def mark_endpoint_end(call: Callable) -> Callable:
+    """
+    Wrap an endpoint so the end of its execution is recorded; what follows is response validation and serialization.
+
+    :param call: Callable - endpoint function
+    :return: Callable - wrapped endpoint, a coroutine function if the endpoint is one
+    """
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                timing = REQUEST_TIMING.get()
+                if timing is not None:
+                    timing.endpoint_end = time.perf_counter()
+
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return call(*args, **kwargs)
+        finally:
+            timing = REQUEST_TIMING.get()
+            if timing is not None:
+                timing.endpoint_end = time.perf_counter()
+
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """Route that reports the time spent validating and serializing the response as the "serialize" phase."""
+
+    def get_route_handler(self) -> Callable:
+        """
+        Build the request handler around the wrapped endpoint.
+
+        :return: Callable - request handler
+        """
+        self.dependant.call = mark_endpoint_end(self.dependant.call)
+        handler = super().get_route_handler()
+
+        @functools.wraps(handler)
+        async def timed_handler(request: Any) -> Any:
+            response = await handler(request)
+            timing = REQUEST_TIMING.get()
+            if timing is not None and timing.endpoint_end is not None:
+                timing.add("serialize", time.perf_counter() - timing.endpoint_end)
+            return response
+
+        return timed_handler
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from src.core.metrics.registry import registry
+from src.core.metrics.timing import add_timing
+
+UPSTREAM_DURATION = registry.histogram(
+    "upstream_request_duration_seconds", "Duration of calls to external APIs.", labels=("upstream",)
+)
+UPSTREAM_ERRORS = registry.counter(
+    "upstream_request_errors_total", "Calls to external APIs that failed to connect.", labels=("upstream",)
+)
+
+
+@contextmanager
+def track_upstream(upstream: str) -> Iterator[None]:
+    """
+    Measure a call to an external API, also reported as the "external" phase of the request.
+
+    :param upstream: str - name of the external API
+    :return: Iterator[None]
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(upstream)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_DURATION.observe(elapsed, upstream)
+        add_timing("external", elapsed)
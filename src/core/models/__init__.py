@@ -1,4 +1,14 @@
 from .base import Base
+from .checkpoint import Checkpoint
+from .comment import Comment
+from .idempotency_key import IdempotencyKey
 from .post import Post
-from .reaction import Reaction
+from .post_change import PostChange
+from .post_tag import PostTag
+from .rate_limit_bucket import RateLimitBucket
+from .reaction import Reaction, ReactionType
+from .reaction_event import ReactionEvent
+from .reaction_rollup import ReactionRollup
+from .tag_trend import TagTrend
 from .user import User
+from .user_stats import UserStats
@@ -0,0 +1,8 @@
+from sqlalchemy import BigInteger, Column, String
+
+from src.core.models.base import Base
+
+
+class Checkpoint(Base):
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
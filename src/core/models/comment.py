@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
+
+from src.core.models.base import Base
+
+
+class Comment(Base):
+    id = Column(Integer, primary_key=True)
+    post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
+    parent_id = Column(Integer, ForeignKey("comment.id"), nullable=True)
+    author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    text = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=func.now())
+    # Top-level comments have depth 0
+    depth = Column(Integer, nullable=False, default=0)
+    # Zero-padded IDs from the top-level comment down to this one, e.g. "0000000012.0000000031": the subtree of a
+    # comment is the range of paths starting with its own path and a separator, in depth-first order.
+    # Set right after the insert, once the ID is known, in the same transaction. Compared byte by byte: a
+    # linguistic collation such as en_US ignores the separators, which breaks the ranges
+    path = Column(String().with_variant(String(collation="C"), "postgresql"), nullable=True)
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_comment_post_id_path", post_id, path),
+        Index("ix_comment_post_id_depth_id", post_id, depth, id.desc()),
+    )
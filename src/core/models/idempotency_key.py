@@ -0,0 +1,20 @@
+from sqlalchemy import JSON, Column, Float, Index, LargeBinary, SmallInteger
+
+from src.core.models.base import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_key"
+
+    # Digests of the client key scoped by user, and of the request it was first used with (16 bytes each)
+    key = Column(LargeBinary(16), primary_key=True)
+    fingerprint = Column(LargeBinary(16), nullable=False)
+    # NULL while the first request is running
+    status_code = Column(SmallInteger, nullable=True)
+    # [name, value] pairs of the response headers, without Content-Length
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    # Unix time: end of the lease while running, then end of the retention
+    expires_at = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_idempotency_key_expires_at", expires_at),)
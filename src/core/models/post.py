@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, ForeignKey, Integer, String, func
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from src.core.models.base import Base
@@ -10,6 +10,28 @@ class Post(Base):
     publication_date = Column(Date, default=func.now())
     likes = Column(Integer, default=0)
     dislikes = Column(Integer, default=0)
+    # Maintained with the comments, in the same transaction
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     author_id = Column(Integer, ForeignKey("user.id"))
+    # Set by the author's delete; the post and the rows referencing it are hard-deleted later by the purge worker
+    deleted_at = Column(DateTime, nullable=True)
     author = relationship("User", back_populates="posts")
     reactions = relationship("Reaction", back_populates="post")
+
+    # Partial indexes: the live posts stay as compact as before the soft deletes, and the purge worker finds
+    # the deleted ones without scanning the table
+    __table_args__ = (
+        Index(
+            "ix_post_author_id_id",
+            author_id,
+            id.desc(),
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_post_deleted_at",
+            deleted_at,
+            postgresql_where=deleted_at.isnot(None),
+            sqlite_where=deleted_at.isnot(None),
+        ),
+    )
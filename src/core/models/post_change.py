@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer
+
+from src.core.models.base import Base
+
+
+class PostChange(Base):
+    __tablename__ = "post_change"
+
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    post_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    # UTC clock of the application, like the cutoffs it is compared with
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_post_change_post_id_seq", post_id, seq),)
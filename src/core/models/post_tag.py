@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from src.core.models.base import Base
+
+
+class PostTag(Base):
+    __tablename__ = "post_tag"
+
+    # The primary key serves the lookups by post (tag diff on edit, delete); the index serves the tag feeds
+    post_id = Column(Integer, ForeignKey("post.id"), primary_key=True)
+    tag = Column(String, primary_key=True)
+    # UTC, like the hour buckets of the rollup
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_post_tag_tag_post_id", tag, post_id.desc()),
+        Index("ix_post_tag_created_at", created_at),
+    )
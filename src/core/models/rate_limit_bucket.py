@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, Index, String
+
+from src.core.models.base import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_bucket"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last update, the tokens refill lazily from it
+    updated_at = Column(Float, nullable=False)
+
+    __table_args__ = (Index("ix_rate_limit_bucket_updated_at", updated_at),)
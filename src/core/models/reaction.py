@@ -1,13 +1,26 @@
-from sqlalchemy import Column, Date, ForeignKey, Integer, String, func
+from enum import IntEnum
+
+from sqlalchemy import Column, ForeignKey, Index, Integer, SmallInteger
 from sqlalchemy.orm import relationship
 
 from src.core.models.base import Base
 
 
+class ReactionType(IntEnum):
+    LIKE = 1
+    DISLIKE = 2
+
+
 class Reaction(Base):
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("user.id"))
-    post_id = Column(Integer, ForeignKey("post.id"))
-    reaction_type = Column(String)
+    # A user reacts at most once to a post: the pair is the key, and the primary key index serves both the lookup
+    # of a reaction and the scan of the reactions to a post. SQLite stores the rows in the key's B-tree instead of
+    # a rowid table plus a separate key index
+    post_id = Column(Integer, ForeignKey("post.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    # ReactionType value
+    kind = Column(SmallInteger, nullable=False)
     user = relationship("User", back_populates="reactions")
     post = relationship("Post", back_populates="reactions")
+
+    # Reactions of a user, and the foreign key to the user
+    __table_args__ = (Index("ix_reaction_user_id_post_id", user_id, post_id), {"sqlite_with_rowid": False})
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, SmallInteger
+
+from src.core.models.base import Base
+
+
+class ReactionEvent(Base):
+    __tablename__ = "reaction_event"
+
+    # Queue of the reaction changes not aggregated yet: the aggregator deletes the events it rolls up
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    post_id = Column(Integer, nullable=False)
+    # Author of the post, so that the author series need no join
+    author_id = Column(Integer, nullable=False)
+    # Change of the like and dislike counts of the post: -1, 0 or 1
+    likes = Column(SmallInteger, nullable=False)
+    dislikes = Column(SmallInteger, nullable=False)
+    created_at = Column(DateTime, nullable=False)
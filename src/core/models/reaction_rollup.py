@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer, String
+
+from src.core.models.base import Base
+
+
+class ReactionRollup(Base):
+    __tablename__ = "reaction_rollup"
+
+    # "post" or "author", and the ID of the post or of the author
+    scope = Column(String(6), primary_key=True)
+    subject_id = Column(Integer, primary_key=True)
+    # Length of the bucket in seconds (3600 or 86400), and its start
+    period = Column(Integer, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    # Net change of the likes and dislikes in the bucket
+    likes = Column(Integer, nullable=False, default=0)
+    dislikes = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Integer, String
+
+from src.core.models.base import Base
+
+
+class TagTrend(Base):
+    __tablename__ = "tag_trend"
+
+    # Start of the hour the tag was used in, and the number of uses in that hour
+    bucket = Column(DateTime, primary_key=True)
+    tag = Column(String, primary_key=True)
+    uses = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Integer, String, func
+from sqlalchemy import Column, Date, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from src.core.models.base import Base
@@ -19,3 +19,6 @@ class User(Base):
         uselist=True,
     )
     reactions = relationship("Reaction", back_populates="user")
+
+    # The default operator class cannot serve LIKE 'prefix%' unless the database uses the C collation
+    __table_args__ = (Index("ix_user_username_pattern", username, postgresql_ops={"username": "text_pattern_ops"}),)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from src.core.models.base import Base
+
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    posts_count = Column(Integer, nullable=False, default=0, server_default="0")
+    likes_received = Column(Integer, nullable=False, default=0, server_default="0")
+    dislikes_received = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1 @@
+from .purger import PostPurger, post_purger
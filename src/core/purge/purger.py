@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.core.crud import crud_comment, crud_post, crud_reaction, crud_reaction_rollup
+from src.core.db import SessionLocal
+from src.core.metrics import registry
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+PURGED_ROWS = registry.counter(
+    "post_purge_rows_total", "Rows hard-deleted by the purge of the soft deleted posts.", labels=("table",)
+)
+
+
+class PostPurger:
+    """
+    Hard-deletes the soft deleted posts with their reactions and comments, in small transactions separated by
+    pauses: a large cleanup never holds many locks at once or writes a burst that replicas fall behind on.
+    Several workers purging at the same time only delete the same rows twice. A purge running in a worker thread
+    checks the stopping event after each transaction, so stop() returns once the current one is committed.
+    """
+
+    def __init__(self, interval: float, delay: float, posts_per_batch: int, rows_per_batch: int, pause: float) -> None:
+        """
+        Initialize the purger.
+
+        :param interval: float - seconds between two purges in the background
+        :param delay: float - seconds a deleted post is kept before it is purged
+        :param posts_per_batch: int - posts purged together
+        :param rows_per_batch: int - reactions or comments deleted per transaction
+        :param pause: float - seconds slept after each transaction
+        """
+        self.interval = interval
+        self.delay = delay
+        self.posts_per_batch = posts_per_batch
+        self.rows_per_batch = rows_per_batch
+        self.pause = pause
+        self.stopping = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def purge_batch(self, db: Session, deleted_before: datetime) -> int:
+        """
+        Purge the posts of one batch: their reactions and comments in bounded transactions first, then the posts
+        with their analytics buckets.
+
+        :param db: Session - database session
+        :param deleted_before: datetime - only posts deleted before this time are purged
+        :return: int - number of purged posts, 0 when none is left or the purge is stopping
+        """
+        post_ids = crud_post.get_deleted_ids(db=db, deleted_before=deleted_before, limit=self.posts_per_batch)
+        if not post_ids:
+            return 0
+
+        for table, crud in (("reaction", crud_reaction), ("comment", crud_comment)):
+            while True:
+                deleted = crud.delete_by_post_ids(db=db, post_ids=post_ids, limit=self.rows_per_batch)
+                db.commit()
+                PURGED_ROWS.inc(table, amount=deleted)
+                if deleted < self.rows_per_batch:
+                    break
+                # The posts keep their remaining rows and are purged again by the next purge
+                if self.stopping.wait(self.pause):
+                    return 0
+
+        crud_reaction_rollup.delete_by_post_ids(db=db, post_ids=post_ids)
+        purged = crud_post.purge_deleted(db=db, ids=post_ids)
+        db.commit()
+        PURGED_ROWS.inc("post", amount=purged)
+        return purged
+
+    def purge(self, max_posts: Optional[int] = None) -> int:
+        """
+        Purge the posts deleted more than delay seconds ago, batch after batch, until none is left or the purger
+        is stopping. Runs in a worker thread.
+
+        :param max_posts: Optional[int] - stop after about this many posts, all of them if not given
+        :return: int - number of purged posts
+        """
+        deleted_before = datetime.utcnow() - timedelta(seconds=self.delay)
+        purged = 0
+        with SessionLocal() as db:
+            while not self.stopping.is_set() and (max_posts is None or purged < max_posts):
+                count = self.purge_batch(db=db, deleted_before=deleted_before)
+                if not count:
+                    break
+                purged += count
+                logger.debug(f"Purged {purged} deleted posts")
+                if self.stopping.wait(self.pause):
+                    break
+        return purged
+
+    async def run(self) -> None:
+        """
+        Purge the deleted posts every interval seconds. A failed purge is resumed at the next one.
+
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(self.purge)
+            except SQLAlchemyError as error:
+                logger.warning(f"Purging the deleted posts failed: {error}")
+
+    async def start(self) -> None:
+        """
+        Start purging in the background.
+
+        :return: None
+        """
+        self.stopping.clear()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stop purging, waiting for a purge running in a worker thread to commit its current transaction.
+
+        :return: None
+        """
+        self.stopping.set()
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+post_purger = PostPurger(
+    interval=settings.POST_PURGE_INTERVAL_SECONDS,
+    delay=settings.POST_PURGE_DELAY_SECONDS,
+    posts_per_batch=settings.POST_PURGE_POSTS_PER_BATCH,
+    rows_per_batch=settings.POST_PURGE_ROWS_PER_BATCH,
+    pause=settings.POST_PURGE_PAUSE_SECONDS,
+)
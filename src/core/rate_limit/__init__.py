@@ -0,0 +1 @@
+from .backends import DatabaseBackend, InMemoryBackend, RateLimitBackend, get_backend
@@ -0,0 +1,162 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.core.crud import crud_rate_limit
+from src.core.db import SessionLocal
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+
+class RateLimitBackend(ABC):
+    """Storage of the token buckets, keyed by policy and client."""
+
+    @abstractmethod
+    async def hit(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """
+        Take tokens from the bucket of the key.
+
+        :param key: str - bucket key
+        :param rate: float - tokens added per second
+        :param capacity: float - maximum number of tokens (burst)
+        :param cost: float - tokens taken by the request
+        :return: float - 0 if the request is allowed, otherwise the seconds until it would be
+        """
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Buckets of the worker process, in an LRU dictionary. With several workers each one enforces its own limits."""
+
+    def __init__(self, max_keys: int) -> None:
+        """
+        Initialize the backend.
+
+        :param max_keys: int - number of buckets kept; the least recently used ones are dropped beyond it
+        """
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of the last update)
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """
+        Take tokens from the bucket of the key. Runs on the event loop without awaiting, so it needs no lock.
+
+        :param key: str - bucket key
+        :param rate: float - tokens added per second
+        :param capacity: float - maximum number of tokens (burst)
+        :param cost: float - tokens taken by the request
+        :return: float - 0 if the request is allowed, otherwise the seconds until it would be
+        """
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+
+class DatabaseBackend(RateLimitBackend):
+    """
+    Buckets in the rate_limit_bucket table, shared by all the workers. Each check is one upsert on the primary key,
+    run in the thread pool; idle buckets are purged now and then by the worker that notices it is due.
+
+    A denied key is also remembered by the worker until its bucket holds enough tokens again: the tokens of the
+    other workers' requests can only delay that moment, so the requests in between are denied without a round-trip.
+    """
+
+    def __init__(self, purge_interval: float, max_idle: float, max_keys: int) -> None:
+        """
+        Initialize the backend.
+
+        :param purge_interval: float - seconds between two purges
+        :param max_idle: float - buckets not used for this many seconds are deleted (they would be full again)
+        :param max_keys: int - number of denied keys remembered; the least recently denied ones are dropped beyond it
+        """
+        self.purge_interval = purge_interval
+        self.max_idle = max_idle
+        self.max_keys = max_keys
+        self.next_purge = time.monotonic() + purge_interval
+        # key -> monotonic time from which the bucket may hold enough tokens again
+        self.denied: "OrderedDict[str, float]" = OrderedDict()
+
+    def take(self, key: str, rate: float, capacity: float, cost: float) -> float:
+        """
+        Take tokens in a transaction of its own, purging the idle buckets first when it is due.
+
+        :param key: str - bucket key
+        :param rate: float - tokens added per second
+        :param capacity: float - maximum number of tokens
+        :param cost: float - tokens taken by the request
+        :return: float - 0 if the tokens were taken, otherwise the seconds until enough tokens are accrued
+        """
+        now = time.time()
+        with SessionLocal() as db:
+            if time.monotonic() >= self.next_purge:
+                self.next_purge = time.monotonic() + self.purge_interval
+                purged = crud_rate_limit.purge(db=db, updated_before=now - self.max_idle)
+                logger.debug(f"Purged {purged} idle rate limit buckets")
+            retry_after = 0.0
+            if not crud_rate_limit.take(db=db, key=key, rate=rate, capacity=capacity, cost=cost, now=now):
+                tokens = crud_rate_limit.get_tokens(db=db, key=key, rate=rate, capacity=capacity, now=now)
+                # Never 0, which would allow the request, even if the bucket was updated since the upsert
+                retry_after = max((cost - tokens) / rate, 0.001)
+            db.commit()
+        return retry_after
+
+    async def hit(self, key: str, rate: float, capacity: float, cost: float = 1) -> float:
+        """
+        Take tokens from the shared bucket of the key. If the database fails, the request is allowed:
+        the limiter must not turn a database problem into an outage of every route.
+
+        :param key: str - bucket key
+        :param rate: float - tokens added per second
+        :param capacity: float - maximum number of tokens (burst)
+        :param cost: float - tokens taken by the request
+        :return: float - 0 if the request is allowed, otherwise the seconds until enough tokens are accrued
+        """
+        now = time.monotonic()
+        denied_until = self.denied.get(key)
+        if denied_until is not None:
+            if now < denied_until:
+                return denied_until - now
+            del self.denied[key]
+        try:
+            retry_after = await run_in_threadpool(self.take, key, rate, capacity, cost)
+        except SQLAlchemyError as error:
+            logger.error(f"Rate limit check failed, allowing the request: {error}")
+            return 0.0
+        if retry_after > 0:
+            self.denied.pop(key, None)
+            self.denied[key] = time.monotonic() + retry_after
+            if len(self.denied) > self.max_keys:
+                self.denied.popitem(last=False)
+        return retry_after
+
+
+def get_backend() -> RateLimitBackend:
+    """
+    Create the backend configured by RATE_LIMIT_BACKEND.
+
+    :return: RateLimitBackend - "memory" (per worker) or "database" (shared by the workers)
+    """
+    if settings.RATE_LIMIT_BACKEND == "database":
+        max_idle = max(policy["burst"] / policy["rate"] for policy in settings.RATE_LIMIT_POLICIES.values())
+        return DatabaseBackend(
+            purge_interval=settings.RATE_LIMIT_PURGE_INTERVAL_SECONDS,
+            max_idle=max_idle,
+            max_keys=settings.RATE_LIMIT_MEMORY_MAX_KEYS,
+        )
+    return InMemoryBackend(max_keys=settings.RATE_LIMIT_MEMORY_MAX_KEYS)
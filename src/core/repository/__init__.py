@@ -1,2 +1,6 @@
+from .analytics_repo import AnalyticsRepo
 from .auth_repo import AuthRepo
+from .comment_repo import CommentRepo
 from .post_repo import PostRepo
+from .tag_repo import TagRepo
+from .user_repo import UserRepo
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+
+from src.config import settings
+from src.core.crud import crud_post, crud_reaction_rollup, crud_user
+from src.core.crud.crud_reaction_rollup import DAY, HOUR, get_period_bucket
+from src.core.repository.repository import Repository
+from src.core.schemas import ReactionPoint, ReactionSeries
+
+PERIODS = {"hour": HOUR, "day": DAY}
+DEFAULT_BUCKETS = {"hour": settings.ANALYTICS_HOURLY_BUCKETS, "day": settings.ANALYTICS_DAILY_BUCKETS}
+
+
+class AnalyticsRepo(Repository):
+    async def get_post_reactions(self, post_id: int, resolution: str, buckets: Optional[int]) -> ReactionSeries:
+        """
+        Get the reactions to a post over time.
+
+        :param post_id: int - Post ID.
+        :param resolution: str - "hour" or "day".
+        :param buckets: Optional[int] - Number of buckets, the current one included; a day or a month by default.
+        :return: ReactionSeries - Net change of the likes and dislikes per bucket.
+        """
+        if not crud_post.exists(db=self.db, id=post_id):
+            raise HTTPException(status_code=404, detail=f"Post with ID: {post_id} not found")
+        return self.__get_series(scope="post", subject_id=post_id, resolution=resolution, buckets=buckets)
+
+    async def get_author_reactions(self, username: str, resolution: str, buckets: Optional[int]) -> ReactionSeries:
+        """
+        Get the reactions to all the posts of a user over time.
+
+        :param username: str - Username of the author.
+        :param resolution: str - "hour" or "day".
+        :param buckets: Optional[int] - Number of buckets, the current one included; a day or a month by default.
+        :return: ReactionSeries - Net change of the likes and dislikes per bucket.
+        """
+        user = crud_user.get_by_username(db=self.db, username=username)
+        if not user:
+            raise HTTPException(status_code=404, detail=f"User with username: {username} not found")
+        return self.__get_series(scope="author", subject_id=user.id, resolution=resolution, buckets=buckets)
+
+    def __get_series(self, scope: str, subject_id: int, resolution: str, buckets: Optional[int]) -> ReactionSeries:
+        """
+        Read the buckets of a subject from the rollup, a bounded range scan, and fill the empty ones with zeros.
+
+        :param scope: str - "post" or "author".
+        :param subject_id: int - ID of the post or of the author.
+        :param resolution: str - "hour" or "day".
+        :param buckets: Optional[int] - Number of buckets, the current one included.
+        :return: ReactionSeries - One point per bucket, oldest first.
+        """
+        period = PERIODS[resolution]
+        buckets = buckets or DEFAULT_BUCKETS[resolution]
+        until = get_period_bucket(datetime.utcnow(), period)
+        since = until - timedelta(seconds=period * (buckets - 1))
+        rows = crud_reaction_rollup.get_series(
+            db=self.db, scope=scope, subject_id=subject_id, period=period, since=since, until=until
+        )
+        by_bucket = {row.bucket: row for row in rows}
+        points = []
+        for index in range(buckets):
+            bucket = since + timedelta(seconds=period * index)
+            row = by_bucket.get(bucket)
+            points.append(
+                ReactionPoint(bucket=bucket, likes=row.likes if row else 0, dislikes=row.dislikes if row else 0)
+            )
+        return ReactionSeries(resolution=resolution, points=points)
@@ -1,17 +1,20 @@
 from datetime import datetime, timedelta
-from typing import List, MutableMapping, Union
+from typing import List, MutableMapping, Optional, Union
 
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
 from pydantic import EmailStr
+from sqlalchemy.exc import IntegrityError
 
 from src.config import settings, verify_password
+from src.core.autocomplete import username_index
+from src.core.availability import availability_index
 from src.core.clients import UserClient
 from src.core.crud import crud_user
 from src.core.models import User
 from src.core.repository.repository import Repository
-from src.core.schemas import SuccessAuth, SuccessSignUp, UserCreate
+from src.core.schemas import Availability, SuccessAuth, SuccessSignUp, UserCreate
 
 
 class AuthRepo(Repository):
@@ -55,6 +58,31 @@ class AuthRepo(Repository):
             user_id=user_id,
         )
 
+    def __is_username_taken(self, username: str) -> bool:
+        """
+        Check if the username is taken before a signup, querying the database only if the availability filter
+        cannot rule it out. The filter of the worker may miss the users added since its last build: the unique
+        index still rejects the insert then.
+
+        :param username: str - the username to check
+        :return: bool - True if a user has this username
+        """
+        if not availability_index.might_be_taken(field="username", value=username):
+            return False
+        return crud_user.get_by_username(db=self.db, username=username) is not None
+
+    def __is_email_taken(self, email: str) -> bool:
+        """
+        Check if the email is taken before a signup, querying the database only if the availability filter
+        cannot rule it out. The unique index rejects the emails the filter missed.
+
+        :param email: str - the email to check
+        :return: bool - True if a user has this email
+        """
+        if not availability_index.might_be_taken(field="email", value=email):
+            return False
+        return crud_user.get_by_email(db=self.db, email=email) is not None
+
     def __check_username(self, username: str) -> bool:
         """
         Check if the username is already taken.
@@ -62,8 +90,7 @@ class AuthRepo(Repository):
         :param username: str - the username to check
         :return: bool - True if the username is available
         """
-        user = crud_user.get_by_username(db=self.db, username=username)
-        if user:
+        if self.__is_username_taken(username=username):
             raise HTTPException(
                 status_code=400,
                 detail="The user with this username already exists in the system",
@@ -78,8 +105,7 @@ class AuthRepo(Repository):
         :param user_client: UserClient - the user client to perform email verification
         :return: bool - True if the email is available and verified
         """
-        user = crud_user.get_by_email(db=self.db, email=email)
-        if user:
+        if self.__is_email_taken(email=email):
             raise HTTPException(
                 status_code=400,
                 detail="The user with this email already exists in the system",
@@ -113,12 +139,38 @@ class AuthRepo(Repository):
             email=user_in.email, user_client=user_client
         ):
             extra_fields = await user_client.get_additional_data(email=user_in.email)
-            user = crud_user.add_user(db=self.db, obj_in=user_in, extra_fields=extra_fields)
+            try:
+                user = crud_user.add_user(db=self.db, obj_in=user_in, extra_fields=extra_fields)
+            except IntegrityError:
+                # Taken since the checks, or through another worker whose signup the filter has not seen yet
+                self.db.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail="The user with this username or email already exists in the system",
+                )
+            availability_index.add(username=user.username, email=user.email)
+            username_index.add(username=user.username)
 
             return SuccessSignUp(
                 id=user.id, username=user.username, email=user.email, registration_date=user.registration_date
             )
 
+    async def check_availability(self, username: Optional[str], email: Optional[str]) -> Availability:
+        """
+        Check whether a username and an email can still be used to sign up. The answer is final for the client,
+        so it comes from the unique indexes, not from the availability filter, which may miss recent users.
+
+        :param username: Optional[str] - the username to check
+        :param email: Optional[str] - the email to check
+        :return: Availability - True for the available values, None for the values not checked
+        """
+        if username is None and email is None:
+            raise HTTPException(status_code=400, detail="Provide a username or an email to check")
+        return Availability(
+            username=None if username is None else crud_user.get_by_username(db=self.db, username=username) is None,
+            email=None if email is None else crud_user.get_by_email(db=self.db, email=email) is None,
+        )
+
     async def login(self, form_data: OAuth2PasswordRequestForm) -> SuccessAuth:
         """
         Log in the user and generate an access token.
@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.engine import Row
+
+from src.config import settings
+from src.core.crud import crud_comment, crud_post, crud_post_change
+from src.core.crud.crud_comment import get_path
+from src.core.events import broker
+from src.core.repository.repository import Repository
+from src.core.schemas import Comment, CommentCreate, CommentPage, PostEvent, User
+
+
+def to_comment(row: Row) -> Comment:
+    """
+    Build the response of a comment row.
+
+    :param row: Row - Comment columns with the username of the author.
+    :return: Comment - Comment without its replies.
+    """
+    return Comment(
+        id=row.id,
+        post_id=row.post_id,
+        parent_id=row.parent_id,
+        author=row.username,
+        text=row.text,
+        created_at=row.created_at,
+        depth=row.depth,
+        reply_count=row.reply_count,
+    )
+
+
+def attach_replies(nodes: Dict[int, Comment], rows: List[Row]) -> List[Comment]:
+    """
+    Attach comments given in path order to their parents, building the trees without a query per level.
+
+    :param nodes: Dict[int, Comment] - Comments already loaded by ID; the attached ones are added to it.
+    :param rows: List[Row] - Comment rows in path order.
+    :return: List[Comment] - Comments whose parent is not loaded.
+    """
+    orphans = []
+    for row in rows:
+        comment = to_comment(row)
+        parent = nodes.get(row.parent_id)
+        if parent is not None:
+            parent.replies.append(comment)
+        else:
+            orphans.append(comment)
+        nodes[comment.id] = comment
+    return orphans
+
+
+class CommentRepo(Repository):
+    async def show_comments(self, post_id: int, before_id: Optional[int], limit: int, depth: int) -> CommentPage:
+        """
+        Get a page of top-level comments with their replies down to the given depth, in two queries:
+        one for the page and one for the first replies of each of its comments. The comments of a deleted post stay
+        until it is purged, so the post is checked first.
+
+        :param post_id: int - Post ID.
+        :param before_id: Optional[int] - Keyset cursor, only comments with a lower ID are returned.
+        :param limit: int - Page size.
+        :param depth: int - Levels of replies loaded, 0 for none.
+        :return: CommentPage - Page of comment trees and the cursor for the next page.
+        """
+        if not crud_post.exists(db=self.db, id=post_id):
+            raise HTTPException(status_code=404, detail=f"Post with ID: {post_id} not found")
+        rows = crud_comment.get_top_level(db=self.db, post_id=post_id, before_id=before_id, limit=limit + 1)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].id
+        nodes = {row.id: to_comment(row) for row in rows}
+
+        if rows and depth > 0:
+            # Every comment of the page gets its share of the replies budget, or the oldest threads of the range
+            # would take it all
+            replies = crud_comment.get_replies_of_roots(
+                db=self.db,
+                post_id=post_id,
+                root_paths=[get_path(None, row.id) for row in rows],
+                max_depth=depth,
+                limit_per_root=max(settings.COMMENT_REPLIES_MAX // len(rows), 1),
+            )
+            attach_replies(nodes=nodes, rows=replies)
+        return CommentPage(items=[nodes[row.id] for row in rows], next_cursor=next_cursor)
+
+    async def show_replies(self, comment_id: int, after_id: Optional[int], limit: int, depth: int) -> CommentPage:
+        """
+        Get the replies to a comment down to the given depth, in depth-first order.
+
+        :param comment_id: int - Comment ID.
+        :param after_id: Optional[int] - Keyset cursor, the ID of the last reply of the previous page.
+        :param limit: int - Maximum number of replies, at all depths.
+        :param depth: int - Levels of replies loaded.
+        :return: CommentPage - Reply trees and the cursor for the next page. Replies whose parent is on
+            a previous page are returned at the top level of the page.
+        """
+        comment = crud_comment.get(db=self.db, id=comment_id)
+        if not comment or not crud_post.exists(db=self.db, id=comment.post_id):
+            raise HTTPException(status_code=404, detail=f"Comment with ID: {comment_id} not found")
+
+        after_path = None
+        if after_id is not None:
+            after = crud_comment.get(db=self.db, id=after_id)
+            if not after or after.post_id != comment.post_id:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            after_path = after.path
+
+        rows = crud_comment.get_subtrees(
+            db=self.db,
+            post_id=comment.post_id,
+            first_path=comment.path,
+            last_path=comment.path,
+            max_depth=comment.depth + depth,
+            after_path=after_path,
+            limit=limit + 1,
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1].id
+        return CommentPage(items=attach_replies(nodes={}, rows=rows), next_cursor=next_cursor)
+
+    async def create_comment(self, obj_in: CommentCreate, current_user: User) -> Comment:
+        """
+        Comment on a post or reply to a comment. The comment count of the post and the reply count of the parent
+        are updated in the same transaction.
+
+        :param obj_in: CommentCreate - Comment creation data.
+        :param current_user: User - Current user making the request.
+        :return: Comment - Created comment.
+        """
+        parent = None
+        if obj_in.parent_id is not None:
+            parent = crud_comment.get(db=self.db, id=obj_in.parent_id)
+            if not parent or parent.post_id != obj_in.post_id:
+                raise HTTPException(status_code=404, detail=f"Comment with ID: {obj_in.parent_id} not found")
+            if parent.depth >= settings.COMMENT_MAX_DEPTH:
+                raise HTTPException(status_code=400, detail="The thread is too deep, reply to a higher comment")
+
+        comment_count = crud_post.add_comments(db=self.db, post_id=obj_in.post_id, count=1)
+        if comment_count is None:
+            raise HTTPException(status_code=404, detail=f"Post with ID: {obj_in.post_id} not found")
+
+        comment = crud_comment.add_comment(
+            db=self.db, post_id=obj_in.post_id, author_id=obj_in.author_id, text=obj_in.text, parent=parent
+        )
+        if parent is not None:
+            crud_comment.add_reply(db=self.db, comment_id=parent.id)
+        crud_post_change.record(db=self.db, post_id=obj_in.post_id)
+        self.db.commit()
+        created_comment = Comment(
+            id=comment.id,
+            post_id=comment.post_id,
+            parent_id=comment.parent_id,
+            author=current_user.username,
+            text=comment.text,
+            created_at=comment.created_at,
+            depth=comment.depth,
+            reply_count=0,
+        )
+        broker.publish(PostEvent(event="comment_created", post_id=obj_in.post_id, comment_count=comment_count))
+        return created_comment
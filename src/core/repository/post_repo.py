@@ -1,23 +1,57 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from fastapi import HTTPException
 
-from src.core.crud import crud_post, crud_reaction
+from src.config import settings
+from src.core.crud import (
+    crud_post,
+    crud_post_change,
+    crud_post_tag,
+    crud_reaction,
+    crud_reaction_event,
+    crud_user,
+    crud_user_stats,
+)
+from src.core.events import broker
+from src.core.loaders import Loaders
 from src.core.models import Post as PostModel
 from src.core.models import Reaction as ReactionModel
+from src.core.models import ReactionType
 from src.core.repository.repository import Repository
-from src.core.schemas import Post, PostCreate, PostResponseMessage, PostUpdate, User
+from src.core.schemas import (
+    Post,
+    PostChange,
+    PostChanges,
+    PostCreate,
+    PostEvent,
+    PostPage,
+    PostResponseMessage,
+    PostUpdate,
+    User,
+)
+from src.utils import extract_hashtags
+
+
+def get_tags(text: str) -> List[str]:
+    """
+    Get the hashtags of a post text to index.
+
+    :param text: str - Post text.
+    :return: List[str] - Tags, lowercase and without the "#".
+    """
+    return extract_hashtags(text, max_tags=settings.POST_MAX_TAGS, max_length=settings.TAG_MAX_LENGTH)
 
 
 class PostRepo(Repository):
     def __get_post(self, post_id: int) -> PostModel:
         """
-        Get the post from the database by ID.
+        Get the post from the database by ID, unless it was deleted.
 
         :param post_id: int - Post ID.
         :return: PostModel - Retrieved post.
         """
-        post = crud_post.get(db=self.db, id=post_id)
+        post = crud_post.get_live(db=self.db, id=post_id)
         if not post:
             raise HTTPException(status_code=404, detail=f"Post with ID: {post_id} not found")
         return post
@@ -30,6 +64,74 @@ class PostRepo(Repository):
         """
         return crud_post.get_all_posts(db=self.db)
 
+    async def show_posts_batch(self, post_ids: List[int], loaders: Loaders) -> List[Post]:
+        """
+        Get the posts with the given IDs.
+
+        :param post_ids: List[int] - Post IDs.
+        :param loaders: Loaders - Batching loaders of the request.
+        :return: List[Post] - Found posts in the order of the IDs, without duplicates.
+        """
+        posts = await loaders.load_posts(post_ids=list(dict.fromkeys(post_ids)))
+        return [post for post in posts if post is not None]
+
+    async def show_user_posts(self, username: str, before_id: Optional[int], limit: int) -> PostPage:
+        """
+        Get a page of posts written by the user.
+
+        :param username: str - Username of the author.
+        :param before_id: Optional[int] - Keyset cursor, only posts with a lower ID are returned.
+        :param limit: int - Page size.
+        :return: PostPage - Page of posts and the cursor for the next page.
+        """
+        user = crud_user.get_by_username(db=self.db, username=username)
+        if not user:
+            raise HTTPException(status_code=404, detail=f"User with username: {username} not found")
+
+        posts = crud_post.get_posts_by_author(
+            db=self.db, author_id=user.id, author=user.username, before_id=before_id, limit=limit + 1
+        )
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = posts[-1].id
+        return PostPage(items=posts, next_cursor=next_cursor)
+
+    async def show_changes(self, since: int, limit: int) -> PostChanges:
+        """
+        Get the post changes recorded after the sequence number, collapsed to the latest change per post. The
+        changes of the last POST_CHANGES_SAFETY_LAG_SECONDS are left for a later request.
+
+        :param since: int - Sequence number the client is synced to.
+        :param limit: int - Maximum number of log entries to read.
+        :return: PostChanges - Upserts and tombstones with the cursor for the next request.
+        """
+        recorded_before = datetime.utcnow() - timedelta(seconds=settings.POST_CHANGES_SAFETY_LAG_SECONDS)
+        if since < crud_post_change.get_horizon(db=self.db):
+            last_seq = crud_post_change.get_last_seq(db=self.db, recorded_before=recorded_before)
+            return PostChanges(changes=[], next_since=last_seq, has_more=False, reset_required=True)
+
+        entries = crud_post_change.get_changes(db=self.db, since=since, limit=limit, recorded_before=recorded_before)
+        latest = {entry.post_id: entry for entry in entries}
+        posts = {
+            post.id: post
+            for post in crud_post.get_posts_by_ids(
+                db=self.db, ids=[entry.post_id for entry in latest.values() if not entry.deleted]
+            )
+        }
+        changes = [
+            PostChange(
+                seq=entry.seq,
+                post_id=entry.post_id,
+                deleted=entry.post_id not in posts,
+                post=posts.get(entry.post_id),
+            )
+            for entry in sorted(latest.values(), key=lambda entry: entry.seq)
+        ]
+        return PostChanges(
+            changes=changes, next_since=entries[-1].seq if entries else since, has_more=len(entries) == limit
+        )
+
     async def create_post(self, obj_in: PostCreate) -> Post:
         """
         Create a new post.
@@ -37,15 +139,35 @@ class PostRepo(Repository):
         :param obj_in: PostCreate - Post creation data.
         :return: Post - Created post.
         """
-        post = crud_post.create(db=self.db, obj_in=obj_in)
-        return Post(
+        post = crud_post.add_post(db=self.db, obj_in=obj_in)
+        crud_post_tag.add_tags(db=self.db, post_id=post.id, tags=get_tags(post.text))
+        crud_user_stats.increment(db=self.db, user_id=post.author_id, posts=1)
+        crud_post_change.record(db=self.db, post_id=post.id)
+        self.db.commit()
+        created_post = Post(
             id=post.id,
             text=post.text,
             author=post.author.username,
             publication_date=post.publication_date,
             likes=post.likes,
             dislikes=post.dislikes,
+            comment_count=post.comment_count,
         )
+        broker.publish(PostEvent(event="post_created", post_id=created_post.id, post=created_post))
+        return created_post
+
+    def __raise_not_own_post(self, post_id: int, detail: str) -> None:
+        """
+        Raise the error of a write that matched no post: 404 if the post does not exist, 403 otherwise.
+        Only called when the ownership-checked statement affected no row.
+
+        :param post_id: int - Post ID.
+        :param detail: str - Message of the 403 error.
+        :return: None
+        """
+        if not crud_post.exists(db=self.db, id=post_id):
+            raise HTTPException(status_code=404, detail=f"Post with ID: {post_id} not found")
+        raise HTTPException(status_code=403, detail=detail)
 
     async def edit_post(self, obj_in: PostUpdate, post_id: int, current_user: User) -> Post:
         """
@@ -56,75 +178,113 @@ class PostRepo(Repository):
         :param current_user: User - Current user making the request.
         :return: Post - Updated post.
         """
-        post = self.__get_post(post_id=post_id)
-        if post.author.username != current_user.username:
-            raise HTTPException(status_code=403, detail="Access denied. You can only modify your own posts.")
+        row = crud_post.update_own_text(db=self.db, post_id=post_id, author_id=current_user.id, text=obj_in.text)
+        if row is None:
+            self.__raise_not_own_post(post_id=post_id, detail="Access denied. You can only modify your own posts.")
 
-        post = crud_post.update(db=self.db, db_obj=post, obj_in=obj_in)
-        return Post(
-            id=post.id,
-            text=post.text,
-            author=post.author.username,
-            publication_date=post.publication_date,
-            likes=post.likes,
-            dislikes=post.dislikes,
+        current_tags = crud_post_tag.get_tags_by_post_ids(db=self.db, post_ids=[post_id]).get(post_id, set())
+        crud_post_tag.set_tags(db=self.db, post_id=post_id, tags=get_tags(row.text), current=current_tags)
+        crud_post_change.record(db=self.db, post_id=post_id)
+        self.db.commit()
+        updated_post = Post(
+            id=row.id,
+            text=row.text,
+            author=current_user.username,
+            publication_date=row.publication_date,
+            likes=row.likes,
+            dislikes=row.dislikes,
+            comment_count=row.comment_count,
         )
+        broker.publish(PostEvent(event="post_edited", post_id=updated_post.id, post=updated_post))
+        return updated_post
 
     async def delete_post(self, post_id: int, current_user: User) -> PostResponseMessage:
         """
-        Delete a post.
+        Delete a post. The post disappears at once; it is hard-deleted with its reactions and comments by the
+        purge worker.
 
         :param post_id: int - Post ID.
         :param current_user: User - Current user making the request.
         :return: PostResponseMessage - Response message.
         """
-        post = self.__get_post(post_id=post_id)
-        if post.author.username != current_user.username:
-            raise HTTPException(status_code=403, detail="Access denied. You can only delete your own posts.")
+        row = crud_post.delete_own_post(
+            db=self.db, post_id=post_id, author_id=current_user.id, deleted_at=datetime.utcnow()
+        )
+        if row is None:
+            self.__raise_not_own_post(post_id=post_id, detail="Access denied. You can only delete your own posts.")
 
-        crud_post.remove(db=self.db, id=post_id)
+        crud_user_stats.increment(
+            db=self.db, user_id=current_user.id, posts=-1, likes=-row.likes, dislikes=-row.dislikes
+        )
+        crud_post_change.record(db=self.db, post_id=post_id, deleted=True)
+        self.db.commit()
+        broker.publish(PostEvent(event="post_deleted", post_id=post_id))
         return PostResponseMessage(message=f"Post with ID: {post_id} successfully deleted")
 
-    def __change_like(self, existing_reaction: ReactionModel, post: PostModel, user_id: int):
+    def __commit_reaction(self, post: PostModel, likes: int, dislikes: int) -> None:
+        """
+        Record the change of the post counters and the reaction event for the analytics, commit the reaction and
+        publish the new counters.
+
+        :param post: PostModel - Post model.
+        :param likes: int - Change of the like count.
+        :param dislikes: int - Change of the dislike count.
+        :return: None
+        """
+        event = PostEvent(event="reaction_changed", post_id=post.id, likes=post.likes, dislikes=post.dislikes)
+        crud_post_change.record(db=self.db, post_id=post.id)
+        crud_reaction_event.record(
+            db=self.db, post_id=post.id, author_id=post.author_id, likes=likes, dislikes=dislikes
+        )
+        self.db.commit()
+        broker.publish(event)
+
+    def __change_like(self, existing_reaction: ReactionModel, post: PostModel) -> PostResponseMessage:
         """
         Change a like reaction for a post.
 
         :param existing_reaction: ReactionModel - Existing reaction.
         :param post: PostModel - Post model.
-        :param user_id: int - User ID.
         :return: PostResponseMessage - Response message.
         """
-        if existing_reaction.reaction_type == "like":
-            crud_reaction.remove(db=self.db, id=existing_reaction.id)
+        kind = crud_reaction.get_kind(db=self.db, reaction=existing_reaction)
+        if kind == ReactionType.LIKE:
+            crud_reaction.remove_reaction(db=self.db, reaction=existing_reaction)
             crud_post.remove_like(db=self.db, post=post)
+            crud_user_stats.increment(db=self.db, user_id=post.author_id, likes=-1)
+            self.__commit_reaction(post=post, likes=-1, dislikes=0)
             return PostResponseMessage(message="Like removed successfully")
 
-        if existing_reaction.reaction_type == "dislike":
-            crud_reaction.remove(db=self.db, id=existing_reaction.id)
+        if kind == ReactionType.DISLIKE:
+            crud_reaction.set_kind(db=self.db, reaction=existing_reaction, kind=ReactionType.LIKE)
             crud_post.remove_dislike(db=self.db, post=post)
-            crud_reaction.add_reaction(db=self.db, post_id=post.id, user_id=user_id, reaction_type="like")
             crud_post.add_like(db=self.db, post=post)
+            crud_user_stats.increment(db=self.db, user_id=post.author_id, likes=1, dislikes=-1)
+            self.__commit_reaction(post=post, likes=1, dislikes=-1)
             return PostResponseMessage(message="Reaction changed successfully: Dislike replaced with Like.")
 
-    def __change_dislike(self, existing_reaction: ReactionModel, post: PostModel, user_id: int):
+    def __change_dislike(self, existing_reaction: ReactionModel, post: PostModel) -> PostResponseMessage:
         """
         Change a dislike reaction for a post.
 
         :param existing_reaction: ReactionModel - Existing reaction.
         :param post: PostModel - Post model.
-        :param user_id: int - User ID.
         :return: PostResponseMessage - Response message.
         """
-        if existing_reaction.reaction_type == "dislike":
-            crud_reaction.remove(db=self.db, id=existing_reaction.id)
+        kind = crud_reaction.get_kind(db=self.db, reaction=existing_reaction)
+        if kind == ReactionType.DISLIKE:
+            crud_reaction.remove_reaction(db=self.db, reaction=existing_reaction)
             crud_post.remove_dislike(db=self.db, post=post)
+            crud_user_stats.increment(db=self.db, user_id=post.author_id, dislikes=-1)
+            self.__commit_reaction(post=post, likes=0, dislikes=-1)
             return PostResponseMessage(message="Dislike removed successfully")
 
-        if existing_reaction.reaction_type == "like":
-            crud_reaction.remove(db=self.db, id=existing_reaction.id)
+        if kind == ReactionType.LIKE:
+            crud_reaction.set_kind(db=self.db, reaction=existing_reaction, kind=ReactionType.DISLIKE)
             crud_post.remove_like(db=self.db, post=post)
-            crud_reaction.add_reaction(db=self.db, post_id=post.id, user_id=user_id, reaction_type="dislike")
             crud_post.add_dislike(db=self.db, post=post)
+            crud_user_stats.increment(db=self.db, user_id=post.author_id, likes=-1, dislikes=1)
+            self.__commit_reaction(post=post, likes=-1, dislikes=1)
             return PostResponseMessage(message="Reaction changed successfully: Like replaced with Dislike.")
 
     async def like_post(self, post_id: int, current_user: User) -> PostResponseMessage:
@@ -141,10 +301,12 @@ class PostRepo(Repository):
 
         existing_reaction = crud_reaction.get_reaction(db=self.db, post_id=post_id, user_id=current_user.id)
         if existing_reaction:
-            return self.__change_like(existing_reaction=existing_reaction, post=post, user_id=current_user.id)
+            return self.__change_like(existing_reaction=existing_reaction, post=post)
 
-        crud_reaction.add_reaction(db=self.db, post_id=post_id, user_id=current_user.id, reaction_type="like")
+        crud_reaction.add_reaction(db=self.db, post_id=post_id, user_id=current_user.id, kind=ReactionType.LIKE)
         crud_post.add_like(db=self.db, post=post)
+        crud_user_stats.increment(db=self.db, user_id=post.author_id, likes=1)
+        self.__commit_reaction(post=post, likes=1, dislikes=0)
         return PostResponseMessage(message="Post liked successfully")
 
     async def dislike_post(self, post_id: int, current_user: User) -> PostResponseMessage:
@@ -161,8 +323,10 @@ class PostRepo(Repository):
 
         existing_reaction = crud_reaction.get_reaction(db=self.db, post_id=post_id, user_id=current_user.id)
         if existing_reaction:
-            return self.__change_dislike(existing_reaction=existing_reaction, post=post, user_id=current_user.id)
+            return self.__change_dislike(existing_reaction=existing_reaction, post=post)
 
-        crud_reaction.add_reaction(db=self.db, post_id=post_id, user_id=current_user.id, reaction_type="dislike")
+        crud_reaction.add_reaction(db=self.db, post_id=post_id, user_id=current_user.id, kind=ReactionType.DISLIKE)
         crud_post.add_dislike(db=self.db, post=post)
+        crud_user_stats.increment(db=self.db, user_id=post.author_id, dislikes=1)
+        self.__commit_reaction(post=post, likes=0, dislikes=1)
         return PostResponseMessage(message="Post disliked successfully")
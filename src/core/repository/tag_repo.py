@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.core.crud import crud_post_tag, crud_tag_trend, get_bucket
+from src.core.repository.repository import Repository
+from src.core.schemas import PostPage, TrendingTag
+
+
+def normalize_tag(tag: str) -> str:
+    """
+    Normalize a tag from a URL the way tags are indexed.
+
+    :param tag: str - Tag, with or without the "#".
+    :return: str - Tag, lowercase and without the "#".
+    """
+    return tag.lstrip("#").lower()
+
+
+class TagRepo(Repository):
+    async def show_tag_posts(self, tag: str, before_id: Optional[int], limit: int) -> PostPage:
+        """
+        Get a page of posts with the tag.
+
+        :param tag: str - Tag, with or without the "#".
+        :param before_id: Optional[int] - Keyset cursor, only posts with a lower ID are returned.
+        :param limit: int - Page size.
+        :return: PostPage - Page of posts and the cursor for the next page.
+        """
+        posts = crud_post_tag.get_posts_by_tag(db=self.db, tag=normalize_tag(tag), before_id=before_id, limit=limit + 1)
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            next_cursor = posts[-1].id
+        return PostPage(items=posts, next_cursor=next_cursor)
+
+    async def get_trending(self, hours: int, limit: int) -> List[TrendingTag]:
+        """
+        Get the most used tags of the last hours, from the hourly rollup.
+
+        :param hours: int - Number of hour buckets counted, the current one included.
+        :param limit: int - Maximum number of tags.
+        :return: List[TrendingTag] - Tags with their uses, most used first.
+        """
+        since = get_bucket(datetime.utcnow()) - timedelta(hours=hours - 1)
+        rows = crud_tag_trend.get_trending(db=self.db, since=since, limit=limit)
+        return [TrendingTag(tag=row.tag, uses=row.uses) for row in rows]
@@ -0,0 +1,32 @@
+from fastapi import HTTPException
+
+from src.core.autocomplete import username_index
+from src.core.crud import crud_user, crud_user_stats
+from src.core.repository.repository import Repository
+from src.core.schemas import UsernameSuggestions, UserStats
+
+
+class UserRepo(Repository):
+    async def get_stats(self, username: str) -> UserStats:
+        """
+        Get the statistics of a user.
+
+        :param username: str - Username of the user.
+        :return: UserStats - Posts written and likes/dislikes received by the user.
+        """
+        stats = crud_user_stats.get_by_username(db=self.db, username=username)
+        if not stats:
+            raise HTTPException(status_code=404, detail=f"User with username: {username} not found")
+        return stats
+
+    async def autocomplete(self, prefix: str, limit: int) -> UsernameSuggestions:
+        """
+        Get the usernames starting with the prefix, from the in-memory index once it is filled.
+
+        :param prefix: str - Beginning of the usernames.
+        :param limit: int - Maximum number of usernames.
+        :return: UsernameSuggestions - Matching usernames.
+        """
+        if username_index.ready:
+            return UsernameSuggestions(usernames=username_index.search(prefix=prefix, limit=limit))
+        return UsernameSuggestions(usernames=crud_user.get_usernames_by_prefix(db=self.db, prefix=prefix, limit=limit))
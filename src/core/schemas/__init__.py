@@ -1,4 +1,9 @@
-from .auth import SuccessAuth, SuccessSignUp, TokenData
-from .post import Post, PostCreate, PostResponseMessage, PostUpdate
+from .analytics import ReactionPoint, ReactionSeries
+from .auth import Availability, SuccessAuth, SuccessSignUp, TokenData
+from .comment import Comment, CommentCreate, CommentPage
+from .event import PostEvent
+from .post import Post, PostChange, PostChanges, PostCreate, PostPage, PostResponseMessage, PostUpdate
 from .reaction import ReactionCreate, ReactionUpdate
-from .user import ExtraUserFields, User, UserCreate, UserInDB, UserUpdate
+from .tag import TrendingTag
+from .user import ExtraUserFields, User, UserCreate, UserInDB, UsernameSuggestions, UserUpdate
+from .user_stats import UserStats, UserStatsBase
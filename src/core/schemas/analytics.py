@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ReactionPoint(BaseModel):
+    bucket: datetime
+    likes: int
+    dislikes: int
+
+
+class ReactionSeries(BaseModel):
+    resolution: str
+    points: List[ReactionPoint]
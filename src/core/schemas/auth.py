@@ -18,3 +18,8 @@ class SuccessSignUp(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[PositiveInt] = None
+
+
+class Availability(BaseModel):
+    username: Optional[bool] = None
+    email: Optional[bool] = None
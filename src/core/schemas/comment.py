@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, NonNegativeInt, PositiveInt, constr, validator
+
+
+class CommentBase(BaseModel):
+    text: constr(min_length=1, max_length=560)
+
+    @validator("text")
+    def strip_whitespace(cls, v):
+        if not v.strip():
+            raise HTTPException(status_code=400, detail="Text cannot be empty or consist only of whitespace")
+        return v.strip()
+
+
+class CommentCreate(CommentBase):
+    post_id: PositiveInt
+    parent_id: Optional[PositiveInt] = None
+    author_id: PositiveInt
+
+
+class Comment(CommentBase):
+    id: PositiveInt
+    post_id: PositiveInt
+    parent_id: Optional[PositiveInt] = None
+    author: str
+    created_at: datetime
+    depth: NonNegativeInt
+    reply_count: NonNegativeInt
+    # Loaded up to the requested depth; fewer than reply_count when cut by the depth or the size limit
+    replies: List["Comment"] = []
+
+
+Comment.update_forward_refs()
+
+
+class CommentPage(BaseModel):
+    items: List[Comment]
+    next_cursor: Optional[PositiveInt] = None
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel, NonNegativeInt, PositiveInt
+
+from .post import Post
+
+
+class PostEvent(BaseModel):
+    event: str
+    post_id: PositiveInt
+    post: Optional[Post] = None
+    likes: Optional[NonNegativeInt] = None
+    dislikes: Optional[NonNegativeInt] = None
+    comment_count: Optional[NonNegativeInt] = None
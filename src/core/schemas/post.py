@@ -1,4 +1,5 @@
 from datetime import date
+from typing import List, Optional
 
 from fastapi import HTTPException
 from pydantic import BaseModel, NonNegativeInt, PositiveInt, constr, validator
@@ -27,6 +28,7 @@ class PostInDB(PostBase):
     publication_date: date
     likes: NonNegativeInt
     dislikes: NonNegativeInt
+    comment_count: NonNegativeInt = 0
 
     class Config:
         orm_mode = True
@@ -38,3 +40,22 @@ class Post(PostInDB):
 
 class PostResponseMessage(BaseModel):
     message: str
+
+
+class PostPage(BaseModel):
+    items: List[Post]
+    next_cursor: Optional[PositiveInt] = None
+
+
+class PostChange(BaseModel):
+    seq: PositiveInt
+    post_id: PositiveInt
+    deleted: bool
+    post: Optional[Post] = None
+
+
+class PostChanges(BaseModel):
+    changes: List[PostChange]
+    next_since: NonNegativeInt
+    has_more: bool
+    reset_required: bool = False
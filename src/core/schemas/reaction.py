@@ -1,8 +1,10 @@
 from pydantic import BaseModel, PositiveInt
 
+from src.core.models.reaction import ReactionType
+
 
 class ReactionBase(BaseModel):
-    reaction_type: str
+    kind: ReactionType
 
 
 class ReactionCreate(ReactionBase):
@@ -14,7 +16,6 @@ class ReactionUpdate(ReactionBase):
 
 
 class ReactionInDB(ReactionBase):
-    id: PositiveInt
     user_id: PositiveInt
     post_id: PositiveInt
 
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, PositiveInt
+
+
+class TrendingTag(BaseModel):
+    tag: str
+    uses: PositiveInt
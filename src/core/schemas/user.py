@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import HTTPException
 from pydantic import BaseModel, EmailStr, PositiveInt, constr, validator
@@ -48,3 +48,7 @@ class User(UserInDB):
 class ExtraUserFields(BaseModel):
     name: str
     surname: str
+
+
+class UsernameSuggestions(BaseModel):
+    usernames: List[str]
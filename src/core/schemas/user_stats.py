@@ -0,0 +1,18 @@
+from pydantic import BaseModel, NonNegativeInt, PositiveInt
+
+
+class UserStatsBase(BaseModel):
+    posts_count: NonNegativeInt = 0
+    likes_received: NonNegativeInt = 0
+    dislikes_received: NonNegativeInt = 0
+
+
+class UserStatsInDB(UserStatsBase):
+    user_id: PositiveInt
+
+    class Config:
+        orm_mode = True
+
+
+class UserStats(UserStatsBase):
+    username: str
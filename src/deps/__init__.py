@@ -1 +1,12 @@
-from .deps import auth_repo, get_current_user, post_repo, user_client
+from .deps import (
+    analytics_repo,
+    auth_repo,
+    comment_repo,
+    event_broker,
+    get_current_user,
+    loaders,
+    post_repo,
+    tag_repo,
+    user_client,
+    user_repo,
+)
@@ -1,6 +1,6 @@
 from typing import Generator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
@@ -8,8 +8,11 @@ from src.config import OAUTH_SCHEME, settings
 from src.core.clients import UserClient
 from src.core.crud import crud_user
 from src.core.db import SessionLocal
+from src.core.events import Broker, broker
+from src.core.loaders import Loaders
+from src.core.metrics import timed
 from src.core.models import User
-from src.core.repository import AuthRepo, PostRepo
+from src.core.repository import AnalyticsRepo, AuthRepo, CommentRepo, PostRepo, TagRepo, UserRepo
 from src.core.schemas import TokenData
 
 
@@ -43,13 +46,73 @@ def post_repo(db: Session = Depends(get_db, use_cache=True)) -> PostRepo:
     return PostRepo(db)
 
 
-def user_client() -> UserClient:
+def user_repo(db: Session = Depends(get_db, use_cache=True)) -> UserRepo:
+    """
+    Dependency Injection for the UserRepo repository.
+
+    :param db: Session - Database session.
+    :return: UserRepo - UserRepo repository instance.
+    """
+    return UserRepo(db)
+
+
+def analytics_repo(db: Session = Depends(get_db, use_cache=True)) -> AnalyticsRepo:
+    """
+    Dependency Injection for the AnalyticsRepo repository.
+
+    :param db: Session - Database session.
+    :return: AnalyticsRepo - AnalyticsRepo repository instance.
+    """
+    return AnalyticsRepo(db)
+
+
+def comment_repo(db: Session = Depends(get_db, use_cache=True)) -> CommentRepo:
+    """
+    Dependency Injection for the CommentRepo repository.
+
+    :param db: Session - Database session.
+    :return: CommentRepo - CommentRepo repository instance.
+    """
+    return CommentRepo(db)
+
+
+def tag_repo(db: Session = Depends(get_db, use_cache=True)) -> TagRepo:
+    """
+    Dependency Injection for the TagRepo repository.
+
+    :param db: Session - Database session.
+    :return: TagRepo - TagRepo repository instance.
+    """
+    return TagRepo(db)
+
+
+def loaders(db: Session = Depends(get_db, use_cache=True)) -> Loaders:
+    """
+    Dependency Injection for the batching loaders, shared by everything within the request.
+
+    :param db: Session - Database session.
+    :return: Loaders - Loaders instance.
+    """
+    return Loaders(db)
+
+
+def user_client(request: Request) -> UserClient:
     """
     Dependency Injection for the UserClient client.
 
+    :param request: Request - Current request, giving access to the HTTP client created at startup.
     :return: UserClient - UserClient client instance.
     """
-    return UserClient()
+    return UserClient(client=request.app.state.http_client)
+
+
+def event_broker() -> Broker:
+    """
+    Dependency Injection for the post events broker.
+
+    :return: Broker - Broker instance of the worker.
+    """
+    return broker
 
 
 async def get_current_user(db: Session = Depends(get_db), token: str = Depends(OAUTH_SCHEME)) -> User:
@@ -66,22 +129,23 @@ async def get_current_user(db: Session = Depends(get_db), token: str = Depends(O
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.ALGORITHM],
-            options={"verify_aud": False},
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    with timed("auth"):
+        try:
+            payload = jwt.decode(
+                token,
+                settings.JWT_SECRET,
+                algorithms=[settings.ALGORITHM],
+                options={"verify_aud": False},
+            )
+            user_id: str = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+            token_data = TokenData(user_id=int(user_id))
+
+        except JWTError:
             raise credentials_exception
-        token_data = TokenData(user_id=int(user_id))
-
-    except JWTError:
-        raise credentials_exception
 
-    user = crud_user.get(db=db, id=token_data.user_id)
+        user = crud_user.get(db=db, id=token_data.user_id)
     if user is None:
         raise credentials_exception
     return user
@@ -1,24 +1,187 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+import httpx
 import uvicorn
 from fastapi import APIRouter, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from src.api.api_v1 import api_router
+from src.api import api_router, health_router
 from src.config import settings
+from src.core.analytics import reaction_aggregator
+from src.core.autocomplete import username_index
+from src.core.availability import availability_index
+from src.core.db import dispose_engine, init_engine
+from src.core.db.warmup import warm_up
+from src.core.events import broker
+from src.core.idempotency import get_store as get_idempotency_store
+from src.core.metrics import registry
+from src.core.purge import post_purger
+from src.core.rate_limit import get_backend as get_rate_limit_backend
+from src.middleware import (
+    AdaptiveLimiter,
+    AdmissionControlMiddleware,
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    QueryBudgetMiddleware,
+    RateLimitMiddleware,
+    RequestIdMiddleware,
+    ServerTimingMiddleware,
+)
 
 root_router = APIRouter()
 
+# Routes with their own admission control group, matched before routing: (method, path regex, group)
+ADMISSION_RULES = (
+    ("POST", rf"^{settings.API_V1_STR}/auth/(signup|login)$", "auth"),
+    ("GET", rf"^{settings.API_V1_STR}/posts/(batch|changes)?$", "listing"),
+    ("GET", rf"^{settings.API_V1_STR}/users/[^/]+/posts$", "listing"),
+    ("GET", rf"^{settings.API_V1_STR}/tags/[^/]+/posts$", "listing"),
+    ("GET", rf"^{settings.API_V1_STR}/comments/([^/]+/replies)?$", "listing"),
+    ("GET", rf"^{settings.API_V1_STR}/analytics/", "listing"),
+)
+# Probes must answer under load, and event streams would hold a slot for their whole life
+ADMISSION_EXEMPT = (r"^/(healthz|readyz|metrics)$", rf"^{settings.API_V1_STR}/posts/stream$")
+# Rate limited routes: (method, path regex, policy, key); "user" keys fall back to the IP without a valid token
+RATE_LIMIT_RULES = (
+    ("POST", rf"^{settings.API_V1_STR}/auth/login$", "login", "ip"),
+    ("POST", rf"^{settings.API_V1_STR}/auth/signup$", "signup", "ip"),
+    ("GET", rf"^{settings.API_V1_STR}/auth/availability$", "availability", "ip"),
+    ("POST", rf"^{settings.API_V1_STR}/posts/(like|dislike)$", "reaction", "user"),
+    ("POST", rf"^{settings.API_V1_STR}/posts/$", "post_write", "user"),
+    ("PUT", rf"^{settings.API_V1_STR}/posts/$", "post_write", "user"),
+    ("DELETE", rf"^{settings.API_V1_STR}/posts/$", "post_write", "user"),
+    ("POST", rf"^{settings.API_V1_STR}/comments/$", "post_write", "user"),
+)
+
+# Routes accepting an Idempotency-Key header: (method, path regex)
+IDEMPOTENCY_RULES = (
+    ("POST", rf"^{settings.API_V1_STR}/posts/(like|dislike)?$"),
+    ("POST", rf"^{settings.API_V1_STR}/comments/$"),
+)
+
+
+def metrics() -> PlainTextResponse:
+    """
+    Expose the application metrics in the Prometheus text format.
+
+    :return: PlainTextResponse - Prometheus exposition text
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Create the engine, the HTTP client and the event broker of the worker, start building the availability
+    filters, the username index, the purge of the deleted posts and the reaction rollups, and release them
+    on shutdown.
+
+    :param app: FastAPI - application
+    :return: AsyncIterator[None] - lifespan context
+    """
+    engine = init_engine()
+    await run_in_threadpool(warm_up, engine)
+    app.state.http_client = httpx.AsyncClient(
+        timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS),
+    )
+    await broker.start()
+    if settings.AVAILABILITY_FILTER_ENABLED:
+        await availability_index.start()
+    if settings.USERNAME_AUTOCOMPLETE_MEMORY_INDEX:
+        await username_index.start()
+    if settings.POST_PURGE_ENABLED:
+        await post_purger.start()
+    if settings.REACTION_AGGREGATOR_ENABLED:
+        await reaction_aggregator.start()
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        await reaction_aggregator.stop()
+        await post_purger.stop()
+        await username_index.stop()
+        await availability_index.stop()
+        await broker.stop()
+        await app.state.http_client.aclose()
+        dispose_engine()
+
+
+def get_admission_limiters() -> List[AdaptiveLimiter]:
+    """
+    Create the admission control limiters of the groups configured in ADMISSION_GROUPS.
+
+    :return: List[AdaptiveLimiter] - one limiter per group
+    """
+    return [
+        AdaptiveLimiter(
+            name=name,
+            limit=int(group["limit"]),
+            min_limit=int(group["min_limit"]),
+            max_limit=int(group["max_limit"]),
+            max_queue=int(group["max_queue"]),
+            target_latency=group["target_latency"],
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        )
+        for name, group in settings.ADMISSION_GROUPS.items()
+    ]
+
 
 def get_application() -> FastAPI:
-    app = FastAPI(title="Social Network FastAPI")
+    app = FastAPI(title="Social Network FastAPI", lifespan=lifespan)
+    if settings.QUERY_BUDGET_MODE != "off":
+        app.add_middleware(
+            QueryBudgetMiddleware,
+            mode=settings.QUERY_BUDGET_MODE,
+            max_queries=settings.QUERY_BUDGET_MAX_QUERIES,
+            max_repeats=settings.QUERY_BUDGET_MAX_REPEATS,
+        )
+    if settings.SERVER_TIMING_ENABLED:
+        app.add_middleware(ServerTimingMiddleware)
+    if settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=get_idempotency_store(),
+            rules=IDEMPOTENCY_RULES,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_SECONDS,
+            max_body_size=settings.IDEMPOTENCY_MAX_BODY_BYTES,
+        )
+    if settings.ADMISSION_CONTROL_ENABLED:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            limiters=get_admission_limiters(),
+            rules=ADMISSION_RULES,
+            exempt=ADMISSION_EXEMPT,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        )
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            backend=get_rate_limit_backend(),
+            policies=settings.RATE_LIMIT_POLICIES,
+            rules=RATE_LIMIT_RULES,
+        )
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    # Added last so the 429/503/409 responses of the middleware above carry the CORS headers too
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Retry-After"],
     )
+    app.add_middleware(RequestIdMiddleware)
     app.include_router(api_router, prefix=settings.API_V1_STR)
     app.include_router(root_router)
+    app.include_router(health_router)
+    if settings.METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics, include_in_schema=False, response_class=PlainTextResponse)
     return app
 
 
@@ -0,0 +1,7 @@
+from .admission import AdaptiveLimiter, AdmissionControlMiddleware
+from .idempotency import IdempotencyMiddleware
+from .metrics import MetricsMiddleware
+from .query_budget import QueryBudgetMiddleware
+from .rate_limit import RateLimitMiddleware
+from .request_id import RequestIdMiddleware
+from .server_timing import ServerTimingMiddleware
@@ -0,0 +1,234 @@
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.metrics import registry
+
+# Weight of the latest request in the moving average of the latency
+LATENCY_SMOOTHING = 0.2
+# The limit changes at most once per interval, so it reacts to a trend rather than to single requests
+ADJUST_INTERVAL_SECONDS = 1.0
+DECREASE_FACTOR = 0.9
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requests rejected with a 503 by admission control.", labels=("group", "reason")
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time requests waited for a slot before being admitted.", labels=("group",)
+)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit with a bounded FIFO queue of waiting requests.
+
+    The limit follows the latency with AIMD: when the average latency exceeds the target the limit is cut by
+    DECREASE_FACTOR, and while the limit is saturated and the latency is below target it grows by one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        target_latency: float,
+        queue_timeout: float,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        :param name: str - group name, used in the metrics
+        :param limit: int - initial number of concurrent requests
+        :param min_limit: int - the limit never goes below this
+        :param max_limit: int - the limit never goes above this
+        :param max_queue: int - requests allowed to wait for a slot; the next ones are rejected at once
+        :param target_latency: float - average latency in seconds above which the limit decreases
+        :param queue_timeout: float - seconds a request may wait for a slot
+        """
+        self.name = name
+        self.limit = limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.target_latency = target_latency
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.latency: Optional[float] = None
+        self.saturated = False
+        self.last_adjustment = time.monotonic()
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Wait for a slot.
+
+        :return: Optional[str] - None once admitted, otherwise the reason of the rejection
+        """
+        if self.inflight < self.limit and not self.waiters:
+            self.inflight += 1
+            return None
+        self.saturated = True
+        if len(self.waiters) >= self.max_queue:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.abandon(waiter)
+            return "timeout"
+        except asyncio.CancelledError:
+            self.abandon(waiter)
+            raise
+        ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start, self.name)
+        return None
+
+    def abandon(self, waiter: asyncio.Future) -> None:
+        """
+        Stop waiting for a slot, giving it back if it was granted just as the wait ended.
+
+        :param waiter: asyncio.Future - future of the waiting request
+        :return: None
+        """
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+        elif waiter in self.waiters:
+            self.waiters.remove(waiter)
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """
+        Free a slot and hand it to the next waiting request.
+
+        :param latency: Optional[float] - duration of the request in seconds, None if it was not processed
+        :return: None
+        """
+        self.inflight -= 1
+        if latency is not None:
+            self.record(latency)
+        while self.waiters and self.inflight < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def record(self, latency: float) -> None:
+        """
+        Update the average latency and adjust the limit.
+
+        :param latency: float - duration of a request in seconds
+        :return: None
+        """
+        self.latency = latency if self.latency is None else self.latency + LATENCY_SMOOTHING * (latency - self.latency)
+        now = time.monotonic()
+        if now - self.last_adjustment < ADJUST_INTERVAL_SECONDS:
+            return
+        self.last_adjustment = now
+        if self.latency > self.target_latency:
+            self.limit = max(self.min_limit, min(self.limit - 1, int(self.limit * DECREASE_FACTOR)))
+        elif self.saturated:
+            self.limit = min(self.max_limit, self.limit + 1)
+        self.saturated = False
+
+
+class AdmissionControlMiddleware:
+    """Limits the concurrent requests of each route group and sheds the excess with a fast 503 and Retry-After."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Iterable[AdaptiveLimiter],
+        rules: Iterable[Tuple[str, str, str]],
+        exempt: Iterable[str] = (),
+        retry_after: int = 1,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        :param app: ASGIApp - application
+        :param limiters: Iterable[AdaptiveLimiter] - one limiter per group; the "default" group takes the other routes
+        :param rules: Iterable[Tuple[str, str, str]] - (method, path regex, group) of the routes with their own group
+        :param exempt: Iterable[str] - path regexes that are never limited (probes, long-lived streams)
+        :param retry_after: int - seconds sent in the Retry-After header of the 503 responses
+        """
+        self.app = app
+        self.limiters: Dict[str, AdaptiveLimiter] = {limiter.name: limiter for limiter in limiters}
+        self.rules: List[Tuple[str, Pattern[str], str]] = [
+            (method, re.compile(pattern), group) for method, pattern, group in rules
+        ]
+        self.exempt = [re.compile(pattern) for pattern in exempt]
+        self.retry_after = retry_after
+        for metric, documentation, attribute in (
+            ("admission_limit", "Current concurrency limit.", "limit"),
+            ("admission_inflight", "Requests being processed.", "inflight"),
+            ("admission_queued", "Requests waiting for a slot.", "waiters"),
+        ):
+            registry.gauge(metric, documentation, labels=("group",), callback=self.gauge_callback(attribute))
+
+    def gauge_callback(self, attribute: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+        """
+        Make a callback reporting an attribute of every limiter.
+
+        :param attribute: str - limiter attribute; lengths are reported for collections
+        :return: Callable - gauge callback
+        """
+
+        def callback() -> Dict[Tuple[str, ...], float]:
+            values = {}
+            for name, limiter in self.limiters.items():
+                value = getattr(limiter, attribute)
+                values[(name,)] = len(value) if isinstance(value, deque) else value
+            return values
+
+        return callback
+
+    def get_limiter(self, method: str, path: str) -> Optional[AdaptiveLimiter]:
+        """
+        Find the limiter of a request.
+
+        :param method: str - HTTP method
+        :param path: str - request path
+        :return: Optional[AdaptiveLimiter] - limiter, None for CORS preflights and exempt paths
+        """
+        # Preflights never reach the application; shedding them would fail the browser's request before it is sent
+        if method == "OPTIONS" or any(pattern.match(path) for pattern in self.exempt):
+            return None
+        for rule_method, pattern, group in self.rules:
+            if rule_method == method and pattern.match(path):
+                return self.limiters[group]
+        return self.limiters.get("default")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.get_limiter(scope["method"], scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await limiter.acquire()
+        if rejection is not None:
+            ADMISSION_REJECTED.inc(limiter.name, rejection)
+            response = JSONResponse(
+                {"detail": "The server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
@@ -0,0 +1,297 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.idempotency import IdempotencyStore
+from src.core.metrics import registry
+from src.middleware.rate_limit import get_user_id
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "idempotency_requests_total",
+    "Requests with an Idempotency-Key, by outcome: executed, replayed, conflict (still running), mismatch "
+    "(key reused for another request) or error (store unavailable, executed without the key).",
+    labels=("outcome",),
+)
+
+MAX_KEY_LENGTH = 255
+# Seconds between two checks of a duplicate running in another worker
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+
+def get_digest(*parts: bytes) -> bytes:
+    """
+    Hash the parts into a 16 byte digest, separating them so that they cannot be shifted into one another.
+
+    :param parts: bytes - parts to hash
+    :return: bytes - digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.digest()
+
+
+class IdempotencyMiddleware:
+    """
+    Runs the matching requests that carry an Idempotency-Key header at most once per user and key.
+
+    The first request claims the key, runs, and its response is stored for the retention period; a retry gets the
+    stored response, with its headers, without running again. A duplicate that arrives while the first request runs
+    waits for it, up to wait_timeout, then gets a 409. Reusing a key for a different request (method, path, query or
+    body) is rejected with a 422.
+
+    Only the outcomes of requests that ran are stored: successes (2xx), and errors the route answered with a body
+    (5xx), which may follow a partial write. Rejected requests (4xx), exceptions and responses without a body release
+    the key so that a retry runs again.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        rules: Iterable[Tuple[str, str]],
+        wait_timeout: float,
+        max_body_size: int,
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        :param app: ASGIApp - application
+        :param store: IdempotencyStore - storage of the keys and responses
+        :param rules: Iterable[Tuple[str, str]] - (method, path regex) of the routes accepting the header
+        :param wait_timeout: float - seconds a duplicate waits for the first request
+        :param max_body_size: int - largest response body stored; larger responses release the key
+        """
+        self.app = app
+        self.store = store
+        self.rules: List[Tuple[str, Pattern[str]]] = [(method, re.compile(pattern)) for method, pattern in rules]
+        self.wait_timeout = wait_timeout
+        self.max_body_size = max_body_size
+        # First executions running in this worker, which its duplicates wait for without polling the database
+        self.running: Dict[bytes, asyncio.Event] = {}
+
+    def matches(self, method: str, path: str) -> bool:
+        """
+        Check if a route accepts the header.
+
+        :param method: str - HTTP method
+        :param path: str - request path
+        :return: bool - True if a rule matches
+        """
+        return any(rule_method == method and pattern.match(path) for rule_method, pattern in self.rules)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.matches(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client_key = headers.get("idempotency-key")
+        user_id = get_user_id(headers) if client_key is not None else None
+        # Without a user the route answers 401 anyway, and keys must not be shared between users
+        if client_key is None or user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(client_key) <= MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters long"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await self.read_body(receive)
+        key = get_digest(user_id.encode(), client_key.encode())
+        fingerprint = get_digest(scope["method"].encode(), scope["path"].encode(), scope["query_string"], body)
+
+        try:
+            lease_until, response = await self.claim(key, fingerprint)
+        except SQLAlchemyError as error:
+            # Like the rate limiter, a store failure must not turn into an outage of the routes
+            logger.error(f"Idempotency key check failed, running the request without it: {error}")
+            IDEMPOTENCY_REQUESTS.inc("error")
+            await self.app(scope, self.replay_body(body, receive), send)
+            return
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        IDEMPOTENCY_REQUESTS.inc("executed")
+        await self.execute(scope, self.replay_body(body, receive), send, key, lease_until)
+
+    async def claim(self, key: bytes, fingerprint: bytes) -> Tuple[Optional[float], Optional[Response]]:
+        """
+        Claim the key, or wait for the request holding it.
+
+        :param key: bytes - key digest
+        :param fingerprint: bytes - request digest
+        :return: Tuple[Optional[float], Optional[Response]] - lease of the claim if the request must run, otherwise
+            the response to send
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        interval = POLL_INTERVAL
+        lease_until, row = await run_in_threadpool(self.store.claim, key, fingerprint)
+        while lease_until is None:
+            if row is not None and row.fingerprint != fingerprint:
+                IDEMPOTENCY_REQUESTS.inc("mismatch")
+                return None, JSONResponse(
+                    {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+                )
+            if row is not None and row.status_code is not None:
+                IDEMPOTENCY_REQUESTS.inc("replayed")
+                return None, self.replay(row)
+            remaining = deadline - time.monotonic()
+            if row is not None and remaining <= 0:
+                IDEMPOTENCY_REQUESTS.inc("conflict")
+                return None, JSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still running, retry later"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+            if row is not None:
+                event = self.running.get(key)
+                if event is not None:
+                    try:
+                        await asyncio.wait_for(event.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(min(interval, remaining))
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+            # Released, expired or completed in between: claim again or read the response
+            lease_until, row = await run_in_threadpool(self.store.claim, key, fingerprint)
+        return lease_until, None
+
+    @staticmethod
+    def replay(row: Row) -> Response:
+        """
+        Build the stored response of a key.
+
+        :param row: Row - completed state of the key
+        :return: Response - stored status, headers and body, flagged with Idempotent-Replayed
+        """
+        response = Response(row.body, status_code=row.status_code)
+        for name, value in row.headers:
+            response.headers.append(name, value)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    def is_stored(self, status_code: Optional[int], size: int) -> bool:
+        """
+        Check if the response of a first execution is replayed to the retries.
+
+        :param status_code: Optional[int] - response status code, None if the application sent no response
+        :param size: int - length of the response body
+        :return: bool - True for a success, or a server error with a body, that fits in max_body_size
+        """
+        if status_code is None or size > self.max_body_size:
+            return False
+        return 200 <= status_code < 300 or (status_code >= 500 and size > 0)
+
+    async def execute(self, scope: Scope, receive: Receive, send: Send, key: bytes, lease_until: float) -> None:
+        """
+        Run the request that claimed the key and store its response, or release the key if it failed.
+
+        :param scope: Scope - ASGI scope
+        :param receive: Receive - ASGI receive channel
+        :param send: Send - ASGI send channel
+        :param key: bytes - key digest
+        :param lease_until: float - lease of the claim, so that a duplicate that took the key over keeps it
+        :return: None
+        """
+        # An execution that outlives its lease can be replaced by a duplicate, which must keep its own event
+        event = self.running[key] = asyncio.Event()
+        status_code: Optional[int] = None
+        headers: List[List[str]] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                )
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.max_body_size:
+                    chunks.append(chunk)
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if self.is_stored(status_code, size):
+                completed = await run_in_threadpool(
+                    self.store.complete, key, lease_until, status_code, headers, b"".join(chunks)
+                )
+                if not completed:
+                    logger.warning("An idempotency key was taken over before its response could be stored")
+        except SQLAlchemyError as error:
+            logger.error(f"Storing the response of an idempotency key failed: {error}")
+        finally:
+            if not completed:
+                try:
+                    await run_in_threadpool(self.store.release, key, lease_until)
+                except SQLAlchemyError as error:
+                    # The lease expires on its own
+                    logger.error(f"Releasing an idempotency key failed: {error}")
+            if self.running.get(key) is event:
+                del self.running[key]
+            event.set()
+
+    @staticmethod
+    async def read_body(receive: Receive) -> bytes:
+        """
+        Read the whole request body, which is part of the fingerprint.
+
+        :param receive: Receive - ASGI receive channel
+        :return: bytes - request body
+        """
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def replay_body(body: bytes, receive: Receive) -> Receive:
+        """
+        Get a receive channel that gives the body already read, then defers to the original channel.
+
+        :param body: bytes - request body
+        :param receive: Receive - original ASGI receive channel
+        :return: Receive - receive channel for the application
+        """
+        sent = False
+
+        async def wrapper() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return wrapper
@@ -0,0 +1,69 @@
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import REQUEST_STATS, RequestStats, registry
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUESTS = registry.counter("http_requests_total", "Number of HTTP requests.", labels=("method", "route", "status"))
+REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "Requests that raised or returned a 5xx status.", labels=("method", "route")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests.", labels=("method", "route")
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request.", labels=("route",), buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds", "Database time per request.", labels=("route",)
+)
+
+
+def get_route_name(scope: Scope) -> str:
+    """
+    Get the path template of the matched route, to keep the label cardinality bounded.
+
+    :param scope: Scope - ASGI scope after routing
+    :return: str - route path template or "unmatched"
+    """
+    route: Any = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records the latency, status and database usage of every HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestStats()
+        token = REQUEST_STATS.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUEST_STATS.reset(token)
+            method, route = scope["method"], get_route_name(scope)
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_DURATION.observe(elapsed, method, route)
+            REQUEST_DB_QUERIES.observe(stats.queries, route)
+            REQUEST_DB_DURATION.observe(stats.db_time, route)
+            if status >= 500:
+                REQUEST_ERRORS.inc(method, route)
@@ -0,0 +1,94 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.db.query_budget import ACTIVE_COUNTER, BUDGET_ATTRIBUTE, QueryCounter
+from src.middleware.metrics import get_route_name
+from src.utils import get_logger
+
+logger = get_logger(__file__, logging.DEBUG)
+
+BUDGET_HEADER = "Query-Budget-Exceeded"
+
+
+class QueryBudgetMiddleware:
+    """
+    Reports the requests that exceed their query budget.
+
+    The limits declared on the endpoint with @query_budget are used when present, the default ones otherwise.
+    The request has done its work by then, so it is not failed: the violations are logged, and flagged with a
+    Query-Budget-Exceeded response header when found before the response starts.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str, max_queries: int, max_repeats: int) -> None:
+        """
+        Initialize the middleware.
+
+        :param app: ASGIApp - wrapped application
+        :param mode: str - "raise" to log the violations as errors and flag the response (tests), "warn" to log
+            them as warnings (staging)
+        :param max_queries: int - default maximum number of statements per request
+        :param max_repeats: int - default maximum executions of the same statement shape per request
+        """
+        self.app = app
+        self.mode = mode
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    def apply_budget(self, scope: Scope, counter: QueryCounter) -> None:
+        """
+        Set the limits of the endpoint on the counter, each one defaulting on its own.
+
+        :param scope: Scope - request scope, with the endpoint once routed
+        :param counter: QueryCounter - counter of the request
+        :return: None
+        """
+        max_queries, max_repeats = getattr(scope.get("endpoint"), BUDGET_ATTRIBUTE, (None, None))
+        counter.max_queries = self.max_queries if max_queries is None else max_queries
+        counter.max_repeats = self.max_repeats if max_repeats is None else max_repeats
+        counter.label = f"{scope['method']} {get_route_name(scope)}"
+
+    def report(self, counter: QueryCounter) -> None:
+        """
+        Log the violations of the budget.
+
+        :param counter: QueryCounter - counter of the request
+        :return: None
+        """
+        if self.mode == "raise":
+            logger.error(counter.report())
+        else:
+            logger.warning(counter.report())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter(label=scope["path"], max_queries=self.max_queries, max_repeats=self.max_repeats)
+        reported = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal reported
+            if message["type"] == "http.response.start":
+                self.apply_budget(scope, counter)
+                violations = counter.violations()
+                if violations:
+                    reported = True
+                    self.report(counter)
+                    summary = "; ".join(violation.splitlines()[0] for violation in violations)
+                    MutableHeaders(scope=message).append(BUDGET_HEADER, summary)
+            await send(message)
+
+        token = ACTIVE_COUNTER.set(counter)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            ACTIVE_COUNTER.reset(token)
+
+        # Statements run while streaming the body
+        if not reported:
+            self.apply_budget(scope, counter)
+            if counter.violations():
+                self.report(counter)
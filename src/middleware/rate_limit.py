@@ -0,0 +1,111 @@
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import settings
+from src.core.metrics import registry
+from src.core.rate_limit import RateLimitBackend
+
+RATE_LIMITED = registry.counter(
+    "rate_limited_total", "Requests rejected with a 429 by the rate limiter.", labels=("policy", "key_type")
+)
+
+
+def get_user_id(headers: Headers) -> Optional[str]:
+    """
+    Get the user ID from the bearer token, without touching the database.
+
+    :param headers: Headers - request headers
+    :return: Optional[str] - "sub" claim of a valid token, None otherwise
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM], options={"verify_aud": False})
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+class RateLimitMiddleware:
+    """
+    Applies token bucket policies to the matching routes before any database or password hashing work.
+
+    Policies keyed by "user" use the user ID of the bearer token and fall back to the client IP without a valid
+    token; policies keyed by "ip" always use the client IP.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        policies: Dict[str, Dict[str, float]],
+        rules: Iterable[Tuple[str, str, str, str]],
+    ) -> None:
+        """
+        Initialize the middleware.
+
+        :param app: ASGIApp - application
+        :param backend: RateLimitBackend - storage of the buckets
+        :param policies: Dict[str, Dict[str, float]] - rate (tokens per second) and burst of every policy
+        :param rules: Iterable[Tuple[str, str, str, str]] - (method, path regex, policy, "ip" or "user") of the limited
+            routes; the first matching rule applies
+        """
+        self.app = app
+        self.backend = backend
+        self.policies = policies
+        self.rules: List[Tuple[str, Pattern[str], str, str]] = [
+            (method, re.compile(pattern), policy, key_type) for method, pattern, policy, key_type in rules
+        ]
+
+    def get_rule(self, method: str, path: str) -> Optional[Tuple[str, str]]:
+        """
+        Find the policy of a request.
+
+        :param method: str - HTTP method
+        :param path: str - request path
+        :return: Optional[Tuple[str, str]] - policy name and key type, None for routes without a policy
+        """
+        for rule_method, pattern, policy, key_type in self.rules:
+            if rule_method == method and pattern.match(path):
+                return policy, key_type
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.get_rule(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        policy_name, key_type = rule
+        policy = self.policies[policy_name]
+        user_id = get_user_id(Headers(scope=scope)) if key_type == "user" else None
+        if user_id is not None:
+            key = f"{policy_name}:user:{user_id}"
+        else:
+            key_type = "ip"
+            client = scope.get("client")
+            key = f"{policy_name}:ip:{client[0] if client else 'unknown'}"
+
+        retry_after = await self.backend.hit(key, rate=policy["rate"], capacity=policy["burst"])
+        if retry_after > 0:
+            RATE_LIMITED.inc(policy_name, key_type)
+            response = JSONResponse(
+                {"detail": "Too many requests, retry later"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
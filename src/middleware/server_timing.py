@@ -0,0 +1,42 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import REQUEST_STATS, REQUEST_TIMING, RequestStats, TimingContext
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header with the auth, db, external, serialize and total phases of the request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = TimingContext()
+        timing_token = REQUEST_TIMING.set(timing)
+        stats = REQUEST_STATS.get()
+        stats_token = None
+        if stats is None:
+            stats = RequestStats()
+            stats_token = REQUEST_STATS.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                phases = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timing.phases.items()]
+                phases.append(f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"')
+                phases.append(f"total;dur={(time.perf_counter() - start) * 1000:.2f}")
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join(phases))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_TIMING.reset(timing_token)
+            if stats_token is not None:
+                REQUEST_STATS.reset(stats_token)
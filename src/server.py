@@ -0,0 +1,56 @@
+"""Production entry point: run the application with several uvicorn worker processes.
+
+    python -m src.server
+
+Workers are separate processes, each importing the application and creating its own engine and connection pool.
+On SIGTERM uvicorn stops accepting connections, lets the in-flight requests finish for at most
+SERVER_GRACEFUL_SHUTDOWN_SECONDS and then runs the shutdown handlers.
+"""
+
+import os
+
+import uvicorn
+
+from src.config import settings
+
+
+def get_workers() -> int:
+    """
+    Get the number of worker processes.
+
+    :return: int - WEB_CONCURRENCY, or the number of CPUs available to the process if it is not set
+    """
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main() -> None:
+    """
+    Start the server.
+
+    :return: None
+    """
+    uvicorn.run(
+        "src.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=get_workers(),
+        # "auto" picks uvloop and httptools when they are installed (uvicorn[standard])
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
+        backlog=settings.SERVER_BACKLOG,
+        limit_concurrency=settings.SERVER_LIMIT_CONCURRENCY,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+if __name__ == "__main__":
+    main()
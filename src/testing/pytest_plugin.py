@@ -0,0 +1,37 @@
+"""
+Pytest fixtures for query budget checks.
+
+Enable with `pytest -p src.testing.pytest_plugin` or `pytest_plugins = ["src.testing.pytest_plugin"]` in conftest.py.
+"""
+
+from typing import Callable, ContextManager, Optional
+
+import pytest
+from sqlalchemy.engine import Engine
+
+from src.core.db import SessionLocal
+from src.core.db.query_budget import QueryCounter, count_queries
+
+
+@pytest.fixture()
+def query_budget() -> Callable[..., ContextManager[QueryCounter]]:
+    """
+    Context manager factory that fails the test when the block exceeds its query budget.
+
+    The statements are counted on the engine SessionLocal is bound to when the block starts, which is the one of
+    the test when it binds its own; before any engine is bound, every engine is watched.
+
+    Example:
+        with query_budget(max_queries=1, max_repeats=1):
+            client.get("/api_v1/posts/")
+
+    :return: Callable[..., ContextManager[QueryCounter]] - count_queries on the bound engine
+    """
+
+    def watch(
+        max_queries: Optional[int] = None, max_repeats: Optional[int] = None, mode: str = "raise"
+    ) -> ContextManager[QueryCounter]:
+        engine = SessionLocal.kw.get("bind") or Engine
+        return count_queries(engine, max_queries=max_queries, max_repeats=max_repeats, mode=mode, label="test")
+
+    return watch
@@ -1 +1,5 @@
+from .bloom import BloomFilter
+from .hashtags import extract_hashtags
 from .logging import get_logger
+from .prefix_index import PrefixIndex
+from .token_bucket import TokenBucket
@@ -0,0 +1,58 @@
+"""Provides a thread-safe Bloom filter of strings."""
+
+import hashlib
+import math
+import threading
+from typing import List
+
+
+class BloomFilter:
+    """
+    Set membership test without false negatives: an item that was added is always reported as present,
+    an item that was not is reported as present with a probability of about `error_rate`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """
+        Initialize an empty filter sized for the capacity.
+
+        Args:
+            capacity {int}: number of items the error rate is guaranteed for
+            error_rate {float}: false positive probability at capacity
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def positions(self, item: str) -> List[int]:
+        """
+        Get the bit positions of an item, derived from one digest by double hashing.
+
+        Args:
+            item {str}: item
+        Returns:
+            bit positions
+        """
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        """
+        Add an item.
+
+        Args:
+            item {str}: item
+        """
+        positions = self.positions(item)
+        with self.lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
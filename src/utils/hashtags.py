@@ -0,0 +1,30 @@
+"""Provides the extraction of #hashtags from text."""
+
+import re
+from typing import List
+
+# A "#" not preceded by a word character or another "#", followed by letters, digits or underscores
+HASHTAG_PATTERN = re.compile(r"(?<![\w#])#(\w+)")
+
+
+def extract_hashtags(text: str, max_tags: int, max_length: int) -> List[str]:
+    """
+    Get the distinct hashtags of a text, lowercased, in order of first appearance.
+    Tags made of digits only (#1) and tags longer than max_length are ignored.
+
+    Args:
+        text {str}: text to parse
+        max_tags {int}: maximum number of tags returned
+        max_length {int}: maximum length of a tag, without the "#"
+    Returns:
+        tags without the "#"
+    """
+    tags: List[str] = []
+    for match in HASHTAG_PATTERN.finditer(text):
+        tag = match.group(1).lower()
+        if tag.isdigit() or len(tag) > max_length or tag in tags:
+            continue
+        tags.append(tag)
+        if len(tags) == max_tags:
+            break
+    return tags
@@ -1,8 +1,157 @@
-"""Provides functions to create loggers."""
+"""Provides functions to create loggers.
 
+Loggers do not write to their sinks themselves: records are put on a bounded queue by a QueueHandler
+and written by a single background listener thread, so a slow stdout or disk never blocks the event loop.
+When the queue is full the record is dropped and counted instead.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from typing import Text
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Text
+
+from src.config import settings
+
+REQUEST_ID: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s — %(name)s — %(levelname)s — %(request_id)s — %(message)s"
+
+_lock = threading.Lock()
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the id of the current request; runs in the caller, where the request context is visible."""
+
+    def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003
+        """
+        Add the request_id attribute to the record.
+
+        Args:
+            record {logging.LogRecord}: record to stamp
+        Returns:
+            always True
+        """
+        record.request_id = REQUEST_ID.get() or "-"
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keeps only a sample of DEBUG records; records of other levels always pass."""
+
+    def __init__(self, rate: float) -> None:
+        """
+        Initialize the filter.
+
+        Args:
+            rate {float}: fraction of DEBUG records to keep, from 0 to 1
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003
+        """
+        Decide whether the record is kept.
+
+        Args:
+            record {logging.LogRecord}: record to check
+        Returns:
+            True if the record should be logged
+        """
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: A003
+        """
+        Format the record.
+
+        Args:
+            record {logging.LogRecord}: record to format
+        Returns:
+            JSON line
+        """
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or printing errors."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        """
+        Initialize the handler.
+
+        Args:
+            log_queue {queue.Queue}: bounded queue read by the listener
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.formatter_for_exceptions = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the arguments into the message and render the traceback, so the record can cross threads.
+
+        Args:
+            record {logging.LogRecord}: record to prepare
+        Returns:
+            copy of the record without args and exc_info
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.formatter_for_exceptions.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Put the record on the queue without waiting.
+
+        Args:
+            record {logging.LogRecord}: prepared record
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Not guarded by a lock: an occasional lost increment is cheaper than contention on every drop
+            self.dropped += 1
+
+
+def get_formatter() -> logging.Formatter:
+    """
+    Get the formatter configured by LOG_FORMAT.
+
+    Returns:
+        logging.Formatter producing JSON or text lines
+    """
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
 
 
 def get_console_handler() -> logging.StreamHandler:
@@ -13,44 +162,104 @@ def get_console_handler() -> logging.StreamHandler:
         logging.StreamHandler which logs into stdout
     """
     console_handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter("%(asctime)s — %(name)s — %(levelname)s — %(message)s")
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(get_formatter())
 
     return console_handler
 
 
-def get_file_handler() -> logging.FileHandler:
+def get_file_handler(filename: Text) -> logging.FileHandler:
     """
-    Get console handler.
+    Get file handler.
 
+    Args:
+        filename {Text}: path of the log file
     Returns:
-        logging.StreamHandler which logs into stdout
+        logging.FileHandler which logs into the file
     """
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    file_handler = logging.FileHandler("RouteListSender.log")
-    file_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(get_formatter())
 
     return file_handler
 
 
+def get_queue_handler() -> BoundedQueueHandler:
+    """
+    Get the handler shared by all loggers, starting the listener thread on first use.
+
+    Returns:
+        BoundedQueueHandler feeding the listener
+    """
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is None:
+            log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+            _queue_handler = BoundedQueueHandler(log_queue)
+            _queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+            _queue_handler.addFilter(RequestIdFilter())
+
+            sinks: List[logging.Handler] = [get_console_handler()]
+            if settings.LOG_FILE:
+                sinks.append(get_file_handler(settings.LOG_FILE))
+            _listener = QueueListener(log_queue, *sinks)
+            _listener.start()
+            atexit.register(stop_logging)
+        return _queue_handler
+
+
+def restart_listener() -> None:
+    """Start a new listener thread with a new queue in a forked child, where the parent's thread does not exist."""
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_listener)
+
+
+def stop_logging() -> None:
+    """Flush the queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def dropped_records() -> int:
+    """
+    Get the number of records dropped because the queue was full.
+
+    Returns:
+        number of dropped records since start
+    """
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
 def get_logger(name: Text = __name__, log_level: Text or int = logging.DEBUG) -> logging.Logger:
     """
     Get logger.
 
     Args:
         name {Text}: logger name
-        log_level {Text or int}: logging level; can be string name or integer value
+        log_level {Text or int}: logging level; can be string name or integer value.
+            LOG_LEVEL raises it, so filtered records are not even created
     Returns:
         logging.Logger instance
     """
     logger = logging.getLogger(name)
-    logger.setLevel(log_level)
+    level = logging.getLevelName(log_level) if isinstance(log_level, str) else log_level
+    logger.setLevel(max(level, logging.getLevelName(settings.LOG_LEVEL)))
 
     # Prevent duplicate outputs in Jupyter Notebook
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    logger.addHandler(get_console_handler())
+    logger.addHandler(get_queue_handler())
     logger.propagate = False
 
     return logger
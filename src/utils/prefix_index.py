@@ -0,0 +1,58 @@
+"""Provides a sorted array of strings searchable by prefix."""
+
+import bisect
+import threading
+from typing import Iterable, List
+
+
+class PrefixIndex:
+    """Keeps strings sorted so the ones starting with a prefix are found with a binary search and a slice."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.items: List[str] = []
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: str) -> None:
+        """
+        Insert a string, keeping the order; strings already present are ignored.
+
+        Args:
+            item {str}: string to insert
+        """
+        with self.lock:
+            position = bisect.bisect_left(self.items, item)
+            if position == len(self.items) or self.items[position] != item:
+                self.items.insert(position, item)
+
+    def extend(self, items: Iterable[str]) -> None:
+        """
+        Insert many strings at once, re-sorting the array a single time.
+
+        Args:
+            items {Iterable[str]}: strings to insert
+        """
+        with self.lock:
+            self.items = sorted(set(self.items).union(items))
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """
+        Get the first strings starting with the prefix, in code point order.
+
+        Args:
+            prefix {str}: prefix
+            limit {int}: maximum number of strings returned
+        Returns:
+            matching strings
+        """
+        items = self.items
+        start = bisect.bisect_left(items, prefix)
+        matches = []
+        for item in items[start : start + limit]:
+            if not item.startswith(prefix):
+                break
+            matches.append(item)
+        return matches
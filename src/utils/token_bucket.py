@@ -0,0 +1,40 @@
+"""Provides a thread-safe token bucket."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, with bursts of up to `capacity` events."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """
+        Initialize the bucket, full.
+
+        Args:
+            rate {float}: tokens added per second
+            capacity {float}: maximum number of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Take tokens from the bucket if enough are available.
+
+        Args:
+            tokens {float}: number of tokens to take
+        Returns:
+            True if the tokens were taken, False otherwise
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
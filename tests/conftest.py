@@ -0,0 +1,68 @@
+"""
+Fixtures shared by the tests: a fresh database per test, SQLite in memory, and PostgreSQL too when
+TEST_POSTGRES_DSN points at a database the tests may drop tables in.
+"""
+
+import os
+
+# The settings are read when src is imported
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("DATABASE_DSN", "sqlite://")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from typing import Iterator  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from src.core.db import SessionLocal  # noqa: E402
+from src.core.models import Base  # noqa: E402
+
+pytest_plugins = ["src.testing.pytest_plugin"]
+
+POSTGRES_DSN = os.environ.get("TEST_POSTGRES_DSN")
+
+
+def create_test_engine(backend: str) -> Engine:
+    """
+    Create an engine on an empty schema.
+
+    :param backend: str - "sqlite" or "postgresql"
+    :return: Engine - engine, SessionLocal is bound to it
+    """
+    if backend == "postgresql":
+        if not POSTGRES_DSN:
+            pytest.skip("TEST_POSTGRES_DSN is not set")
+        engine = create_engine(POSTGRES_DSN)
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def engine(request: pytest.FixtureRequest) -> Iterator[Engine]:
+    engine = create_test_engine(request.param)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_engine() -> Iterator[Engine]:
+    engine = create_test_engine("postgresql")
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine: Engine) -> Iterator[Session]:
+    with SessionLocal() as session:
+        yield session
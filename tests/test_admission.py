@@ -0,0 +1,36 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.main import get_application
+from src.middleware import AdaptiveLimiter, AdmissionControlMiddleware
+
+# A group without slots nor queue sheds every request it gets
+FULL = {"limit": 0, "min_limit": 0, "max_limit": 0, "max_queue": 0, "target_latency": 1.0}
+
+
+def test_options_requests_are_not_limited() -> None:
+    app = FastAPI()
+    app.add_api_route("/items", lambda: {}, methods=["GET", "OPTIONS"])
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiters=[AdaptiveLimiter(name="default", queue_timeout=1, **FULL)],
+        rules=(),
+    )
+    client = TestClient(app)
+
+    assert client.options("/items").status_code == 200
+    assert client.get("/items").status_code == 503
+
+
+def test_shed_requests_carry_the_cors_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ADMISSION_CONTROL_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMISSION_GROUPS", {"auth": FULL, "listing": FULL, "default": FULL})
+    client = TestClient(get_application())
+
+    shed = client.post(f"{settings.API_V1_STR}/auth/login", headers={"Origin": "https://app.example"})
+
+    assert shed.status_code == 503
+    assert shed.headers["access-control-allow-origin"] == "*"
+    assert shed.headers["retry-after"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
@@ -0,0 +1,33 @@
+from sqlalchemy.orm import Session
+
+from src.core.autocomplete.index import UsernameIndex
+from src.core.crud import crud_user
+from src.core.models import User
+
+
+def add_users(db: Session, usernames: dict) -> None:
+    db.add_all([User(id=user_id, username=name, email=f"{name}@example.com") for user_id, name in usernames.items()])
+    db.commit()
+
+
+def test_refresh_picks_up_ids_committed_out_of_order(db: Session) -> None:
+    index = UsernameIndex(refresh_interval=30, gap_timeout=300)
+    add_users(db, {1: "alice", 3: "alina"})
+    index.refresh()
+
+    # The signup of ID 2 commits after ID 3 was read
+    add_users(db, {2: "alix", 4: "alma"})
+    index.refresh()
+
+    assert index.search(prefix="al", limit=10) == ["alice", "alina", "alix", "alma"]
+    assert index.gaps == {}
+
+
+def test_memory_and_database_orders_match(db: Session) -> None:
+    index = UsernameIndex(refresh_interval=30, gap_timeout=300)
+    add_users(db, {1: "ala", 2: "al_b", 3: "alZ", 4: "al.c"})
+    index.refresh()
+
+    from_database = crud_user.get_usernames_by_prefix(db=db, prefix="al", limit=10)
+
+    assert index.search(prefix="al", limit=10) == from_database == ["al.c", "alZ", "al_b", "ala"]
@@ -0,0 +1,82 @@
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, SmallInteger, String, Table, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.commands.backfill_reaction_kind import BACKFILL_CHECKPOINT, backfill_reaction_kind
+from src.core.crud import crud_checkpoint, crud_reaction
+from src.core.db import SessionLocal
+from src.core.models import Post, Reaction, ReactionType, User, UserStats
+
+# The reaction table between the expand and contract revisions
+expanded_reaction = Table(
+    "reaction",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("post_id", Integer),
+    Column("user_id", Integer),
+    Column("reaction_type", String),
+    Column("kind", SmallInteger, nullable=True),
+)
+
+
+@pytest.fixture
+def expanded_db(engine: Engine) -> Iterator[Session]:
+    Reaction.__table__.drop(engine)
+    expanded_reaction.create(engine)
+    with SessionLocal() as session:
+        yield session
+
+
+def add_users_and_posts(db: Session) -> None:
+    db.add_all([User(id=user_id, username=f"user{user_id}", email=f"{user_id}@example.com") for user_id in (1, 2, 3)])
+    db.flush()
+    # Post 1: two concurrent likes by user 2, of which only one was counted, and a dislike by user 3.
+    # Post 2: a dislike by user 2 then a like inserted concurrently, both counted.
+    db.add_all([Post(id=1, author_id=1, likes=1, dislikes=1), Post(id=2, author_id=1, likes=1, dislikes=1)])
+    db.add(UserStats(user_id=1, posts_count=2, likes_received=2, dislikes_received=2))
+    db.execute(
+        insert(expanded_reaction),
+        [
+            {"id": 1, "post_id": 1, "user_id": 2, "reaction_type": "like"},
+            {"id": 2, "post_id": 1, "user_id": 2, "reaction_type": "like"},
+            {"id": 3, "post_id": 1, "user_id": 3, "reaction_type": "dislike"},
+            {"id": 4, "post_id": 2, "user_id": 2, "reaction_type": "dislike"},
+            {"id": 5, "post_id": 2, "user_id": 2, "reaction_type": "like"},
+        ],
+    )
+    db.commit()
+
+
+def test_backfill_sets_kinds_removes_duplicates_and_recounts(expanded_db: Session) -> None:
+    add_users_and_posts(expanded_db)
+
+    assert backfill_reaction_kind(batch_size=2, pause=0) == 5
+
+    expanded_db.expire_all()
+    rows = expanded_db.execute(select(expanded_reaction.c.id, expanded_reaction.c.kind).order_by("id")).all()
+    assert rows == [(2, ReactionType.LIKE), (3, ReactionType.DISLIKE), (5, ReactionType.LIKE)]
+    posts = {post.id: (post.likes, post.dislikes) for post in expanded_db.query(Post)}
+    assert posts == {1: (1, 1), 2: (1, 0)}
+    stats = expanded_db.get(UserStats, 1)
+    assert (stats.likes_received, stats.dislikes_received) == (2, 1)
+    assert crud_checkpoint.get_value(db=expanded_db, name=BACKFILL_CHECKPOINT) == 5
+
+
+def test_backfill_resumes_from_its_checkpoint(expanded_db: Session) -> None:
+    add_users_and_posts(expanded_db)
+    backfill_reaction_kind(batch_size=10, pause=0)
+    expanded_db.execute(insert(expanded_reaction).values(id=6, post_id=2, user_id=3, reaction_type="dislike"))
+    expanded_db.commit()
+
+    assert backfill_reaction_kind(batch_size=10, pause=0) == 1
+
+
+def test_kind_falls_back_to_the_reaction_type_before_the_backfill(expanded_db: Session) -> None:
+    add_users_and_posts(expanded_db)
+    reaction = crud_reaction.get_reaction(db=expanded_db, post_id=1, user_id=3)
+
+    assert reaction.kind is None
+    assert crud_reaction.get_kind(db=expanded_db, reaction=reaction) == ReactionType.DISLIKE
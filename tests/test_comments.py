@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.core.crud import crud_comment
+from src.core.models import Comment, Post, User
+from src.core.repository.comment_repo import CommentRepo
+
+
+def add_post(db: Session) -> Post:
+    user = User(username="alice", email="alice@example.com", hashed_password="-")
+    db.add(user)
+    db.flush()
+    post = Post(text="post", author_id=user.id, likes=0, dislikes=0)
+    db.add(post)
+    db.flush()
+    return post
+
+
+def add_comment(db: Session, post: Post, parent: Comment = None) -> Comment:
+    return crud_comment.add_comment(db=db, post_id=post.id, author_id=post.author_id, text="comment", parent=parent)
+
+
+def test_subtree_is_the_descendants_in_depth_first_order(db: Session) -> None:
+    post = add_post(db)
+    root, other = add_comment(db, post), add_comment(db, post)
+    reply = add_comment(db, post, root)
+    nested = add_comment(db, post, reply)
+    second = add_comment(db, post, root)
+    add_comment(db, post, other)
+    db.commit()
+
+    rows = crud_comment.get_subtrees(
+        db=db, post_id=post.id, first_path=root.path, last_path=root.path, max_depth=8, after_path=None, limit=10
+    )
+    assert [row.id for row in rows] == [reply.id, nested.id, second.id]
+
+    rows = crud_comment.get_subtrees(
+        db=db,
+        post_id=post.id,
+        first_path=root.path,
+        last_path=root.path,
+        max_depth=1,
+        after_path=reply.path,
+        limit=10,
+    )
+    assert [row.id for row in rows] == [second.id]
+
+
+def test_replies_of_a_page_are_split_between_its_comments(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    post = add_post(db)
+    old, new = add_comment(db, post), add_comment(db, post)
+    for _ in range(5):
+        add_comment(db, post, old)
+    reply = add_comment(db, post, new)
+    db.commit()
+    monkeypatch.setattr(settings, "COMMENT_REPLIES_MAX", 4)
+
+    page = asyncio.run(CommentRepo(db).show_comments(post_id=post.id, before_id=None, limit=10, depth=2))
+
+    assert [comment.id for comment in page.items] == [new.id, old.id]
+    assert [comment.id for comment in page.items[0].replies] == [reply.id]
+    assert len(page.items[1].replies) == 2
+
+
+def test_path_compares_bytes_on_postgres(postgres_engine: Engine) -> None:
+    query = (
+        "SELECT collation_name FROM information_schema.columns WHERE table_name = 'comment' AND column_name = 'path'"
+    )
+    with postgres_engine.connect() as connection:
+        collation = connection.execute(text(query)).scalar()
+    assert collation == "C"
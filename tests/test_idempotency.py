@@ -0,0 +1,77 @@
+from typing import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy.engine import Engine
+
+from src.config import settings
+from src.core.idempotency import IdempotencyStore
+from src.middleware import IdempotencyMiddleware
+
+TOKEN = jwt.encode({"sub": "1"}, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture
+def client(engine: Engine) -> Iterator[TestClient]:
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/items")
+    def create_item(payload: dict) -> JSONResponse:
+        app.state.calls += 1
+        if not payload.get("name"):
+            return JSONResponse({"detail": "name is required"}, status_code=422)
+        return JSONResponse({"id": app.state.calls}, status_code=201, headers={"Location": f"/items/{app.state.calls}"})
+
+    store = IdempotencyStore(ttl=60, lease=60, purge_interval=300, purge_batch_size=100)
+    app.add_middleware(
+        IdempotencyMiddleware, store=store, rules=[("POST", r"/items$")], wait_timeout=1, max_body_size=65536
+    )
+    with TestClient(app) as client:
+        client.headers["Authorization"] = f"Bearer {TOKEN}"
+        yield client
+
+
+def test_retry_replays_the_stored_response(client: TestClient) -> None:
+    first = client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+
+    assert client.app.state.calls == 1
+    assert (retry.status_code, retry.json()) == (first.status_code, first.json()) == (201, {"id": 1})
+    assert retry.headers["Location"] == "/items/1"
+    assert retry.headers["Content-Type"] == "application/json"
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_key_reused_for_another_request_is_rejected(client: TestClient) -> None:
+    client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+
+    response = client.post("/items", json={"name": "b"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert client.app.state.calls == 1
+
+
+def test_client_errors_are_not_stored(client: TestClient) -> None:
+    rejected = client.post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/items", json={}, headers={"Idempotency-Key": "k1"})
+
+    assert rejected.status_code == retry.status_code == 422
+    assert "Idempotent-Replayed" not in retry.headers
+    assert client.app.state.calls == 2
+
+
+def test_execution_that_lost_its_claim_keeps_off_the_key(engine: Engine) -> None:
+    # Every lease is over as soon as it starts, so each claim takes the previous one over
+    store = IdempotencyStore(ttl=60, lease=-1, purge_interval=300, purge_batch_size=100)
+    slow, _ = store.claim(b"k" * 16, b"f" * 16)
+    duplicate, _ = store.claim(b"k" * 16, b"f" * 16)
+
+    store.release(b"k" * 16, slow)
+    assert not store.complete(b"k" * 16, slow, 201, [], b"slow")
+    assert store.complete(b"k" * 16, duplicate, 201, [], b"duplicate")
+
+    assert store.get(b"k" * 16).body == b"duplicate"
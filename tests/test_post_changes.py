@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.core.crud import crud_post_change
+from src.core.models import PostChange
+
+
+def test_changes_stop_at_the_first_recent_one(db: Session) -> None:
+    now = datetime.utcnow()
+    # Sequence 3 was allocated by a transaction that started before the one of sequence 2
+    recorded = [now - timedelta(seconds=60), now - timedelta(seconds=1), now - timedelta(seconds=30)]
+    db.add_all([PostChange(seq=seq, post_id=seq, changed_at=at) for seq, at in enumerate(recorded, start=1)])
+    db.commit()
+    cutoff = now - timedelta(seconds=5)
+
+    changes = crud_post_change.get_changes(db=db, since=0, limit=10, recorded_before=cutoff)
+
+    assert [change.seq for change in changes] == [1]
+    assert crud_post_change.get_last_seq(db=db, recorded_before=cutoff) == 1
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.core.crud import crud_reaction
+from src.core.models import Post, Reaction, ReactionType, User
+from src.core.purge import PostPurger
+
+
+def add_deleted_post(db: Session) -> None:
+    db.add_all([User(id=user_id, username=f"user{user_id}", email=f"{user_id}@example.com") for user_id in (1, 2, 3)])
+    db.flush()
+    db.add(Post(id=1, author_id=1, deleted_at=datetime.utcnow() - timedelta(hours=1)))
+    db.flush()
+    db.add_all([Reaction(post_id=1, user_id=user_id, kind=ReactionType.LIKE) for user_id in (1, 2, 3)])
+    db.commit()
+
+
+def test_purge_removes_the_post_and_its_rows(db: Session) -> None:
+    add_deleted_post(db)
+    purger = PostPurger(interval=0, delay=60, posts_per_batch=10, rows_per_batch=2, pause=0)
+
+    assert purger.purge() == 1
+    assert db.query(Post).count() == db.query(Reaction).count() == 0
+
+
+def test_stopping_ends_the_purge_after_the_current_transaction(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    add_deleted_post(db)
+    purger = PostPurger(interval=0, delay=60, posts_per_batch=10, rows_per_batch=1, pause=0)
+    delete_by_post_ids = crud_reaction.delete_by_post_ids
+
+    def delete_then_stop(**kwargs) -> int:
+        # As if the application shut down while the first batch of reactions was deleted
+        purger.stopping.set()
+        return delete_by_post_ids(**kwargs)
+
+    monkeypatch.setattr(crud_reaction, "delete_by_post_ids", delete_then_stop)
+
+    assert purger.purge() == 0
+    assert db.query(Reaction).count() == 2
+    assert db.query(Post).count() == 1
@@ -0,0 +1,58 @@
+from typing import Callable
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.core.db import SessionLocal
+from src.core.db.query_budget import QueryBudgetExceeded, install_query_budget, record_active_counter
+from src.core.models import User
+from src.middleware import QueryBudgetMiddleware
+from src.middleware.query_budget import BUDGET_HEADER
+
+
+def add_users(db: Session) -> None:
+    db.add_all([User(id=user_id, username=f"user{user_id}", email=f"{user_id}@example.com") for user_id in (1, 2, 3)])
+    db.commit()
+
+
+def load_one_by_one(db: Session) -> None:
+    for user_id in (1, 2, 3):
+        db.query(User).filter(User.id == user_id).first()
+
+
+def test_fixture_counts_the_queries_of_the_test_engine(db: Session, query_budget: Callable) -> None:
+    add_users(db)
+
+    with query_budget(max_queries=2) as counter:
+        db.query(User).all()
+    assert counter.count == 1
+
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1"):
+        with query_budget(max_repeats=1):
+            load_one_by_one(db)
+
+
+def test_middleware_flags_an_n_plus_one(engine: Engine, db: Session) -> None:
+    add_users(db)
+    app = FastAPI()
+
+    @app.get("/users")
+    def list_users() -> int:
+        with SessionLocal() as session:
+            load_one_by_one(session)
+        return 3
+
+    app.add_middleware(QueryBudgetMiddleware, mode="raise", max_queries=10, max_repeats=1)
+    install_query_budget(engine)
+    try:
+        with TestClient(app) as client:
+            response = client.get("/users")
+    finally:
+        event.remove(engine, "before_cursor_execute", record_active_counter)
+
+    assert response.status_code == 200
+    assert "possible N+1" in response.headers[BUDGET_HEADER]
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+
+from src.config import settings
+from src.core.rate_limit.backends import DatabaseBackend
+from src.main import get_application
+
+
+def test_retry_after_counts_the_refill(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = DatabaseBackend(purge_interval=300, max_idle=60, max_keys=10)
+
+    async def hits(count: int) -> list:
+        return [await backend.hit("login:ip:1", rate=0.5, capacity=2) for _ in range(count)]
+
+    allowed = asyncio.run(hits(2))
+    (retry_after,) = asyncio.run(hits(1))
+
+    assert allowed == [0.0, 0.0]
+    # Less than the 2 s a whole token takes at 0.5 token/s, by what was accrued since the first hit
+    assert 1.5 < retry_after <= 2
+
+    # The worker denies the key on its own until then
+    monkeypatch.setattr(backend, "take", lambda *args: pytest.fail("queried the database"))
+    (denied,) = asyncio.run(hits(1))
+    assert 0 < denied <= retry_after
+
+
+def test_denial_carries_the_cors_headers(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMIT_POLICIES", {"availability": {"rate": 0.001, "burst": 1}})
+    client = TestClient(get_application())
+    url = f"{settings.API_V1_STR}/auth/availability?username=alice"
+    origin = {"Origin": "https://app.example"}
+
+    assert client.get(url, headers=origin).status_code == 200
+    denied = client.get(url, headers=origin)
+
+    assert denied.status_code == 429
+    assert denied.headers["access-control-allow-origin"] == "*"
+    assert "Retry-After" in denied.headers["access-control-expose-headers"]
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.commands.rollup_tag_trends import rollup_tag_trends
+from src.config import settings
+from src.core.crud import crud_post_tag, crud_tag_trend, get_bucket
+from src.core.models import PostTag
+
+
+def test_tags_are_stamped_in_utc(db: Session) -> None:
+    before = datetime.utcnow()
+    crud_post_tag.add_tags(db=db, post_id=1, tags=["python"])
+    db.commit()
+
+    created_at = db.query(PostTag.created_at).scalar()
+
+    assert before - timedelta(seconds=1) <= created_at <= datetime.utcnow()
+
+
+def test_late_uses_are_counted_until_the_hour_settles(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "TAG_TRENDING_ROLLUP_LAG_SECONDS", 2 * 3600)
+    previous = get_bucket(datetime.utcnow()) - timedelta(hours=1)
+    db.add(PostTag(post_id=1, tag="python", created_at=previous))
+    db.commit()
+    rollup_tag_trends(since=previous - timedelta(hours=2))
+
+    # Stamped in the previous hour, committed after the run
+    db.add(PostTag(post_id=2, tag="python", created_at=previous + timedelta(minutes=59)))
+    db.commit()
+    rollup_tag_trends()
+
+    assert [tuple(row) for row in crud_tag_trend.get_trending(db=db, since=previous, limit=10)] == [("python", 2)]